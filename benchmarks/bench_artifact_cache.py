@@ -0,0 +1,56 @@
+"""
+Latency of pulling a tagged artifact repeatedly, with and without the artifact
+cache, against the artifact size.
+
+Usage:
+    python -m benchmarks.bench_artifact_cache [SIZE_MB ...]
+"""
+
+import sys
+import tempfile
+
+from benchmarks.common import age_files, make_artifact, measure, print_table
+from mixver.storages.artifact_cache import get_artifact_cache
+from mixver.storages.local_storage import LocalStorage
+
+DEFAULT_SIZES_MB = [1, 16, 128]
+
+
+def run(sizes_mb: list[int], repeat: int = 20) -> list[dict]:
+    rows = []
+
+    for size_mb in sizes_mb:
+        with tempfile.TemporaryDirectory() as storage_path:
+            LocalStorage(storage_path=storage_path).push(
+                artifact=make_artifact(size_mb),
+                name="model",
+                metadata={},
+                tags=["production"],
+            )
+            age_files(storage_path)
+
+            for cached in (False, True):
+                storage = LocalStorage(
+                    storage_path=storage_path,
+                    registry_cache=cached,
+                    artifact_cache=cached,
+                )
+                pull = measure(lambda: storage.pull(tag="production"), repeat)
+                rows.append(
+                    {
+                        "artifact_mb": size_mb,
+                        "cached": cached,
+                        "pull_p50_us": pull["p50_us"],
+                        "pull_p99_us": pull["p99_us"],
+                    }
+                )
+
+    get_artifact_cache().clear()
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES_MB
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
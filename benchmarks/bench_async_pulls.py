@@ -0,0 +1,89 @@
+"""
+Event loop latency while a coroutine pulls artifacts, calling LocalStorage.pull
+directly from the loop or awaiting AsyncLocalStorage.pull. A ticker coroutine
+sleeps 1 ms in a loop and records how late it wakes up.
+
+Usage:
+    python -m benchmarks.bench_async_pulls [CONCURRENT_PULLS ...]
+"""
+
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.common import make_artifact, print_table
+from mixver.storages.async_storage import AsyncLocalStorage
+from mixver.storages.local_storage import LocalStorage
+
+DEFAULT_PULLS = [1, 16, 64]
+ARTIFACT_MB = 16
+ARTIFACTS = 4
+
+
+async def _ticker(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - start - 0.001) * 1000)
+
+
+async def _measure(storage: LocalStorage, pulls: int, use_async: bool) -> dict:
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.ensure_future(_ticker(lags, stop))
+    await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+
+    if use_async:
+        async with AsyncLocalStorage(storage) as async_storage:
+            await asyncio.gather(
+                *[
+                    async_storage.pull(name=f"model{i % ARTIFACTS}")
+                    for i in range(pulls)
+                ]
+            )
+    else:
+
+        async def pull(name: str) -> None:
+            storage.pull(name=name)
+
+        await asyncio.gather(*[pull(f"model{i % ARTIFACTS}") for i in range(pulls)])
+
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    lags.sort()
+
+    return {
+        "total_s": elapsed,
+        "loop_lag_p50_ms": statistics.median(lags) if lags else 0.0,
+        "loop_lag_max_ms": lags[-1] if lags else 0.0,
+    }
+
+
+def run(pulls: list[int]) -> list[dict]:
+    rows = []
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        storage = LocalStorage(storage_path=storage_path, serialization="stream")
+
+        for i in range(ARTIFACTS):
+            storage.push(
+                artifact=make_artifact(ARTIFACT_MB), name=f"model{i}", metadata={}
+            )
+
+        for count in pulls:
+            for use_async in (False, True):
+                result = asyncio.run(_measure(storage, count, use_async))
+                rows.append({"pulls": count, "async": use_async, **result})
+
+    return rows
+
+
+if __name__ == "__main__":
+    pulls = [int(count) for count in sys.argv[1:]] or DEFAULT_PULLS
+    rows = run(pulls)
+    print_table(rows, list(rows[0].keys()))
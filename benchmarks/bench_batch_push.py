@@ -0,0 +1,65 @@
+"""
+Time to push and pull an ensemble of small models one by one or with
+push_many/pull_many, against the registry size.
+
+Usage:
+    python -m benchmarks.bench_batch_push [SIZE ...]
+"""
+
+import sys
+import tempfile
+import time
+
+from benchmarks.common import build_registry, print_table
+from mixver.storages.local_storage import LocalStorage
+
+DEFAULT_SIZES = [100, 10_000, 50_000]
+ENSEMBLE = 50
+
+
+def run(sizes: list[int]) -> list[dict]:
+    rows = []
+    models = [
+        {"artifact": list(range(1000)), "name": f"member{i}", "metadata": {"i": i}}
+        for i in range(ENSEMBLE)
+    ]
+    references = [{"name": model["name"]} for model in models]
+
+    for size in sizes:
+        for batch in (False, True):
+            with tempfile.TemporaryDirectory() as storage_path:
+                build_registry(storage_path, names=size, tags=size // 10 or 1)
+                storage = LocalStorage(storage_path=storage_path)
+
+                start = time.perf_counter()
+                if batch:
+                    storage.push_many(models)
+                else:
+                    for model in models:
+                        storage.push(**model)
+                push_s = time.perf_counter() - start
+
+                start = time.perf_counter()
+                if batch:
+                    storage.pull_many(references)
+                else:
+                    for reference in references:
+                        storage.pull(**reference)
+                pull_s = time.perf_counter() - start
+
+            rows.append(
+                {
+                    "entries": size,
+                    "batch": batch,
+                    "push_ms": push_s * 1000,
+                    "pull_ms": pull_s * 1000,
+                }
+            )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,81 @@
+"""
+Compressed size and push/pull throughput of each available codec on model-like
+payloads:
+
+- weights: random float32 weights, which barely compress.
+- quantized: float32 weights with few distinct values, like quantized or
+  pruned-and-clustered models.
+- sparse: float32 weights where 90% of the values are zero.
+
+Usage:
+    python -m benchmarks.bench_compression [SIZE_MB ...]
+"""
+
+import array
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import print_table
+from mixver.storages.compression import CODECS
+from mixver.storages.local_storage import LocalStorage
+
+DEFAULT_SIZES_MB = [64]
+
+
+def _payloads(size_mb: int) -> dict:
+    count = size_mb * 1024 * 1024 // 4
+    rng = random.Random(0)
+    values = [rng.gauss(0, 1) for _ in range(count)]
+
+    return {
+        "weights": array.array("f", values),
+        "quantized": array.array("f", (round(value * 4) / 4 for value in values)),
+        "sparse": array.array(
+            "f", (value if i % 10 == 0 else 0.0 for i, value in enumerate(values))
+        ),
+    }
+
+
+def run(sizes_mb: list[int]) -> list[dict]:
+    rows = []
+
+    for size_mb in sizes_mb:
+        for payload, artifact in _payloads(size_mb).items():
+            for codec in ["none", *CODECS]:
+                with tempfile.TemporaryDirectory() as storage_path:
+                    storage = LocalStorage(storage_path=storage_path, codec=codec)
+
+                    start = time.perf_counter()
+                    filename = storage.push(
+                        artifact=artifact, name="model", metadata={}
+                    )
+                    push_s = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    storage.pull(name="model")
+                    pull_s = time.perf_counter() - start
+
+                    size = os.path.getsize(Path(storage_path, f"{filename}.pkl"))
+
+                rows.append(
+                    {
+                        "payload": payload,
+                        "size_mb": size_mb,
+                        "codec": codec,
+                        "ratio": size_mb * 1024 * 1024 / size,
+                        "push_mb_s": size_mb / push_s,
+                        "pull_mb_s": size_mb / pull_s,
+                    }
+                )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES_MB
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,64 @@
+"""
+Push latency and throughput with several processes pushing to the same
+storage at once.
+
+Usage:
+    python -m benchmarks.bench_concurrent_pushes [PROCESSES ...]
+"""
+
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.common import print_table
+from mixver.storages.local_storage import LocalStorage
+
+DEFAULT_PROCESSES = [1, 2, 4, 8, 16]
+PUSHES = 50
+
+
+def _push(storage_path: str, journal: bool) -> list[float]:
+    storage = LocalStorage(storage_path=storage_path, registry_journal=journal)
+    latencies = []
+
+    for i in range(PUSHES):
+        start = time.perf_counter()
+        storage.push(artifact=[i], name="model", metadata={}, tags=["latest"])
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+
+    return latencies
+
+
+def run(processes: list[int]) -> list[dict]:
+    rows = []
+
+    for count in processes:
+        for journal in (False, True):
+            with tempfile.TemporaryDirectory() as storage_path:
+                LocalStorage(storage_path=storage_path)
+
+                start = time.perf_counter()
+                with multiprocessing.Pool(count) as pool:
+                    results = pool.starmap(_push, [(storage_path, journal)] * count)
+                elapsed = time.perf_counter() - start
+
+            latencies = sorted(latency for result in results for latency in result)
+            rows.append(
+                {
+                    "processes": count,
+                    "journal": journal,
+                    "push_p50_us": statistics.median(latencies),
+                    "push_p99_us": latencies[int(len(latencies) * 0.99)],
+                    "pushes_per_s": len(latencies) / elapsed,
+                }
+            )
+
+    return rows
+
+
+if __name__ == "__main__":
+    processes = [int(count) for count in sys.argv[1:]] or DEFAULT_PROCESSES
+    rows = run(processes)
+    print_table(rows, list(rows[0].keys()))
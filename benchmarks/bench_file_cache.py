@@ -0,0 +1,72 @@
+"""
+Pull latency against the artifact size, reading the artifact from a slow
+storage on every pull, filling the local cache folder, and reading the cached
+copy. The slow storage is a directory object store with 5 ms of latency and
+50 MB/s per request, standing in for NFS or a remote store.
+
+Usage:
+    python -m benchmarks.bench_file_cache [SIZE_MB ...]
+"""
+
+import os
+import sys
+import tempfile
+
+from benchmarks.common import make_artifact, measure, print_table
+from mixver.storages.object_storage import ObjectStorage
+from mixver.storages.object_store import DirectoryObjectStore
+
+DEFAULT_SIZES_MB = [1, 16, 64]
+
+
+def run(sizes_mb: list[int], repeat: int = 5) -> list[dict]:
+    rows = []
+
+    for size_mb in sizes_mb:
+        with tempfile.TemporaryDirectory() as folder:
+            cache_path = os.path.join(folder, "cache")
+            store = DirectoryObjectStore(
+                os.path.join(folder, "objects"), latency=0.005, stream_bandwidth=50e6
+            )
+            storage = ObjectStorage(
+                os.path.join(folder, "registry"),
+                serialization="stream",
+                object_store=store,
+            )
+            storage.push(make_artifact(size_mb), "model", {}, tags=["prod"])
+            cached = ObjectStorage(
+                os.path.join(folder, "registry"),
+                serialization="stream",
+                object_store=store,
+                cache_path=cache_path,
+            )
+
+            def pull_cold():
+                # Hidden files are the locks of the cache
+                for filename in os.listdir(cache_path):
+                    if not filename.startswith("."):
+                        os.remove(os.path.join(cache_path, filename))
+
+                cached.pull(tag="prod")
+
+            for mode, pull in (
+                ("no cache", lambda: storage.pull(tag="prod")),
+                ("cache miss", pull_cold),
+                ("cache hit", lambda: cached.pull(tag="prod")),
+            ):
+                latency = measure(pull, repeat)
+                rows.append(
+                    {
+                        "size_mb": size_mb,
+                        "mode": mode,
+                        "pull_p50_ms": latency["p50_us"] / 1e3,
+                    }
+                )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES_MB
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,125 @@
+"""
+Startup time of fresh interpreters importing the storage, as headless scripts
+do, and running `mixver` commands, against a bare interpreter. Each command is
+run in a new process, and the overhead over the bare interpreter is reported,
+along with whether `rich` got imported.
+
+When a budget in milliseconds is given, the script exits with an error if the
+overhead of any headless command exceeds it, so it can guard scheduled jobs
+against startup regressions.
+
+Usage:
+    python -m benchmarks.bench_import_time [BUDGET_MS]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import print_table
+from mixver.config import ROOT
+
+_CHECK_RICH = "import sys; sys.exit(3 if 'rich' in sys.modules else 0)"
+
+# Name, code run by the interpreter and whether it's headless
+_COMMANDS = [
+    ("python", "pass", True),
+    (
+        "import local_storage",
+        f"import mixver.storages.local_storage; {_CHECK_RICH}",
+        True,
+    ),
+    (
+        "mixver --help",
+        "import sys; from mixver.cli.main import main\n"
+        "try:\n    main(['--help'])\nexcept SystemExit:\n    pass\n"
+        f"{_CHECK_RICH}",
+        True,
+    ),
+    (
+        "mixver list",
+        "import sys; from mixver.cli.main import main\n"
+        "main(['list', sys.argv[1]])\n"
+        f"{_CHECK_RICH}",
+        True,
+    ),
+    (
+        "mixver tags",
+        "import sys; from mixver.cli.main import main\n"
+        "main(['tags', sys.argv[1]])\n"
+        f"{_CHECK_RICH}",
+        False,
+    ),
+]
+
+
+def _time_command(code: str, storage_path: str, repeat: int) -> tuple[float, bool]:
+    environment = {**os.environ, "PYTHONPATH": str(ROOT)}
+    timings = []
+    imports_rich = False
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, "-c", code, storage_path],
+            env=environment,
+            stdout=subprocess.DEVNULL,
+            check=False,
+        )
+        timings.append(1e3 * (time.perf_counter() - start))
+
+        if process.returncode not in (0, 3):
+            raise RuntimeError(f"The command failed: {code}")
+
+        imports_rich = process.returncode == 3
+
+    return statistics.median(timings), imports_rich
+
+
+def run(repeat: int = 20) -> list[dict]:
+    rows = []
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        from mixver.storages.local_storage import LocalStorage
+
+        storage = LocalStorage(storage_path=storage_path)
+
+        for i in range(10):
+            storage.push(i, f"model{i}", {}, tags=[f"tag{i}"])
+
+        baseline = None
+
+        for name, code, headless in _COMMANDS:
+            startup_ms, imports_rich = _time_command(code, storage_path, repeat)
+            baseline = startup_ms if baseline is None else baseline
+            rows.append(
+                {
+                    "command": name,
+                    "startup_ms": startup_ms,
+                    "overhead_ms": startup_ms - baseline,
+                    "headless": headless,
+                    "imports_rich": imports_rich,
+                }
+            )
+
+    return rows
+
+
+if __name__ == "__main__":
+    rows = run()
+    print_table(rows, list(rows[0].keys()))
+
+    if len(sys.argv) > 1:
+        budget = float(sys.argv[1])
+        slow = [row for row in rows if row["headless"] and row["overhead_ms"] > budget]
+
+        for row in slow:
+            print(
+                f"{row['command']} takes {row['overhead_ms']:.1f} ms to start, "
+                f"over the {budget:.1f} ms budget."
+            )
+
+        sys.exit(1 if slow else 0)
@@ -0,0 +1,69 @@
+"""
+Overhead of the instrumentation: push and pull latency of small and 1 MiB
+artifacts without hooks, and with a `StatsAggregator` collecting their phases,
+along with the p50 of each phase of the pulls.
+
+Usage:
+    python -m benchmarks.bench_instrumentation [SIZE_KIB ...]
+"""
+
+import os
+import sys
+import tempfile
+
+from benchmarks.common import measure, print_table
+from mixver import instrumentation
+from mixver.instrumentation import StatsAggregator
+from mixver.storages.local_storage import LocalStorage
+
+DEFAULT_SIZES = [1, 1024]
+
+
+def run(sizes: list[int], repeat: int = 200) -> list[dict]:
+    rows = []
+
+    for size in sizes:
+        artifact = os.urandom(size * 1024)
+
+        for hooks in (False, True):
+            # A new storage for each run, so both push into the same registry size
+            with tempfile.TemporaryDirectory() as storage_path:
+                storage = LocalStorage(storage_path, registry_cache=True)
+                storage.push(artifact, "model", {})
+                stats = StatsAggregator()
+
+                if hooks:
+                    instrumentation.add_hook(stats)
+
+                try:
+                    push = measure(lambda: storage.push(artifact, "other", {}), repeat)
+                    stats.reset()
+                    pull = measure(lambda: storage.pull(name="model"), repeat)
+                finally:
+                    if hooks:
+                        instrumentation.remove_hook(stats)
+
+                report = stats.report()
+                rows.append(
+                    {
+                        "size_kib": size,
+                        "hooks": hooks,
+                        "push_p50_us": push["p50_us"],
+                        "pull_p50_us": pull["p50_us"],
+                        "pull_p99_us": pull["p99_us"],
+                        **{
+                            f"{phase}_p50_us": (
+                                1e3 * report[phase]["p50_ms"] if phase in report else ""
+                            )
+                            for phase in ("registry_load", "blob_read", "deserialize")
+                        },
+                    }
+                )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,76 @@
+"""
+Latency of pulls without version and pushes against the number of versions of
+an artifact. Both only read the latest version pointer of the registry index,
+while scanning all the versions grows with their number.
+
+Usage:
+    python -m benchmarks.bench_latest_version [VERSIONS ...]
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import build_registry, measure, print_table
+from mixver.versioning.sqlite_versioner import SQLiteVersioner
+from mixver.versioning.versioner import Versioner
+
+DEFAULT_VERSIONS = [1_000, 10_000, 50_000]
+
+BACKENDS = {
+    "json+cache": lambda path: Versioner(storage_path=path, cache=True),
+    "json+journal": lambda path: Versioner(storage_path=path, journal=True),
+    "sqlite": lambda path: SQLiteVersioner(storage_path=path),
+}
+
+
+def run(versions: list[int], repeat: int = 200) -> list[dict]:
+    rows = []
+
+    for count in versions:
+        with tempfile.TemporaryDirectory() as storage_path:
+            build_registry(storage_path, names=1, versions_per_name=count)
+
+            with open(Path(storage_path, ".versions.json"), encoding="utf8") as file:
+                versions_data = json.load(file)
+
+            # Without index data, the latest version is found scanning them all
+            versioner = Versioner(storage_path=storage_path)
+            scan = measure(
+                lambda: versioner._get_last_version(versions_data, "model0"), repeat
+            )
+            rows.append(
+                {
+                    "versions": count,
+                    "backend": "full scan",
+                    "pull_p50_us": scan["p50_us"],
+                    "push_p50_us": float("nan"),
+                }
+            )
+
+        for backend, create in BACKENDS.items():
+            with tempfile.TemporaryDirectory() as storage_path:
+                build_registry(storage_path, names=1, versions_per_name=count)
+                versioner = create(storage_path)
+
+                pull = measure(
+                    lambda: versioner.get_artifact_by_version("model0"), repeat
+                )
+                push = measure(lambda: versioner.add_artifact("model0"), repeat)
+                rows.append(
+                    {
+                        "versions": count,
+                        "backend": backend,
+                        "pull_p50_us": pull["p50_us"],
+                        "push_p50_us": push["p50_us"],
+                    }
+                )
+
+    return rows
+
+
+if __name__ == "__main__":
+    versions = [int(count) for count in sys.argv[1:]] or DEFAULT_VERSIONS
+    rows = run(versions)
+    print_table(rows, list(rows[0].keys()))
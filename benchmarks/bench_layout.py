@@ -0,0 +1,80 @@
+"""
+Push, pull and listing latency of each directory layout against the number of
+stored artifacts, and the time to migrate a flat storage to the hash layout.
+
+Usage:
+    python -m benchmarks.bench_layout [SIZE ...]
+"""
+
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.common import measure, print_table
+from mixver.storages import layout
+from mixver.storages.local_storage import LocalStorage
+
+DEFAULT_SIZES = [10_000, 100_000]
+BATCH = 1_000
+
+
+def fill(storage: LocalStorage, size: int) -> None:
+    for start in range(0, size, BATCH):
+        storage.push_many(
+            [
+                {"artifact": i, "name": f"model{i}", "metadata": {}}
+                for i in range(start, min(start + BATCH, size))
+            ]
+        )
+
+
+def run(sizes: list[int]) -> list[dict]:
+    rows = []
+
+    for size in sizes:
+        for storage_layout in layout.LAYOUTS:
+            with tempfile.TemporaryDirectory() as storage_path:
+                storage = LocalStorage(
+                    storage_path=storage_path, registry="sqlite", layout=storage_layout
+                )
+                fill(storage, size)
+                names = [f"model{i}" for i in random.sample(range(size), 200)]
+
+                push = measure(
+                    lambda: storage.push(artifact=0, name="extra", metadata={}), 200
+                )
+                pull = measure(lambda: storage.pull(name=names.pop()), 200)
+
+                start = time.perf_counter()
+                files = sum(1 for _ in layout.iter_artifact_files(storage_path))
+                list_s = time.perf_counter() - start
+
+                migrate_s = None
+
+                if storage_layout == "flat":
+                    start = time.perf_counter()
+                    layout.migrate_layout(storage_path, "hash", max_workers=8)
+                    migrate_s = time.perf_counter() - start
+
+            rows.append(
+                {
+                    "artifacts": size,
+                    "layout": storage_layout,
+                    "push_p50_us": push["p50_us"],
+                    "push_p99_us": push["p99_us"],
+                    "pull_p50_us": pull["p50_us"],
+                    "pull_p99_us": pull["p99_us"],
+                    "list_files": files,
+                    "list_s": list_s,
+                    "migrate_s": "-" if migrate_s is None else migrate_s,
+                }
+            )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,51 @@
+"""
+Latency of listing a page of 100 artifact versions against the registry size,
+at the start of the registry and after a cursor in its middle, for each
+registry backend.
+
+Usage:
+    python -m benchmarks.bench_list_artifacts [SIZE ...]
+"""
+
+import sys
+import tempfile
+
+from benchmarks.common import build_registry, measure, print_table
+from mixver.versioning.sqlite_versioner import SQLiteVersioner
+from mixver.versioning.versioner import Versioner
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def run(sizes: list[int], repeat: int = 50) -> list[dict]:
+    rows = []
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as storage_path:
+            build_registry(storage_path, names=size, versions_per_name=2)
+            middle = (f"model{size // 2}", "1")
+
+            for registry, versioner in (
+                ("json", Versioner(storage_path=storage_path, cache=True)),
+                ("sqlite", SQLiteVersioner(storage_path=storage_path)),
+            ):
+                first = measure(lambda: versioner.list_artifacts(limit=100), repeat)
+                after = measure(
+                    lambda: versioner.list_artifacts(after=middle, limit=100), repeat
+                )
+                rows.append(
+                    {
+                        "versions": 2 * size,
+                        "registry": registry,
+                        "first_page_p50_us": first["p50_us"],
+                        "cursor_page_p50_us": after["p50_us"],
+                    }
+                )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,96 @@
+"""
+Memory of several worker processes pulling the same large artifact, reading
+its buffers into each worker or memory-mapping them. The private memory of a
+worker is the memory that isn't shared with other processes, read from
+/proc/self/smaps_rollup, so this benchmark only runs on Linux. Pages mapped by
+a single worker count as private, so memory-mapping only pays off with more
+than one worker.
+
+Usage:
+    python -m benchmarks.bench_memory_map [WORKERS ...]
+"""
+
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.common import make_artifact, print_table
+from mixver.storages.local_storage import LocalStorage
+
+DEFAULT_WORKERS = [1, 4, 16]
+ARTIFACT_MB = 256
+
+
+def _private_mb() -> float:
+    private = 0.0
+
+    with open("/proc/self/smaps_rollup", encoding="utf8") as file:
+        for line in file:
+            key, _, value = line.partition(":")
+            if key.startswith("Private"):
+                private += int(value.split()[0]) / 1024
+
+    return private
+
+
+def _touch(artifact) -> None:
+    # Fault in every page, as serving the model would
+    buffer = memoryview(getattr(artifact, "buffer", artifact)).cast("B")
+    buffer[::4096].tobytes()
+
+
+def _pull(storage_path: str, memory_map: bool, barrier) -> tuple[float, float]:
+    storage = LocalStorage(storage_path=storage_path, memory_map=memory_map)
+    before = _private_mb()
+    barrier.wait()
+
+    start = time.perf_counter()
+    data = storage.pull(name="model")
+    _touch(data["artifact"])
+    elapsed = time.perf_counter() - start
+
+    # Keep the artifact alive until every worker measured its memory
+    private = _private_mb() - before
+    barrier.wait()
+
+    return elapsed, private
+
+
+def run(workers: list[int]) -> list[dict]:
+    rows = []
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        LocalStorage(storage_path=storage_path, serialization="stream").push(
+            artifact=make_artifact(ARTIFACT_MB), name="model", metadata={}
+        )
+
+        for count in workers:
+            for memory_map in (False, True):
+                with multiprocessing.Manager() as manager:
+                    barrier = manager.Barrier(count)
+                    with multiprocessing.Pool(count) as pool:
+                        results = pool.starmap(
+                            _pull, [(storage_path, memory_map, barrier)] * count
+                        )
+
+                rows.append(
+                    {
+                        "workers": count,
+                        "memory_map": memory_map,
+                        "pull_p50_s": statistics.median(r[0] for r in results),
+                        "private_mb_per_worker": statistics.fmean(
+                            r[1] for r in results
+                        ),
+                        "private_mb_total": sum(r[1] for r in results),
+                    }
+                )
+
+    return rows
+
+
+if __name__ == "__main__":
+    workers = [int(count) for count in sys.argv[1:]] or DEFAULT_WORKERS
+    rows = run(workers)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,62 @@
+"""
+Push and pull throughput of an object storage against the number of parts
+transferred at once, over a directory object store that stands in for a remote
+one, with 5 ms of latency and 50 MB/s per request.
+
+Usage:
+    python -m benchmarks.bench_object_storage [SIZE_MB ...]
+"""
+
+import os
+import sys
+import tempfile
+
+from benchmarks.common import make_artifact, measure, print_table
+from mixver.storages.object_storage import ObjectStorage
+from mixver.storages.object_store import DirectoryObjectStore
+
+DEFAULT_SIZES_MB = [16, 128]
+MAX_TRANSFERS = [1, 4, 16]
+LATENCY = 0.005
+STREAM_BANDWIDTH = 50e6
+
+
+def run(sizes_mb: list[int], repeat: int = 3) -> list[dict]:
+    rows = []
+
+    for size_mb in sizes_mb:
+        artifact = make_artifact(size_mb)
+
+        for max_transfers in MAX_TRANSFERS:
+            with tempfile.TemporaryDirectory() as folder:
+                storage = ObjectStorage(
+                    os.path.join(folder, "registry"),
+                    serialization="stream",
+                    object_store=DirectoryObjectStore(
+                        os.path.join(folder, "objects"),
+                        latency=LATENCY,
+                        stream_bandwidth=STREAM_BANDWIDTH,
+                    ),
+                    max_transfers=max_transfers,
+                )
+                push = measure(
+                    lambda: storage.push(artifact, "model", {}, tags=["prod"]),
+                    repeat,
+                )
+                pull = measure(lambda: storage.pull(tag="prod"), repeat)
+                rows.append(
+                    {
+                        "size_mb": size_mb,
+                        "max_transfers": max_transfers,
+                        "push_mb_s": size_mb / (push["p50_us"] / 1e6),
+                        "pull_mb_s": size_mb / (pull["p50_us"] / 1e6),
+                    }
+                )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES_MB
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
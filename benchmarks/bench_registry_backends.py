@@ -0,0 +1,66 @@
+"""
+Registry lookup and push latency against the registry size for each registry
+backend.
+
+Usage:
+    python -m benchmarks.bench_registry_backends [SIZE ...]
+"""
+
+import sys
+import tempfile
+
+from benchmarks.common import build_registry, measure, print_table
+from mixver.versioning.sqlite_versioner import SQLiteVersioner
+from mixver.versioning.versioner import Versioner
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+VERSIONS_PER_NAME = 10
+
+BACKENDS = {
+    "json": lambda path: Versioner(storage_path=path),
+    "json+cache": lambda path: Versioner(storage_path=path, cache=True),
+    "sqlite": lambda path: SQLiteVersioner(storage_path=path),
+}
+
+
+def run(sizes: list[int], repeat: int = 100) -> list[dict]:
+    rows = []
+
+    for size in sizes:
+        names = max(size // VERSIONS_PER_NAME, 1)
+
+        for backend, create in BACKENDS.items():
+            with tempfile.TemporaryDirectory() as storage_path:
+                build_registry(
+                    storage_path,
+                    names=names,
+                    versions_per_name=VERSIONS_PER_NAME,
+                    tags=names,
+                )
+                versioner = create(storage_path)
+                name = f"model{names // 2}"
+
+                latest = measure(
+                    lambda: versioner.get_artifact_by_version(name), repeat
+                )
+                tag = measure(lambda: versioner.get_artifact_by_tag("tag0"), repeat)
+                listing = measure(lambda: versioner.get_versions(name), repeat)
+                push = measure(lambda: versioner.add_artifact(name), repeat // 10)
+                rows.append(
+                    {
+                        "entries": size,
+                        "backend": backend,
+                        "latest_p50_us": latest["p50_us"],
+                        "tag_p50_us": tag["p50_us"],
+                        "list_p50_us": listing["p50_us"],
+                        "push_p50_us": push["p50_us"],
+                    }
+                )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,49 @@
+"""
+Pull lookup latency against the registry size, with and without the registry
+cache.
+
+Usage:
+    python -m benchmarks.bench_registry_cache [SIZE ...]
+"""
+
+import sys
+import tempfile
+
+from benchmarks.common import build_registry, measure, print_table
+from mixver.versioning.versioner import Versioner
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 50_000]
+
+
+def run(sizes: list[int], repeat: int = 200) -> list[dict]:
+    rows = []
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as storage_path:
+            build_registry(storage_path, names=size, tags=size // 10 or 1)
+            name = f"model{size // 2}"
+
+            for cache in (False, True):
+                versioner = Versioner(storage_path=storage_path, cache=cache)
+                by_version = measure(
+                    lambda: versioner.get_artifact_by_version(name=name), repeat
+                )
+                by_tag = measure(lambda: versioner.get_artifact_by_tag("tag0"), repeat)
+                rows.append(
+                    {
+                        "entries": size,
+                        "cache": cache,
+                        "version_p50_us": by_version["p50_us"],
+                        "version_p99_us": by_version["p99_us"],
+                        "tag_p50_us": by_tag["p50_us"],
+                        "tag_p99_us": by_tag["p99_us"],
+                    }
+                )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,81 @@
+"""
+Lookup latency and heap held by each process against the registry size, parsing
+the registry files, keeping them cached, or binary searching the memory-mapped
+registry snapshot, along with the push latency, which includes regenerating the
+snapshot.
+
+Usage:
+    python -m benchmarks.bench_registry_snapshot [SIZE ...]
+"""
+
+import sys
+import tempfile
+import tracemalloc
+
+from benchmarks.common import build_registry, measure, print_table
+from mixver.versioning.versioner import Versioner
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+VERSIONS_PER_NAME = 10
+
+MODES = {
+    "json": {},
+    "json+cache": {"cache": True},
+    "snapshot": {"snapshot": True},
+}
+
+
+def run(sizes: list[int], repeat: int = 100) -> list[dict]:
+    rows = []
+
+    for size in sizes:
+        names = max(size // VERSIONS_PER_NAME, 1)
+
+        with tempfile.TemporaryDirectory() as storage_path:
+            build_registry(
+                storage_path,
+                names=names,
+                versions_per_name=VERSIONS_PER_NAME,
+                tags=names,
+            )
+            # Built by the first snapshot reader, which pays for it once
+            Versioner(storage_path=storage_path, snapshot=True)
+            name = f"model{names // 2}"
+
+            for mode, options in MODES.items():
+                tracemalloc.start()
+                versioner = Versioner(storage_path=storage_path, **options)
+                versioner.get_artifact_by_version(name)
+                versioner.get_artifact_by_tag("tag0")
+                heap, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                latest = measure(
+                    lambda: versioner.get_artifact_by_version(name), repeat
+                )
+                tag = measure(lambda: versioner.get_artifact_by_tag("tag0"), repeat)
+                rows.append(
+                    {
+                        "entries": size,
+                        "mode": mode,
+                        "latest_p50_us": latest["p50_us"],
+                        "tag_p50_us": tag["p50_us"],
+                        "heap_kib": heap / 1024,
+                    }
+                )
+
+            # Every write regenerates the snapshot once it exists
+            versioner = Versioner(storage_path=storage_path, snapshot=True)
+            push = measure(lambda: versioner.add_artifact(name), max(repeat // 10, 3))
+            rows[-1]["push_p50_us"] = push["p50_us"]
+
+    for row in rows:
+        row.setdefault("push_p50_us", "")
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,45 @@
+"""
+Registry update latency against the registry size, rewriting the registry
+files on every update or appending the updates to a journal.
+
+Usage:
+    python -m benchmarks.bench_registry_writes [SIZE ...]
+"""
+
+import sys
+import tempfile
+
+from benchmarks.common import build_registry, measure, print_table
+from mixver.versioning.versioner import Versioner
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 50_000]
+
+
+def run(sizes: list[int], repeat: int = 200) -> list[dict]:
+    rows = []
+
+    for size in sizes:
+        for journal in (False, True):
+            with tempfile.TemporaryDirectory() as storage_path:
+                build_registry(storage_path, names=size, tags=size // 10 or 1)
+                versioner = Versioner(storage_path=storage_path, journal=journal)
+                push = measure(
+                    lambda: versioner.add_artifact("model0", tags=["tag0"]), repeat
+                )
+                versioner.compact()
+                rows.append(
+                    {
+                        "entries": size,
+                        "journal": journal,
+                        "push_p50_us": push["p50_us"],
+                        "push_p99_us": push["p99_us"],
+                    }
+                )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
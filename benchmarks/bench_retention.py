@@ -0,0 +1,64 @@
+"""
+Time of a garbage collection keeping the latest version of each artifact,
+against the number of artifacts, as a dry run and with 1 or 8 threads deleting
+files.
+
+Usage:
+    python -m benchmarks.bench_retention [SIZE ...]
+"""
+
+import sys
+import tempfile
+import time
+
+from benchmarks.common import print_table
+from mixver.storages.local_storage import LocalStorage
+from mixver.storages.retention import RetentionPolicy
+
+DEFAULT_SIZES = [100, 1_000]
+VERSIONS = 5
+
+
+def run(sizes: list[int]) -> list[dict]:
+    rows = []
+    policy = RetentionPolicy(keep_last=1)
+
+    for size in sizes:
+        for workers in (None, 1, 8):
+            with tempfile.TemporaryDirectory() as storage_path:
+                storage = LocalStorage(storage_path=storage_path, registry="sqlite")
+                storage.push_many(
+                    [
+                        {
+                            "artifact": list(range(1000)),
+                            "name": f"model{i}",
+                            "metadata": {},
+                        }
+                        for i in range(size)
+                        for _ in range(VERSIONS)
+                    ]
+                )
+
+                start = time.perf_counter()
+                report = storage.collect_garbage(
+                    policy, dry_run=workers is None, max_workers=workers
+                )
+                seconds = time.perf_counter() - start
+
+            rows.append(
+                {
+                    "artifacts": size,
+                    "workers": workers or "dry run",
+                    "removed": len(report.removed),
+                    "reclaimed_mb": report.reclaimed_bytes / 1024**2,
+                    "seconds": seconds,
+                }
+            )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,86 @@
+"""
+Peak memory of pushing and pulling a large artifact with the pickle and the
+stream serializations. Each measurement runs in a fresh process and reports
+the peak RSS growth over the process' memory before the push or pull.
+
+The artifact is a NumPy array if NumPy is installed, or an object that pickles
+its buffer the same way otherwise.
+
+Usage:
+    python -m benchmarks.bench_serialization [SIZE_MB ...]
+"""
+
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+
+from benchmarks.common import make_artifact, print_table
+from mixver.storages.local_storage import LocalStorage
+
+DEFAULT_SIZES_MB = [64, 256, 1024]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(storage_path: str, serialization: str, size_mb: int, queue) -> None:
+    storage = LocalStorage(storage_path=storage_path, serialization=serialization)
+
+    if size_mb:
+        artifact = make_artifact(size_mb)
+        baseline = _peak_rss_mb()
+        start = time.perf_counter()
+        storage.push(artifact=artifact, name=serialization, metadata={})
+    else:
+        baseline = _peak_rss_mb()
+        start = time.perf_counter()
+        storage.pull(name=serialization)
+
+    queue.put((time.perf_counter() - start, _peak_rss_mb() - baseline))
+
+
+def _run_in_process(*args) -> tuple[float, float]:
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(*args, queue))
+    process.start()
+    process.join()
+
+    if process.exitcode:
+        raise RuntimeError(f"The measurement failed with exit code {process.exitcode}")
+
+    return queue.get()
+
+
+def run(sizes_mb: list[int]) -> list[dict]:
+    rows = []
+
+    for size_mb in sizes_mb:
+        for serialization in ("pickle", "stream"):
+            with tempfile.TemporaryDirectory() as storage_path:
+                LocalStorage(storage_path=storage_path)
+                push_s, push_mb = _run_in_process(storage_path, serialization, size_mb)
+                pull_s, pull_mb = _run_in_process(storage_path, serialization, 0)
+
+            rows.append(
+                {
+                    "artifact_mb": size_mb,
+                    "serialization": serialization,
+                    "push_s": push_s,
+                    "push_peak_mb": push_mb,
+                    "pull_s": pull_s,
+                    "pull_peak_mb": pull_mb,
+                }
+            )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES_MB
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,66 @@
+"""
+Latency of finding the tags of an artifact through the reverse tag index,
+against scanning the whole tag map, and of rolling a tag back with and without
+the registry journal.
+
+Usage:
+    python -m benchmarks.bench_tag_index [SIZE ...]
+"""
+
+import sys
+import tempfile
+
+from benchmarks.common import build_registry, measure, print_table
+from mixver.versioning.versioner import Versioner
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def run(sizes: list[int], repeat: int = 200) -> list[dict]:
+    rows = []
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as storage_path:
+            build_registry(storage_path, names=size, tags=size)
+            versioner = Versioner(storage_path=storage_path, cache=True)
+            name = f"model{size // 2}"
+
+            def scan() -> list[str]:
+                with versioner._read(versioner._tags_file) as tags_data:
+                    return sorted(
+                        tag for tag, tagged in tags_data.items() if name in tagged
+                    )
+
+            assert scan() == versioner.get_tags(name)
+
+            # Tags of registries written by older releases have no history
+            for _ in range(2):
+                versioner.add_artifact(name, tags=[f"tag{size // 2}"])
+
+            indexed = measure(lambda: versioner.get_tags(name), repeat)
+            scanned = measure(scan, repeat)
+            rollback = measure(lambda: versioner.rollback_tag(f"tag{size // 2}"), 20)
+
+            # The journal avoids rewriting the tag files on every rollback
+            journaled = Versioner(storage_path=storage_path, journal=True)
+            journaled_rollback = measure(
+                lambda: journaled.rollback_tag(f"tag{size // 2}"), 20
+            )
+            journaled.compact()
+            rows.append(
+                {
+                    "tags": size,
+                    "index_p50_us": indexed["p50_us"],
+                    "scan_p50_us": scanned["p50_us"],
+                    "rollback_p50_us": rollback["p50_us"],
+                    "journal_rollback_p50_us": journaled_rollback["p50_us"],
+                }
+            )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
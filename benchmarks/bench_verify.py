@@ -0,0 +1,78 @@
+"""
+Cost of the artifact checksums: push and pull latency of a 1 MiB artifact, with
+the checksum verified on pull or not, and the time to verify a storage against
+the number of its artifacts, with one hashing process and with one per CPU.
+
+Usage:
+    python -m benchmarks.bench_verify [SIZE ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.common import age_files, measure, print_table
+from mixver.storages.local_storage import LocalStorage
+
+DEFAULT_SIZES = [100, 1_000, 5_000]
+ARTIFACT_SIZE = 1024 * 1024
+
+
+def run(sizes: list[int], repeat: int = 50) -> list[dict]:
+    rows = []
+    artifact = os.urandom(ARTIFACT_SIZE)
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        for verify_checksums in (False, True):
+            storage = LocalStorage(storage_path, verify_checksums=verify_checksums)
+            push = measure(lambda: storage.push(artifact, "model", {}), repeat)
+            pull = measure(lambda: storage.pull(name="model"), repeat)
+            rows.append(
+                {
+                    "artifacts": 1,
+                    "operation": "push/pull"
+                    + (" verified" if verify_checksums else ""),
+                    "workers": 1,
+                    "push_p50_us": push["p50_us"],
+                    "pull_p50_us": pull["p50_us"],
+                    "verify_ms": "",
+                }
+            )
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as storage_path:
+            storage = LocalStorage(storage_path, registry="sqlite")
+            storage.push_many(
+                [
+                    {
+                        "artifact": os.urandom(64 * 1024),
+                        "name": f"model{i}",
+                        "metadata": {},
+                    }
+                    for i in range(size)
+                ]
+            )
+            age_files(storage_path)
+
+            for workers in sorted({1, os.cpu_count() or 1}):
+                start = time.perf_counter()
+                storage.verify(max_workers=workers)
+                rows.append(
+                    {
+                        "artifacts": size,
+                        "operation": "verify 64 KiB artifacts",
+                        "workers": workers,
+                        "push_p50_us": "",
+                        "pull_p50_us": "",
+                        "verify_ms": 1e3 * (time.perf_counter() - start),
+                    }
+                )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
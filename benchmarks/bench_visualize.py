@@ -0,0 +1,98 @@
+"""
+Time until the first rows are written and total time of the tags view against
+the number of tags, rendering all the tags in a single table, as the visualizer
+used to, or streaming them in batches, with and without a limit of 50 rows.
+The output goes to an in-memory console.
+
+Usage:
+    python -m benchmarks.bench_visualize [SIZE ...]
+"""
+
+import io
+import sys
+import tempfile
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.common import build_registry, print_table
+from mixver.cli.visualizer import show_tags
+from mixver.versioning.versioner import Versioner
+
+DEFAULT_SIZES = [1_000, 10_000, 50_000]
+
+
+class _TimedOutput(io.StringIO):
+    """
+    In-memory output that records when it's first written.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.first_write = None
+
+    def write(self, text: str) -> int:
+        if self.first_write is None:
+            self.first_write = time.perf_counter()
+        return super().write(text)
+
+
+def _single_table(versioner: Versioner, console: Console) -> None:
+    table = Table(title="Artifacts")
+
+    for header in ("Tag", "Name", "Version", "Path"):
+        table.add_column(header, justify="center")
+
+    for row in list(versioner.iter_tags()):
+        table.add_row(*row)
+
+    console.print(table)
+
+
+def run(sizes: list[int]) -> list[dict]:
+    rows = []
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as storage_path:
+            build_registry(storage_path, names=size, tags=size)
+            versioner = Versioner(storage_path=storage_path, cache=True)
+
+            for mode, render in (
+                ("single table", _single_table),
+                (
+                    "streaming",
+                    lambda versioner, console: show_tags(
+                        versioner.iter_tags(), console=console
+                    ),
+                ),
+                (
+                    "streaming, limit 50",
+                    lambda versioner, console: show_tags(
+                        versioner.iter_tags(), limit=50, console=console
+                    ),
+                ),
+            ):
+                output = _TimedOutput()
+                console = Console(file=output, width=120)
+
+                start = time.perf_counter()
+                render(versioner, console)
+                end = time.perf_counter()
+
+                rows.append(
+                    {
+                        "tags": size,
+                        "mode": mode,
+                        "first_rows_ms": round(1e3 * (output.first_write - start), 1),
+                        "total_ms": round(1e3 * (end - start), 1),
+                    }
+                )
+
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    rows = run(sizes)
+    print_table(rows, list(rows[0].keys()))
@@ -0,0 +1,139 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+
+import json
+import os
+import pickle
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+
+def build_registry(
+    storage_path: str, names: int, versions_per_name: int = 1, tags: int = 0
+) -> None:
+    """
+    Write synthetic `.versions.json`, `.tags.json` and `.index.json` files.
+
+    Args:
+        storage_path (str): Folder where to write the registry files.
+        names (int): Number of artifact names.
+        versions_per_name (int): Number of versions of each artifact.
+        tags (int): Number of tags, each one pointing to the latest version of
+            a different artifact.
+    """
+    versions_data = {
+        f"model{i}": {str(v): f"model{i}_{v}" for v in range(1, versions_per_name + 1)}
+        for i in range(names)
+    }
+    tags_data = {
+        f"tag{i}": {
+            f"model{i}": {
+                str(versions_per_name): f"model{i}_{versions_per_name}",
+            }
+        }
+        for i in range(min(tags, names))
+    }
+
+    with open(Path(storage_path, ".versions.json"), "w", encoding="utf8") as file:
+        json.dump(versions_data, file)
+
+    with open(Path(storage_path, ".tags.json"), "w", encoding="utf8") as file:
+        json.dump(tags_data, file)
+
+    index_data = {
+        name: {"latest": versions_per_name, "counter": versions_per_name}
+        for name in versions_data
+    }
+
+    with open(Path(storage_path, ".index.json"), "w", encoding="utf8") as file:
+        json.dump(index_data, file)
+
+    age_files(storage_path)
+
+
+def age_files(storage_path: str, seconds: float = 60) -> None:
+    """
+    Move the modification time of the storage files to the past, so that
+    freshly written files aren't considered racy by the registry and artifact
+    caches.
+    """
+    past = time.time() - seconds
+
+    for filename in os.listdir(storage_path):
+        if os.path.isfile(Path(storage_path, filename)):
+            os.utime(Path(storage_path, filename), (past, past))
+
+
+class Weights:
+    """
+    Buffer exported out-of-band with pickle protocol 5 and copied into the
+    pickle with older protocols, like NumPy arrays.
+    """
+
+    def __init__(self, buffer) -> None:
+        self.buffer = buffer
+
+    def __reduce_ex__(self, protocol):
+        if protocol >= 5:
+            return Weights, (pickle.PickleBuffer(self.buffer),)
+        return Weights, (bytes(self.buffer),)
+
+
+def make_artifact(size_mb: int):
+    """
+    Build an artifact of the given size, a NumPy array if NumPy is installed.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return Weights(bytearray(size_mb * 1024 * 1024))
+
+    return np.ones(size_mb * 1024 * 1024 // 8)
+
+
+def measure(func: Callable[[], object], repeat: int = 200) -> Dict[str, float]:
+    """
+    Call a function repeatedly and summarize its latency in microseconds.
+    """
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        func()
+        timings.append((time.perf_counter_ns() - start) / 1_000)
+
+    timings.sort()
+
+    return {
+        "p50_us": statistics.median(timings),
+        "p99_us": timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        "mean_us": statistics.fmean(timings),
+    }
+
+
+def print_table(rows: List[Dict[str, object]], columns: Sequence[str]) -> None:
+    """
+    Print benchmark rows as a plain text table.
+    """
+    widths = [
+        max(len(column), *(len(_format(row[column])) for row in rows))
+        for column in columns
+    ]
+    print("  ".join(column.rjust(width) for column, width in zip(columns, widths)))
+
+    for row in rows:
+        print(
+            "  ".join(
+                _format(row[column]).rjust(width)
+                for column, width in zip(columns, widths)
+            )
+        )
+
+
+def _format(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    return str(value)
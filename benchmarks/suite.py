@@ -0,0 +1,461 @@
+"""
+Benchmark suite of the registry and storage hot paths, writing machine-readable
+results that can be compared between runs to catch regressions.
+
+The suite measures the registry lookup and push latency of each registry
+backend over synthetic registries, the push and pull latency and throughput of
+artifacts of increasing size, and the throughput of concurrent pulls and
+pushes. Each case runs in a new interpreter, so its peak RSS is its own and
+isn't inflated by the previous ones. Everything runs offline, in temporary
+folders.
+
+The "quick" profile scales registries from 10 to 100k entries and artifacts from
+1 KiB to 64 MiB. The "full" profile goes up to 1M entries and 1 GiB artifacts,
+and needs a few GiB of memory and disk.
+
+Comparing two result files reports the change of every metric, and exits with
+an error if any of them got worse by more than the threshold. Latencies and
+memory are better when lower, throughputs when higher.
+
+Usage:
+    python -m benchmarks.suite run [--profile quick|full] [--output FILE]
+        [--only CASE ...]
+    python -m benchmarks.suite compare BASELINE CURRENT [--threshold FRACTION]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.common import Weights, build_registry, measure, print_table
+from mixver.config import ROOT
+from mixver.storages.local_storage import LocalStorage
+from mixver.versioning.sqlite_versioner import SQLiteVersioner
+from mixver.versioning.versioner import Versioner
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+KIB = 1024
+MIB = 1024 * KIB
+GIB = 1024 * MIB
+
+VERSIONS_PER_NAME = 10
+# Time spent measuring each latency, which bounds the repetitions of slow calls
+MEASURE_SECONDS = 1.0
+
+PROFILES = {
+    "quick": {
+        "registry_lookup": {"entries": [10, 1_000, 100_000]},
+        "push_pull": {"payload_bytes": [KIB, MIB, 64 * MIB]},
+        "concurrent_pulls": {"threads": [1, 4, 16]},
+        "concurrent_pushes": {"processes": [1, 4]},
+    },
+    "full": {
+        "registry_lookup": {"entries": [10, 1_000, 100_000, 1_000_000]},
+        "push_pull": {"payload_bytes": [KIB, MIB, 64 * MIB, GIB]},
+        "concurrent_pulls": {"threads": [1, 4, 16, 64]},
+        "concurrent_pushes": {"processes": [1, 4, 16]},
+    },
+}
+
+BACKENDS = {
+    "json": lambda path: Versioner(storage_path=path),
+    "json+cache": lambda path: Versioner(storage_path=path, cache=True),
+    "sqlite": lambda path: SQLiteVersioner(storage_path=path),
+}
+
+
+def _measure(func: Callable[[], object], max_repeat: int = 200) -> Dict[str, float]:
+    """
+    Measure the latency of a function, repeating it as many times as fit in
+    `MEASURE_SECONDS`, between 3 and `max_repeat`.
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    repeat = int(min(max(MEASURE_SECONDS / max(elapsed, 1e-9), 3), max_repeat))
+
+    return measure(func, repeat)
+
+
+def registry_lookup(backend: str, entries: int) -> Dict[str, float]:
+    """
+    Lookup latency of the latest version and of a tag, and latency of adding a
+    version, over a registry with `entries` versions.
+    """
+    names = max(entries // VERSIONS_PER_NAME, 1)
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        build_registry(
+            storage_path,
+            names=names,
+            versions_per_name=min(entries, VERSIONS_PER_NAME),
+            tags=names,
+        )
+        versioner = BACKENDS[backend](storage_path)
+        name = f"model{names // 2}"
+
+        latest = _measure(lambda: versioner.get_artifact_by_version(name))
+        tag = _measure(lambda: versioner.get_artifact_by_tag("tag0"))
+        push = _measure(lambda: versioner.add_artifact(name), max_repeat=50)
+
+    return {
+        "latest_p50_us": latest["p50_us"],
+        "latest_p99_us": latest["p99_us"],
+        "tag_p50_us": tag["p50_us"],
+        "push_p50_us": push["p50_us"],
+        "push_p99_us": push["p99_us"],
+    }
+
+
+def push_pull(serialization: str, payload_bytes: int) -> Dict[str, float]:
+    """
+    Push and pull latency and throughput of an artifact of `payload_bytes`.
+    """
+    artifact = Weights(bytearray(payload_bytes))
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        storage = LocalStorage(storage_path, serialization=serialization)
+        push = _measure(lambda: storage.push(artifact, "model", {}), max_repeat=100)
+        pull = _measure(lambda: storage.pull(name="model"))
+
+    return {
+        "push_p50_us": push["p50_us"],
+        "push_p99_us": push["p99_us"],
+        "pull_p50_us": pull["p50_us"],
+        "pull_p99_us": pull["p99_us"],
+        "push_mb_per_s": payload_bytes / push["p50_us"],
+        "pull_mb_per_s": payload_bytes / pull["p50_us"],
+    }
+
+
+def concurrent_pulls(threads: int, pulls: int = 200) -> Dict[str, float]:
+    """
+    Throughput and latency of threads pulling 64 KiB artifacts by tag at once,
+    with the registry cache.
+    """
+    with tempfile.TemporaryDirectory() as storage_path:
+        storage = LocalStorage(storage_path, registry_cache=True)
+
+        for i in range(16):
+            storage.push(os.urandom(64 * KIB), f"model{i}", {}, tags=[f"tag{i}"])
+
+        latencies: List[float] = []
+        lock = threading.Lock()
+
+        def pull_many(worker: int) -> None:
+            timings = []
+
+            for i in range(pulls):
+                start = time.perf_counter()
+                storage.pull(tag=f"tag{(worker + i) % 16}")
+                timings.append((time.perf_counter() - start) * 1e6)
+
+            with lock:
+                latencies.extend(timings)
+
+        workers = [
+            threading.Thread(target=pull_many, args=(worker,))
+            for worker in range(threads)
+        ]
+        start = time.perf_counter()
+
+        for worker in workers:
+            worker.start()
+
+        for worker in workers:
+            worker.join()
+
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    return {
+        "pulls_per_s": len(latencies) / elapsed,
+        "pull_p50_us": statistics.median(latencies),
+        "pull_p99_us": latencies[int(len(latencies) * 0.99)],
+    }
+
+
+def _push_many(storage_path: str, pushes: int) -> List[float]:
+    storage = LocalStorage(storage_path)
+    latencies = []
+
+    for i in range(pushes):
+        start = time.perf_counter()
+        storage.push(artifact=[i], name="model", metadata={}, tags=["latest"])
+        latencies.append((time.perf_counter() - start) * 1e6)
+
+    return latencies
+
+
+def concurrent_pushes(processes: int, pushes: int = 50) -> Dict[str, float]:
+    """
+    Throughput and latency of processes pushing versions of the same artifact
+    at once.
+    """
+    with tempfile.TemporaryDirectory() as storage_path:
+        LocalStorage(storage_path)
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.starmap(_push_many, [(storage_path, pushes)] * processes)
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for result in results for latency in result)
+
+    return {
+        "pushes_per_s": len(latencies) / elapsed,
+        "push_p50_us": statistics.median(latencies),
+        "push_p99_us": latencies[int(len(latencies) * 0.99)],
+    }
+
+
+CASES = {
+    "registry_lookup": registry_lookup,
+    "push_pull": push_pull,
+    "concurrent_pulls": concurrent_pulls,
+    "concurrent_pushes": concurrent_pushes,
+}
+
+
+def build_matrix(profile: str, only: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Get the case and parameters of each benchmark of a profile.
+    """
+    scales = PROFILES[profile]
+    matrix = []
+
+    for entries in scales["registry_lookup"]["entries"]:
+        for backend in BACKENDS:
+            matrix.append(("registry_lookup", {"backend": backend, "entries": entries}))
+
+    for payload_bytes in scales["push_pull"]["payload_bytes"]:
+        for serialization in ("pickle", "stream"):
+            matrix.append(
+                (
+                    "push_pull",
+                    {"serialization": serialization, "payload_bytes": payload_bytes},
+                )
+            )
+
+    for threads in scales["concurrent_pulls"]["threads"]:
+        matrix.append(("concurrent_pulls", {"threads": threads}))
+
+    for processes in scales["concurrent_pushes"]["processes"]:
+        matrix.append(("concurrent_pushes", {"processes": processes}))
+
+    return [
+        {"case": case, "params": params}
+        for case, params in matrix
+        if not only or case in only
+    ]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / MIB if sys.platform == "darwin" else peak / KIB
+
+
+def run_case(case: str, params: Dict) -> Dict[str, float]:
+    """
+    Run a benchmark in a new interpreter.
+
+    Returns:
+        Dict[str, float]: Its metrics, along with its peak RSS in MiB.
+    """
+    process = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "case", case, json.dumps(params)],
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+
+    return json.loads(process.stdout.decode("utf8").splitlines()[-1])
+
+
+def _commit() -> Optional[str]:
+    try:
+        process = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return process.stdout.decode("utf8").strip()
+
+
+def run(profile: str = "quick", only: Optional[List[str]] = None) -> Dict:
+    """
+    Run the benchmarks of a profile.
+
+    Returns:
+        Dict: Environment of the run and metrics of each benchmark.
+    """
+    results = []
+
+    for benchmark in build_matrix(profile, only):
+        print(f"{benchmark['case']} {benchmark['params']}", file=sys.stderr)
+        results.append(
+            {**benchmark, "metrics": run_case(benchmark["case"], benchmark["params"])}
+        )
+
+    return {
+        "environment": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "profile": profile,
+        "results": results,
+    }
+
+
+def _higher_is_better(metric: str) -> bool:
+    return "_per_s" in metric
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.2) -> List[Dict]:
+    """
+    Compare the metrics of the benchmarks found in two runs.
+
+    Args:
+        baseline (Dict): Results of the reference run.
+        current (Dict): Results of the new run.
+        threshold (float): Relative change from which a metric that got worse
+            is a regression. Default is 0.2.
+
+    Returns:
+        List[Dict]: Values and relative change of each metric, and whether
+            it's a regression.
+    """
+    previous = {
+        (result["case"], json.dumps(result["params"], sort_keys=True)): result
+        for result in baseline["results"]
+    }
+    rows = []
+
+    for result in current["results"]:
+        params = json.dumps(result["params"], sort_keys=True)
+        reference = previous.get((result["case"], params))
+
+        if reference is None:
+            continue
+
+        for metric, value in result["metrics"].items():
+            old = reference["metrics"].get(metric)
+
+            if old is None or value is None or not old:
+                continue
+
+            change = (value - old) / old
+            worse = -change if _higher_is_better(metric) else change
+            rows.append(
+                {
+                    "case": result["case"],
+                    "params": params,
+                    "metric": metric,
+                    "baseline": old,
+                    "current": value,
+                    "change_pct": 100 * change,
+                    "regression": worse > threshold,
+                }
+            )
+
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks.")
+    run_parser.add_argument("--profile", choices=list(PROFILES), default="quick")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.add_argument("--only", nargs="+", choices=list(CASES))
+
+    compare_parser = commands.add_parser("compare", help="Compare two runs.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2)
+
+    case_parser = commands.add_parser("case", help="Run a single benchmark.")
+    case_parser.add_argument("case", choices=list(CASES))
+    case_parser.add_argument("params")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "case":
+        metrics = CASES[args.case](**json.loads(args.params))
+        print(json.dumps({**metrics, "peak_rss_mb": _peak_rss_mb()}))
+        return 0
+
+    if args.command == "run":
+        results = run(args.profile, args.only)
+
+        with open(args.output, "w", encoding="utf8") as file:
+            json.dump(results, file, indent=2)
+
+        for case in CASES:
+            rows = [
+                {**result["params"], **result["metrics"]}
+                for result in results["results"]
+                if result["case"] == case
+            ]
+
+            if rows:
+                print(case)
+                print_table(rows, list(rows[0].keys()))
+                print()
+
+        print(f"Results written to {args.output}")
+        return 0
+
+    with open(args.baseline, encoding="utf8") as file:
+        baseline = json.load(file)
+
+    with open(args.current, encoding="utf8") as file:
+        current = json.load(file)
+
+    rows = compare(baseline, current, args.threshold)
+
+    if rows:
+        print_table(rows, list(rows[0].keys()))
+
+    regressions = [row for row in rows if row["regression"]]
+
+    for row in regressions:
+        print(
+            f"{row['case']} {row['params']}: {row['metric']} changed by "
+            f"{row['change_pct']:+.1f}%."
+        )
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""
+`mixver` command-line tool over a local storage.
+
+    mixver list STORAGE_PATH [--prefix PREFIX] [--since TIME] [--limit N]
+    mixver tags STORAGE_PATH [--tag PATTERN] [--name PATTERN] [--limit N] [--versions]
+    mixver show STORAGE_PATH (NAME [--version VERSION] | --tag TAG)
+    mixver pull STORAGE_PATH (NAME [--version VERSION] | --tag TAG) --output FILE
+    mixver tag STORAGE_PATH NAME TAG [TAG ...] [--version VERSION]
+    mixver rm STORAGE_PATH NAME [--version VERSION]
+    mixver gc STORAGE_PATH [--keep-last N] [--max-age SECONDS] [--dry-run]
+    mixver verify STORAGE_PATH [--repair] [--workers N]
+    mixver prefetch STORAGE_PATH TAG [TAG ...] --cache PATH [--max-bytes N]
+
+The registry backend of the storage is detected from its files, unless it's
+given with `--registry`. Only the modules a command needs are imported, and
+`rich` is only imported by the commands that render tables, so the tool starts
+fast in scripts and cron jobs.
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Optional, Sequence
+
+from mixver.versioning.exceptions import ArtifactDoesNotExist, EmptyRegistry, EmptyTags
+
+_SQLITE_DATABASE = ".registry.db"
+
+
+def _open_storage(arguments: argparse.Namespace, **options):
+    """
+    Open the storage of a command, detecting its registry backend. The options
+    are passed to the storage.
+    """
+    from mixver.storages.local_storage import LocalStorage
+
+    if not os.path.isdir(arguments.storage_path):
+        raise ValueError(f"The storage '{arguments.storage_path}' doesn't exist.")
+
+    registry = arguments.registry
+
+    if registry is None:
+        database = Path(arguments.storage_path, _SQLITE_DATABASE)
+        registry = "sqlite" if database.is_file() else "json"
+
+    return LocalStorage(
+        storage_path=arguments.storage_path, registry=registry, **options
+    )
+
+
+def _reference(arguments: argparse.Namespace) -> dict:
+    """
+    Get the artifact reference of a command, either a tag or a name and version.
+    """
+    if bool(arguments.tag) == bool(arguments.name):
+        raise ValueError("Either an artifact name or a tag must be given.")
+
+    if arguments.tag:
+        return {"tag": arguments.tag}
+
+    return {"name": arguments.name, "version": arguments.version}
+
+
+def _list(arguments: argparse.Namespace) -> None:
+    storage = _open_storage(arguments)
+
+    for entry in storage.list_artifacts(
+        name_prefix=arguments.prefix, since=arguments.since, limit=arguments.limit
+    ):
+        pushed_at = "" if entry["pushed_at"] is None else str(entry["pushed_at"])
+        print(
+            "\t".join([entry["name"], entry["version"], entry["filename"], pushed_at])
+        )
+
+
+def _tags(arguments: argparse.Namespace) -> None:
+    storage = _open_storage(arguments)
+    storage.visualize(
+        view="versions" if arguments.versions else "tags",
+        tag_pattern=arguments.tag,
+        name_pattern=arguments.name,
+        limit=arguments.limit,
+    )
+
+
+def _show(arguments: argparse.Namespace) -> None:
+    storage = _open_storage(arguments)
+    reference = _reference(arguments)
+    filename = storage._get_filename(**reference)
+    name, version = filename.rsplit("_", 1)
+
+    print(
+        json.dumps(
+            {
+                "name": name,
+                "version": version,
+                "filename": filename,
+                "tags": storage.get_tags(name, version),
+                "metadata": storage.pull_metadata(**reference),
+            },
+            indent=2,
+        )
+    )
+
+
+def _pull(arguments: argparse.Namespace) -> None:
+    import pickle
+
+    storage = _open_storage(arguments)
+    artifact = storage.pull(**_reference(arguments))["artifact"]
+
+    if arguments.output == "-":
+        pickle.dump(artifact, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+    else:
+        with open(arguments.output, "wb") as file:
+            pickle.dump(artifact, file)
+
+
+def _tag(arguments: argparse.Namespace) -> None:
+    storage = _open_storage(arguments)
+    storage.update_tags(arguments.name, arguments.tags, version=arguments.version)
+
+
+def _rm(arguments: argparse.Namespace) -> None:
+    storage = _open_storage(arguments)
+    storage.remove(arguments.name, version=arguments.version)
+
+
+def _gc(arguments: argparse.Namespace) -> None:
+    from mixver.storages.retention import RetentionPolicy
+
+    storage = _open_storage(arguments)
+    report = storage.collect_garbage(
+        RetentionPolicy(
+            keep_last=arguments.keep_last,
+            max_age=arguments.max_age,
+            keep_tagged=not arguments.include_tagged,
+        ),
+        dry_run=arguments.dry_run,
+        max_names=arguments.max_names,
+    )
+    action = "Would remove" if report.dry_run else "Removed"
+
+    for filename in report.removed:
+        print(f"{action} {filename}")
+
+    for orphan in report.orphans:
+        print(f"{action} orphan {orphan}")
+
+    print(
+        f"{action} {len(report.removed)} versions and {len(report.orphans)} orphans, "
+        f"{report.reclaimed_bytes} bytes."
+        + ("" if report.complete else " The sweep continues on the next run.")
+    )
+
+
+def _verify(arguments: argparse.Namespace) -> int:
+    storage = _open_storage(arguments)
+    report = storage.verify(repair=arguments.repair, max_workers=arguments.workers)
+
+    for problem in ("missing", "orphaned", "corrupted", "unverified"):
+        for filename in getattr(report, problem):
+            print(f"{problem}\t{filename}")
+
+    return 0 if report.healthy else 2
+
+
+def _prefetch(arguments: argparse.Namespace) -> None:
+    storage = _open_storage(
+        arguments, cache_path=arguments.cache, cache_max_bytes=arguments.max_bytes
+    )
+
+    for tag, filename in zip(arguments.tags, storage.prefetch(arguments.tags)):
+        print(f"{tag}\t{filename}")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    storage = argparse.ArgumentParser(add_help=False)
+    storage.add_argument("storage_path", help="Storage path.")
+    storage.add_argument(
+        "--registry",
+        choices=("json", "sqlite"),
+        default=None,
+        help="Registry backend. Default is detected from the storage files.",
+    )
+
+    reference = argparse.ArgumentParser(add_help=False)
+    reference.add_argument("name", nargs="?", default="", help="Artifact's name.")
+    reference.add_argument(
+        "--version", default="", help="Artifact's version. Default is the latest."
+    )
+    reference.add_argument("--tag", default="", help="Tag of the artifact.")
+
+    parser = argparse.ArgumentParser(
+        prog="mixver", description="Inspect and manage a mixver storage."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser(
+        "list", parents=[storage], help="List the artifact versions."
+    )
+    command.add_argument("--prefix", default="", help="Prefix of the names.")
+    command.add_argument(
+        "--since", type=float, default=None, help="UNIX time of the oldest push."
+    )
+    command.add_argument("--limit", type=int, default=None)
+    command.set_defaults(function=_list)
+
+    command = commands.add_parser(
+        "tags", parents=[storage], help="Show the tags and their artifacts."
+    )
+    command.add_argument("--tag", default="*", help="Pattern of the tags.")
+    command.add_argument("--name", default="*", help="Pattern of the names.")
+    command.add_argument("--limit", type=int, default=None)
+    command.add_argument(
+        "--versions",
+        action="store_true",
+        help="Show the artifacts and their latest versions instead.",
+    )
+    command.set_defaults(function=_tags)
+
+    command = commands.add_parser(
+        "show",
+        parents=[storage, reference],
+        help="Show the metadata and tags of an artifact.",
+    )
+    command.set_defaults(function=_show)
+
+    command = commands.add_parser(
+        "pull",
+        parents=[storage, reference],
+        help="Pull an artifact into a pickle file.",
+    )
+    command.add_argument(
+        "--output", "-o", required=True, help="Output file, or - for stdout."
+    )
+    command.set_defaults(function=_pull)
+
+    command = commands.add_parser(
+        "tag", parents=[storage], help="Point tags to an artifact."
+    )
+    command.add_argument("name", help="Artifact's name.")
+    command.add_argument("tags", nargs="+", help="Tags.")
+    command.add_argument(
+        "--version", default="", help="Artifact's version. Default is the latest."
+    )
+    command.set_defaults(function=_tag)
+
+    command = commands.add_parser(
+        "rm", parents=[storage], help="Remove an artifact or one of its versions."
+    )
+    command.add_argument("name", help="Artifact's name.")
+    command.add_argument(
+        "--version", default="", help="Artifact's version. Default is all of them."
+    )
+    command.set_defaults(function=_rm)
+
+    command = commands.add_parser(
+        "gc", parents=[storage], help="Remove old versions and orphaned files."
+    )
+    command.add_argument("--keep-last", type=int, default=None)
+    command.add_argument("--max-age", type=float, default=None, help="Seconds.")
+    command.add_argument(
+        "--include-tagged",
+        action="store_true",
+        help="Also remove the tagged versions the policy selects.",
+    )
+    command.add_argument("--dry-run", action="store_true")
+    command.add_argument(
+        "--max-names", type=int, default=None, help="Artifacts to sweep."
+    )
+    command.set_defaults(function=_gc)
+
+    command = commands.add_parser(
+        "verify",
+        parents=[storage],
+        help="Check the artifact files against the registry and their checksums.",
+    )
+    command.add_argument(
+        "--repair",
+        action="store_true",
+        help="Drop the missing versions and restore the orphaned files.",
+    )
+    command.add_argument("--workers", type=int, default=None, help="Processes.")
+    command.set_defaults(function=_verify)
+
+    command = commands.add_parser(
+        "prefetch",
+        parents=[storage],
+        help="Copy the artifacts of some tags into a local cache folder.",
+    )
+    command.add_argument("tags", nargs="+", help="Tags.")
+    command.add_argument("--cache", required=True, help="Cache folder.")
+    command.add_argument(
+        "--max-bytes",
+        type=int,
+        default=10 * 1024**3,
+        help="Size of the cache above which the oldest copies are evicted.",
+    )
+    command.set_defaults(function=_prefetch)
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the `mixver` command-line tool.
+
+    Args:
+        argv (Optional[Sequence[str]]): Command-line arguments. Default is
+            `sys.argv[1:]`.
+
+    Returns:
+        int: Exit code.
+    """
+    arguments = _build_parser().parse_args(argv)
+
+    try:
+        code = arguments.function(arguments)
+    except (ArtifactDoesNotExist, EmptyRegistry, EmptyTags, ValueError) as exc:
+        print(f"mixver: {exc}", file=sys.stderr)
+        return 1
+
+    return code or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
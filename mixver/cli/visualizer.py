@@ -1,18 +1,144 @@
+"""
+Rendering of the registry content in the terminal.
+
+Rows are taken lazily from an iterator and printed in batches, each one as a
+table without borders that continues the previous one, so the first rows show
+up right away and memory doesn't grow with the number of rows. The column
+widths are fixed by the first batch, and longer values are wrapped.
+"""
+
+from itertools import islice
+from typing import Iterable, Optional, Sequence, Tuple
+
+from rich import box
 from rich.console import Console
 from rich.table import Table
 
+BATCH_SIZE = 100
+
+_TAG_COLUMNS = (
+    ("Tag", "green"),
+    ("Name", "black"),
+    ("Version", "cyan"),
+    ("Path", "red"),
+)
+_VERSION_COLUMNS = (
+    ("Name", "black"),
+    ("Latest version", "cyan"),
+    ("Path", "red"),
+)
+
+
+def show_tags(
+    rows: Iterable[Tuple[str, str, str, str]],
+    limit: Optional[int] = None,
+    console: Optional[Console] = None,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Print the tags along with the name, version and filename of their artifacts.
+
+    Args:
+        rows (Iterable[Tuple[str, str, str, str]]): Tag, name, version and
+            filename of each row.
+        limit (Optional[int]): Maximum number of rows to print. Default is None,
+            which prints all of them.
+        console (Optional[Console]): Console where to print. Default is a new
+            one writing to the standard output.
+        batch_size (int): Rows printed at once. Default is 100.
+
+    Returns:
+        int: Number of printed rows.
+    """
+    return _show_table("Artifacts", _TAG_COLUMNS, rows, limit, console, batch_size)
+
+
+def show_versions(
+    rows: Iterable[Tuple[str, str, str]],
+    limit: Optional[int] = None,
+    console: Optional[Console] = None,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Print the artifacts along with their latest version.
+
+    Args:
+        rows (Iterable[Tuple[str, str, str]]): Name, latest version and its
+            filename of each row.
+        limit (Optional[int]): Maximum number of rows to print. Default is None,
+            which prints all of them.
+        console (Optional[Console]): Console where to print. Default is a new
+            one writing to the standard output.
+        batch_size (int): Rows printed at once. Default is 100.
+
+    Returns:
+        int: Number of printed rows.
+    """
+    return _show_table(
+        "Artifact versions", _VERSION_COLUMNS, rows, limit, console, batch_size
+    )
+
+
+def _show_table(
+    title: str,
+    columns: Sequence[Tuple[str, str]],
+    rows: Iterable[Sequence[str]],
+    limit: Optional[int],
+    console: Optional[Console],
+    batch_size: int,
+) -> int:
+    """
+    Print rows in batches of tables that line up with each other.
+    """
+    console = console or Console()
+    # One more row than the limit tells whether the output was cut
+    rows = iter(rows) if limit is None else islice(rows, limit + 1)
+    widths = None
+    printed = 0
+
+    while True:
+        batch = list(islice(rows, batch_size))
+
+        if limit is not None and printed + len(batch) > limit:
+            batch = batch[: limit - printed]
+            truncated = True
+        else:
+            truncated = False
+
+        if widths is None:
+            widths = [
+                max([len(header), *(len(str(row[i])) for row in batch)])
+                for i, (header, _) in enumerate(columns)
+            ]
+        elif not batch and not truncated:
+            break
+
+        # The first table is printed even if it's empty, for its header
+        if batch or not printed:
+            table = Table(
+                title=title if not printed else None,
+                show_header=not printed,
+                box=box.SIMPLE_HEAD,
+                show_edge=False,
+                pad_edge=False,
+            )
+
+            for (header, style), width in zip(columns, widths):
+                table.add_column(
+                    header, justify="center", style=style, width=width, overflow="fold"
+                )
+
+            for row in batch:
+                table.add_row(*(str(value) for value in row))
 
-def show_tags(tags: list[str], names, versions, paths):
-    table = Table(title="Artifacts")
+            console.print(table)
+            printed += len(batch)
 
-    table.add_column("Tag", justify="center", style="green")
-    table.add_column("Name", justify="center", style="black")
-    table.add_column("Version", justify="center", style="cyan")
-    table.add_column("Path", justify="center", style="red")
+        if truncated:
+            console.print(f"Showing the first {printed} rows.", style="yellow")
+            break
 
-    for i in range(len(tags)):
-        table.add_row(tags[i], names[i], versions[i], paths[i])
+        if len(batch) < batch_size:
+            break
 
-    print("AA")
-    console = Console()
-    console.print(table)
+    return printed
@@ -0,0 +1,293 @@
+"""
+Timing and byte counting of the phases of the storage operations.
+
+The hot paths of `LocalStorage` are split into phases:
+
+    registry_load: looking up artifacts in the registry.
+    registry_write: adding, retagging and removing artifacts in the registry.
+    serialize: pickling an artifact, without the time spent writing its file.
+    blob_write: writing the artifact file and moving it into place.
+    blob_read: reading the artifact file.
+    deserialize: unpickling an artifact, without the time spent reading its
+        file.
+
+Each phase is reported to the registered hooks along with its duration and the
+bytes it read or wrote, such as the registry files parsed while looking up an
+artifact. Hooks run in the thread of the operation, so they must be fast and
+thread-safe. `StatsAggregator` is a hook that keeps the latest durations of
+each phase in memory and summarizes them:
+
+    stats = StatsAggregator()
+    instrumentation.add_hook(stats)
+    ...
+    stats.report()["blob_read"]["p99_ms"]
+
+Without hooks, the phases aren't timed and the instrumentation only costs a
+check of the registered hooks.
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Tuple
+
+PHASES = (
+    "registry_load",
+    "registry_write",
+    "serialize",
+    "blob_write",
+    "blob_read",
+    "deserialize",
+)
+
+Hook = Callable[[str, float, int], None]
+
+# Replaced as a whole when hooks are added or removed, so it's read without locks
+_hooks: Tuple[Hook, ...] = ()
+_hooks_lock = threading.Lock()
+_local = threading.local()
+
+
+def add_hook(hook: Hook) -> None:
+    """
+    Register a function called with the phase, its duration in seconds and its
+    bytes every time a phase ends.
+
+    Args:
+        hook (Hook): Function to register.
+    """
+    global _hooks
+
+    with _hooks_lock:
+        _hooks = (*_hooks, hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    """
+    Unregister a hook.
+
+    Args:
+        hook (Hook): Registered function.
+    """
+    global _hooks
+
+    with _hooks_lock:
+        hooks = list(_hooks)
+        hooks.remove(hook)
+        _hooks = tuple(hooks)
+
+
+def enabled() -> bool:
+    """
+    Check whether any hook is registered.
+
+    Returns:
+        bool: Whether the phases are being timed.
+    """
+    return bool(_hooks)
+
+
+def emit(phase: str, seconds: float, nbytes: int = 0) -> None:
+    """
+    Report a phase timed by the caller to the hooks.
+
+    Args:
+        phase (str): Phase's name.
+        seconds (float): Phase's duration.
+        nbytes (int): Bytes read or written by the phase. Default is 0.
+    """
+    for hook in _hooks:
+        hook(phase, seconds, nbytes)
+
+
+def add_bytes(nbytes: int) -> None:
+    """
+    Count bytes read or written by the innermost phase running in this thread.
+    They are ignored outside of phases.
+
+    Args:
+        nbytes (int): Number of bytes.
+    """
+    if _hooks:
+        active = getattr(_local, "active", None)
+
+        if active:
+            active[-1].nbytes += nbytes
+
+
+class _Phase:
+    """
+    Context manager that times a phase and reports it to the hooks.
+    """
+
+    __slots__ = ("name", "nbytes", "_start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.nbytes = 0
+        self._start = 0.0
+
+    def __enter__(self) -> "_Phase":
+        active = getattr(_local, "active", None)
+
+        if active is None:
+            active = _local.active = []
+
+        active.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        seconds = time.perf_counter() - self._start
+        _local.active.pop()
+        emit(self.name, seconds, self.nbytes)
+
+
+class _DisabledPhase:
+    """
+    Context manager used instead of `_Phase` when no hook is registered.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_DisabledPhase":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+_DISABLED = _DisabledPhase()
+
+
+def phase(name: str):
+    """
+    Time a block of code as a phase, if any hook is registered.
+
+    Args:
+        name (str): Phase's name.
+
+    Returns:
+        Context manager that reports the phase when the block ends.
+    """
+    return _Phase(name) if _hooks else _DISABLED
+
+
+class TimedFile:
+    """
+    Binary file wrapper that accumulates the time spent in its reads and writes
+    and the bytes they moved, to tell the file I/O apart from the
+    serialization. Other attributes are taken from the wrapped file.
+
+    Attributes:
+        seconds (float): Time spent reading and writing.
+        nbytes (int): Bytes read and written.
+    """
+
+    def __init__(self, file) -> None:
+        self.file = file
+        self.seconds = 0.0
+        self.nbytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        start = time.perf_counter()
+        data = self.file.read(size)
+        self.seconds += time.perf_counter() - start
+        self.nbytes += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        start = time.perf_counter()
+        read = self.file.readinto(buffer)
+        self.seconds += time.perf_counter() - start
+        self.nbytes += read or 0
+        return read
+
+    def readline(self, size: int = -1) -> bytes:
+        start = time.perf_counter()
+        line = self.file.readline(size)
+        self.seconds += time.perf_counter() - start
+        self.nbytes += len(line)
+        return line
+
+    def write(self, content) -> int:
+        start = time.perf_counter()
+        written = self.file.write(content)
+        self.seconds += time.perf_counter() - start
+        self.nbytes += written
+        return written
+
+    def __getattr__(self, name: str):
+        return getattr(self.file, name)
+
+
+class StatsAggregator:
+    """
+    Hook that keeps the durations of the latest phases in memory and summarizes
+    them by phase.
+
+    Attributes:
+        max_samples (int): Durations kept of each phase, the oldest ones being
+            dropped. Counts and byte totals include all the phases.
+    """
+
+    def __init__(self, max_samples: int = 10_000) -> None:
+        self.max_samples = max_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._bytes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, phase: str, seconds: float, nbytes: int) -> None:
+        with self._lock:
+            samples = self._samples.get(phase)
+
+            if samples is None:
+                samples = self._samples[phase] = deque(maxlen=self.max_samples)
+                self._counts[phase] = self._bytes[phase] = 0
+
+            samples.append(seconds)
+            self._counts[phase] += 1
+            self._bytes[phase] += nbytes
+
+    def reset(self) -> None:
+        """
+        Drop all the collected phases.
+        """
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._bytes.clear()
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize the collected phases.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Count, total bytes, and p50, p99 and
+                mean durations in milliseconds of each phase.
+        """
+        with self._lock:
+            collected: List[Tuple[str, List[float], int, int]] = [
+                (phase, sorted(samples), self._counts[phase], self._bytes[phase])
+                for phase, samples in self._samples.items()
+            ]
+
+        return {
+            phase: {
+                "count": count,
+                "bytes": nbytes,
+                "p50_ms": 1e3 * _percentile(samples, 0.5),
+                "p99_ms": 1e3 * _percentile(samples, 0.99),
+                "mean_ms": 1e3 * statistics.fmean(samples),
+            }
+            for phase, samples, count, nbytes in collected
+        }
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    """
+    Get the value below which a fraction of some sorted samples fall.
+    """
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class _CachedArtifact:
+    signature: Tuple
+    data: Any
+    size: int
+
+
+class ArtifactCache:
+    """
+    In-memory LRU cache of pulled artifacts, shared by the storages of a process.
+
+    Artifacts are cached by file path, along with the inode, size and
+    modification time of the file when it was read, so an artifact file that's
+    replaced, for example after all the versions of an artifact are removed and
+    pushed again, is read again. Artifacts without a local file are cached by
+    key, along with a signature given by the caller instead. Cached artifacts
+    are returned as is, so they must not be modified.
+
+    The size of an artifact is estimated as the size of its file, and the least
+    recently pulled artifacts are evicted once the cached ones add up to more
+    than `max_bytes`.
+
+    Attributes:
+        max_bytes (int): Maximum total size of the cached artifacts.
+        racy_window_ns (int): Minimum age, in nanoseconds, of a file
+            modification for the artifact to be cached.
+        hits (int): Pulls served from the cache.
+        misses (int): Pulls that read the artifact file.
+        evictions (int): Artifacts evicted to make room for others.
+    """
+
+    def __init__(
+        self, max_bytes: int = 1024**3, racy_window_ns: int = 10_000_000
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.racy_window_ns = racy_window_ns
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, _CachedArtifact]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, file_path: str, load: Callable[[], Any]) -> Any:
+        """
+        Get a cached artifact, or load and cache it if its file changed or it
+        isn't cached.
+
+        Args:
+            file_path (str): Artifact's file path.
+            load (Callable[[], Any]): Function that reads the artifact.
+
+        Returns:
+            Any: Artifact's data.
+        """
+        stat = os.stat(file_path)
+
+        return self.get_or_load_signed(
+            str(file_path),
+            (stat.st_ino, stat.st_size, stat.st_mtime_ns),
+            stat.st_size,
+            load,
+            modified_ns=stat.st_mtime_ns,
+        )
+
+    def get_or_load_signed(
+        self,
+        key: str,
+        signature: Tuple,
+        size: int,
+        load: Callable[[], Any],
+        modified_ns: Optional[int] = None,
+    ) -> Any:
+        """
+        Get a cached artifact, or load and cache it if its signature changed or
+        it isn't cached. It's meant for artifacts without a local file, such as
+        the objects of an object store.
+
+        Args:
+            key (str): Artifact's key.
+            signature (Tuple): Attributes that change whenever the artifact is
+                replaced, such as its checksum.
+            size (int): Artifact's size in bytes.
+            load (Callable[[], Any]): Function that reads the artifact.
+            modified_ns (Optional[int]): Modification time of the artifact, in
+                nanoseconds, if the signature can't tell apart the artifacts
+                replaced within the racy window. Default is None.
+
+        Returns:
+            Any: Artifact's data.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.data
+
+            self.misses += 1
+
+        data = load()
+
+        if modified_ns is None or time.time_ns() - modified_ns >= self.racy_window_ns:
+            self._put(key, _CachedArtifact(signature, data, size))
+
+        return data
+
+    def invalidate(self, file_path: str) -> None:
+        """
+        Drop a cached artifact.
+
+        Args:
+            file_path (str): Artifact's file path, or its key if it was cached
+                with `get_or_load_signed`.
+        """
+        with self._lock:
+            entry = self._entries.pop(str(file_path), None)
+
+            if entry is not None:
+                self._size -= entry.size
+
+    def clear(self) -> None:
+        """
+        Drop all the cached artifacts and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, int]: Hits, misses, evictions, number of cached artifacts
+                and their total size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def _put(self, file_path: str, entry: _CachedArtifact) -> None:
+        with self._lock:
+            previous = self._entries.pop(file_path, None)
+
+            if previous is not None:
+                self._size -= previous.size
+
+            # Artifacts larger than the whole cache would evict everything else
+            if entry.size > self.max_bytes:
+                return
+
+            self._entries[file_path] = entry
+            self._size += entry.size
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+                self.evictions += 1
+
+
+_artifact_cache: Optional[ArtifactCache] = None
+_artifact_cache_lock = threading.Lock()
+
+
+def get_artifact_cache() -> ArtifactCache:
+    """
+    Get the artifact cache of the process, creating it on the first call. Its
+    size can be changed through its `max_bytes` attribute.
+
+    Returns:
+        ArtifactCache: Process-wide artifact cache.
+    """
+    global _artifact_cache
+
+    with _artifact_cache_lock:
+        if _artifact_cache is None:
+            _artifact_cache = ArtifactCache()
+
+        return _artifact_cache
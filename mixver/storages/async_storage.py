@@ -0,0 +1,119 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from mixver.storages.local_storage import LocalStorage
+
+
+@dataclass
+class AsyncLocalStorage:
+    """
+    Asynchronous interface of a LocalStorage, for applications built on asyncio.
+
+    Registry lookups and artifact reads and writes run in a bounded thread pool,
+    so they don't block the event loop. Concurrent pulls of the same artifact
+    file share a single load, so they all get the same object, which must not
+    be modified.
+
+    Attributes:
+        storage (LocalStorage): Wrapped storage.
+        max_workers (int): Maximum number of operations running at once.
+            Default is 4.
+        _executor (ThreadPoolExecutor): Threads running the operations.
+        _loads (Dict[str, asyncio.Future]): Artifact loads in progress, by
+            artifact filename.
+    """
+
+    storage: LocalStorage
+    max_workers: int = 4
+    _executor: ThreadPoolExecutor = field(init=False, repr=False)
+    _loads: Dict[str, asyncio.Future] = field(
+        init=False, repr=False, default_factory=dict
+    )
+
+    def __post_init__(self) -> None:
+        """
+        Create the thread pool.
+        """
+        self._executor = ThreadPoolExecutor(
+            self.max_workers, thread_name_prefix="mixver-async"
+        )
+
+    async def push(
+        self,
+        artifact: Any,
+        name: str,
+        metadata: Dict,
+        tags: Optional[list[str]] = None,
+        codec: Optional[str] = None,
+    ) -> str:
+        """
+        Save data into the storage.
+        """
+        return await self._run(
+            self.storage.push,
+            artifact=artifact,
+            name=name,
+            metadata=metadata,
+            tags=tags,
+            codec=codec,
+        )
+
+    async def pull(self, tag: str = "", name: str = "", version: str = "") -> Dict:
+        """
+        Retrieve data from the storage. If the artifact is already being loaded,
+        the load in progress is awaited instead of starting a new one.
+        """
+        filename = await self._run(
+            self.storage._get_filename, tag=tag, name=name, version=version
+        )
+        load = self._loads.get(filename)
+
+        if load is None:
+            load = asyncio.ensure_future(self._run(self.storage._read, filename))
+            self._loads[filename] = load
+            load.add_done_callback(lambda _: self._loads.pop(filename, None))
+
+        # Cancelling a caller mustn't cancel the load shared with the others
+        return await asyncio.shield(load)
+
+    async def pull_metadata(
+        self, tag: str = "", name: str = "", version: str = ""
+    ) -> Dict:
+        """
+        Retrieve the metadata of an artifact without loading the artifact.
+        """
+        return await self._run(
+            self.storage.pull_metadata, tag=tag, name=name, version=version
+        )
+
+    async def list_metadata(self, name: str) -> Dict[str, Dict]:
+        """
+        Retrieve the metadata of all the versions of an artifact.
+        """
+        return await self._run(self.storage.list_metadata, name)
+
+    async def remove(self, name: str, version: str = "") -> None:
+        """
+        Remove an artifact from the storage, along with its tags.
+        """
+        await self._run(self.storage.remove, name, version=version)
+
+    def close(self) -> None:
+        """
+        Wait for the running operations and stop the thread pool.
+        """
+        self._executor.shutdown()
+
+    async def __aenter__(self) -> "AsyncLocalStorage":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
@@ -0,0 +1,207 @@
+import errno
+import os
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, List, Tuple
+
+from mixver.storages.integrity import HashingWriter
+
+# Errors raised by filesystems that don't support hard links
+_LINK_ERRORS = (errno.EPERM, errno.EXDEV, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP)
+
+
+@dataclass(frozen=True)
+class BlobStore:
+    """
+    Content-addressed store of serialized artifacts.
+
+    Blobs are stored in `objects/<prefix>/<digest>.pkl`, where the digest is the
+    SHA-256 of their content, computed while they are serialized. Artifact files
+    are hard links to their blob, so identical artifacts take the space of one,
+    and the number of links of a blob is its reference count. A blob is deleted
+    once no artifact file links to it. On filesystems without hard links, each
+    artifact file keeps its own copy.
+
+    Attributes:
+        storage_path (str): Storage path.
+        _objects_folder (str): Folder of the blobs, relative to the storage.
+    """
+
+    storage_path: str
+    _objects_folder: str = field(default="objects", init=False)
+
+    def path(self, digest: str) -> Path:
+        """
+        Get the path of a blob.
+
+        Args:
+            digest (str): Blob's digest.
+
+        Returns:
+            Path: Blob's path.
+        """
+        return Path(
+            self.storage_path, self._objects_folder, digest[:2], f"{digest}.pkl"
+        )
+
+    def store(
+        self, dump: Callable[[BinaryIO], Any], destination: Path, attempts: int = 3
+    ) -> str:
+        """
+        Serialize content into a blob and link it to an artifact file. If a blob
+        with the same content exists, it's reused and the new one is discarded.
+
+        Args:
+            dump (Callable[[BinaryIO], Any]): Function that serializes the
+                content into the file it's given.
+            destination (Path): Artifact file to link to the blob. It's replaced
+                if it exists.
+            attempts (int): Times to retry linking a blob that's deleted
+                concurrently. Default is 3.
+
+        Returns:
+            str: Blob's digest.
+        """
+        temporary, digest = self.write(dump)
+        self.link(temporary, digest, destination, attempts)
+
+        return digest
+
+    def write(self, dump: Callable[[BinaryIO], Any]) -> Tuple[Path, str]:
+        """
+        Serialize content into a temporary file of the store, hashing it on the
+        way, so it can be linked once its artifact file is known.
+
+        Args:
+            dump (Callable[[BinaryIO], Any]): Function that serializes the
+                content into the file it's given.
+
+        Returns:
+            Tuple[Path, str]: Temporary file and its SHA-256 digest.
+        """
+        folder = Path(self.storage_path, self._objects_folder)
+        folder.mkdir(exist_ok=True)
+        temporary = Path(folder, f".{uuid.uuid4().hex}.tmp")
+
+        try:
+            with open(temporary, "xb") as file:
+                writer = HashingWriter(file)
+                dump(writer)
+                file.flush()
+                os.fsync(file.fileno())
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+        return temporary, writer.hash.hexdigest()
+
+    def link(
+        self, temporary: Path, digest: str, destination: Path, attempts: int = 3
+    ) -> None:
+        """
+        Move a file written by `write` into the store, unless a blob with the
+        same content is already there, and link an artifact file to the blob.
+        The temporary file is removed.
+
+        Args:
+            temporary (Path): File written by `write`.
+            digest (str): Its digest.
+            destination (Path): Artifact file to link to the blob. It's replaced
+                if it exists.
+            attempts (int): Times to retry linking a blob that's deleted
+                concurrently. Default is 3.
+        """
+        try:
+            try:
+                self._add(temporary, digest, destination, attempts)
+            except OSError as exc:
+                if exc.errno not in _LINK_ERRORS:
+                    raise
+                os.replace(temporary, destination)
+        finally:
+            try:
+                os.unlink(temporary)
+            except FileNotFoundError:
+                pass
+
+    def _add(
+        self, temporary: Path, digest: str, destination: Path, attempts: int
+    ) -> None:
+        """
+        Move a serialized blob into the store, unless it's already there, and
+        link the artifact file to it.
+        """
+        blob = self.path(digest)
+        blob.parent.mkdir(exist_ok=True)
+
+        for _ in range(attempts):
+            try:
+                os.link(temporary, blob)
+            except FileExistsError:
+                pass
+
+            try:
+                _link(blob, destination)
+                return
+            except FileNotFoundError:
+                # The blob was released in between, so create it again
+                continue
+
+        _link(temporary, destination)
+
+    def release(self, digest: str) -> None:
+        """
+        Delete a blob if no artifact file links to it anymore.
+
+        Args:
+            digest (str): Blob's digest.
+        """
+        blob = self.path(digest)
+
+        try:
+            if os.stat(blob).st_nlink <= 1:
+                os.unlink(blob)
+        except FileNotFoundError:
+            pass
+
+    def orphans(self) -> List[str]:
+        """
+        Find the blobs that no artifact file links to anymore, such as the ones
+        of interrupted removals.
+
+        Returns:
+            List[str]: Orphaned blobs' digests.
+        """
+        folder = Path(self.storage_path, self._objects_folder)
+        digests: List[str] = []
+
+        if not folder.is_dir():
+            return digests
+
+        for prefix in os.scandir(folder):
+            if not prefix.is_dir():
+                continue
+
+            for entry in os.scandir(prefix.path):
+                try:
+                    if entry.name.endswith(".pkl") and entry.stat().st_nlink <= 1:
+                        digests.append(entry.name[: -len(".pkl")])
+                except FileNotFoundError:
+                    continue
+
+        return digests
+
+
+def _link(source: Path, destination: Path) -> None:
+    """
+    Atomically point a path to the file of another one.
+    """
+    temporary = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}.tmp")
+    os.link(source, temporary)
+
+    try:
+        os.replace(temporary, destination)
+    except BaseException:
+        os.unlink(temporary)
+        raise
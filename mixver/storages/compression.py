@@ -0,0 +1,317 @@
+"""
+Compression codecs for the stored artifacts.
+
+Compressed artifacts are split into chunks that are compressed in parallel by a
+thread pool, since the codecs release the GIL while they run. Each chunk is
+written as a frame with its compressed and uncompressed sizes, followed by an
+empty frame that marks the end of the artifact. Reads decompress the next
+chunks in parallel while the current one is consumed.
+"""
+
+import io
+import lzma
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Deque, Dict, Optional, Tuple
+
+from mixver.storages.exceptions import CorruptedArtifact
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+_FRAME = struct.Struct("<QQ")
+
+
+@dataclass(frozen=True)
+class Codec:
+    """
+    Compression codec.
+
+    Attributes:
+        name (str): Name recorded in the compressed artifacts.
+        compress (Callable[[bytes], bytes]): Compress a chunk.
+        decompress (Callable[[bytes, int], bytes]): Decompress a chunk, given
+            its uncompressed size.
+    """
+
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes, int], bytes]
+
+
+CODECS: Dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    """
+    Make a codec available to the storages.
+
+    Args:
+        codec (Codec): Codec to register.
+    """
+    CODECS[codec.name] = codec
+
+
+def get_codec(name: str) -> Codec:
+    """
+    Get a registered codec.
+
+    Args:
+        name (str): Codec's name.
+
+    Returns:
+        Codec: Codec.
+    """
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown codec '{name}', the available codecs are "
+            f"{', '.join(['none', *CODECS])}."
+        ) from None
+
+
+register_codec(
+    Codec(
+        name="zlib",
+        compress=lambda data: zlib.compress(data, 1),
+        decompress=lambda data, size: zlib.decompress(data, bufsize=size),
+    )
+)
+register_codec(
+    Codec(
+        name="lzma",
+        compress=lambda data: lzma.compress(data, preset=1),
+        decompress=lambda data, size: lzma.decompress(data),
+    )
+)
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    pass
+else:
+    register_codec(
+        Codec(
+            name="zstd",
+            compress=lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+            decompress=lambda data, size: zstandard.ZstdDecompressor().decompress(
+                data, max_output_size=size
+            ),
+        )
+    )
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover - optional dependency
+    pass
+else:
+    register_codec(
+        Codec(
+            name="lz4",
+            compress=lz4.frame.compress,
+            decompress=lambda data, size: lz4.frame.decompress(data),
+        )
+    )
+
+
+def _workers() -> int:
+    return min(8, os.cpu_count() or 1)
+
+
+class CompressedWriter:
+    """
+    Binary file wrapper that compresses the content written through it in
+    chunks. `close` must be called to write the last chunk.
+
+    Args:
+        file (BinaryIO): File where to write the compressed frames.
+        codec (Codec): Compression codec.
+        chunk_size (int): Uncompressed size of the chunks. Default is 4 MiB.
+        workers (Optional[int]): Threads compressing chunks in parallel. Default
+            is the number of CPUs, up to 8.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        codec: Codec,
+        chunk_size: int = CHUNK_SIZE,
+        workers: Optional[int] = None,
+    ) -> None:
+        self.file = file
+        self.codec = codec
+        self.chunk_size = chunk_size
+        self.workers = workers or _workers()
+        self._buffer = bytearray()
+        self._pending: Deque[Tuple[Future, int]] = deque()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def write(self, content) -> int:
+        view = memoryview(content).cast("B")
+        size = view.nbytes
+
+        while view:
+            missing = self.chunk_size - len(self._buffer)
+            self._buffer += view[:missing]
+            view = view[missing:]
+
+            if len(self._buffer) == self.chunk_size:
+                self._submit()
+
+        return size
+
+    def close(self) -> None:
+        """
+        Compress the remaining content and write the end of the artifact.
+        """
+        try:
+            if self._buffer:
+                self._submit()
+
+            while self._pending:
+                self._write_frame()
+
+            self.file.write(_FRAME.pack(0, 0))
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+
+    def _submit(self) -> None:
+        chunk, self._buffer = self._buffer, bytearray()
+
+        if self._executor is None:
+            # Artifacts that fit in a chunk don't need the thread pool
+            if not self._pending and len(chunk) < self.chunk_size:
+                future: Future = Future()
+                future.set_result(self.codec.compress(chunk))
+                self._pending.append((future, len(chunk)))
+                return
+
+            self._executor = ThreadPoolExecutor(
+                self.workers, thread_name_prefix="mixver-compression"
+            )
+
+        self._pending.append(
+            (self._executor.submit(self.codec.compress, chunk), len(chunk))
+        )
+
+        # Bound the memory held by the chunks waiting to be written
+        while len(self._pending) > 2 * self.workers:
+            self._write_frame()
+
+    def _write_frame(self) -> None:
+        future, size = self._pending.popleft()
+        compressed = future.result()
+        self.file.write(_FRAME.pack(len(compressed), size))
+        self.file.write(compressed)
+
+
+class _DecompressedStream(io.RawIOBase):
+    """
+    Readable stream over the frames of a compressed artifact.
+    """
+
+    def __init__(self, file: BinaryIO, codec: Codec, workers: int) -> None:
+        self.file = file
+        self.codec = codec
+        self.workers = workers
+        self._chunk = memoryview(b"")
+        self._pending: Deque[Future] = deque()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._started = False
+        self._ended = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._chunk:
+            self._next_chunk()
+
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+
+        return size
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+        super().close()
+
+    def _next_chunk(self) -> None:
+        if self._executor is None:
+            frame = None if self._ended else self._read_frame()
+
+            if frame is None:
+                self._ended = True
+                return
+
+            # Artifacts that fit in a chunk don't need the thread pool, so it's
+            # only started once a second frame is found
+            if not self._started:
+                self._started = True
+                self._chunk = memoryview(self.codec.decompress(*frame))
+                return
+
+            self._executor = ThreadPoolExecutor(
+                self.workers, thread_name_prefix="mixver-decompression"
+            )
+            self._pending.append(self._executor.submit(self.codec.decompress, *frame))
+
+        # Keep the next chunks decompressing while this one is consumed
+        while not self._ended and len(self._pending) <= self.workers:
+            frame = self._read_frame()
+
+            if frame is None:
+                self._ended = True
+            else:
+                self._pending.append(
+                    self._executor.submit(self.codec.decompress, *frame)
+                )
+
+        if self._pending:
+            self._chunk = memoryview(self._pending.popleft().result())
+
+    def _read_frame(self) -> Optional[Tuple[bytes, int]]:
+        name = getattr(self.file, "name", "<stream>")
+        header = self.file.read(_FRAME.size)
+
+        if len(header) < _FRAME.size:
+            raise CorruptedArtifact(name, "the compressed file is truncated")
+
+        compressed_size, size = _FRAME.unpack(header)
+
+        if not compressed_size:
+            return None
+
+        compressed = self.file.read(compressed_size)
+
+        if len(compressed) < compressed_size:
+            raise CorruptedArtifact(name, "the compressed file is truncated")
+
+        return compressed, size
+
+
+def open_decompressed(
+    file: BinaryIO, codec: Codec, workers: Optional[int] = None
+) -> io.BufferedReader:
+    """
+    Open a stream that decompresses the frames of a compressed artifact.
+
+    Args:
+        file (BinaryIO): File positioned at the first frame.
+        codec (Codec): Compression codec.
+        workers (Optional[int]): Threads decompressing chunks in parallel.
+            Default is the number of CPUs, up to 8.
+
+    Returns:
+        io.BufferedReader: Decompressed content.
+    """
+    return io.BufferedReader(
+        _DecompressedStream(file, codec, workers or _workers()), CHUNK_SIZE
+    )
@@ -0,0 +1,35 @@
+class CorruptedArtifact(Exception):
+    """
+    Indicates that a stored artifact file can't be read.
+
+    Args:
+        path (str): Artifact's file path.
+        reason (str): Why the file can't be read.
+
+    Attributes:
+        path (str): Artifact's file path.
+        message (str): Exception's message.
+    """
+
+    def __init__(self, path: str, reason: str) -> None:
+        self.path = path
+        self.message = f"The artifact file '{path}' is corrupted: {reason}"
+        super().__init__(self.message)
+
+
+class ObjectChanged(IOError):
+    """
+    Indicates that an object was replaced while it was being read.
+
+    Args:
+        key (str): Object's key.
+
+    Attributes:
+        key (str): Object's key.
+        message (str): Exception's message.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.message = f"The object '{key}' changed while it was being read."
+        super().__init__(self.message)
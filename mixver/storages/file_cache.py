@@ -0,0 +1,229 @@
+import hashlib
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict
+
+from mixver.versioning.files import FileLock
+
+# Locks shared by the fills of different keys, so their number is bounded
+_LOCK_STRIPES = 64
+
+
+class FileCache:
+    """
+    Bounded folder of local copies of artifact files, such as a local SSD in
+    front of a storage on NFS or in an object store. It's shared by all the
+    processes of the host that use the same folder.
+
+    Each copy is keyed by the filename and checksum of the artifact, since a
+    pushed version never changes, so copies are never stale. A missing copy is
+    filled by a single process while the others wait for it, and it only
+    appears once it's complete. The modification time of a copy is updated
+    whenever it's read, and the least recently read copies are evicted once
+    the cached ones add up to more than `max_bytes`. Evicted copies that are
+    being read stay readable until they're closed, except on Windows.
+
+    Attributes:
+        folder (str): Cache folder.
+        max_bytes (int): Maximum total size of the cached copies.
+        hits (int): Reads served by a cached copy in this process.
+        misses (int): Reads that filled the copy in this process.
+        evictions (int): Copies evicted by this process.
+    """
+
+    def __init__(self, folder: str, max_bytes: int = 10 * 1024**3) -> None:
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(Path(folder, ".locks"), exist_ok=True)
+        self._eviction_lock = FileLock(str(Path(folder, ".locks", "eviction")))
+        self._fill_locks: Dict[int, FileLock] = {}
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        """
+        Get the path of a cached copy.
+
+        Args:
+            key (str): Copy's key.
+
+        Returns:
+            Path: Copy's path.
+        """
+        return Path(self.folder, key)
+
+    def open(self, key: str, fill: Callable[[Path], None]) -> BinaryIO:
+        """
+        Open a cached copy for reading, filling it first if it isn't cached.
+
+        Args:
+            key (str): Copy's key.
+            fill (Callable[[Path], None]): Function that writes the content of
+                the copy into the path it's given.
+
+        Returns:
+            BinaryIO: Copy's file.
+        """
+        path = self.path(key)
+        filled = False
+
+        # A copy can be evicted by another process right after it's filled
+        for _ in range(3):
+            try:
+                file = open(path, "rb")
+            except FileNotFoundError:
+                filled = self.fill(key, fill) or filled
+                continue
+
+            self._touch(path)
+
+            if not filled:
+                with self._lock:
+                    self.hits += 1
+
+            return file
+
+        # The cache is too busy to keep the copy, so it's read without caching it
+        temporary = Path(self.folder, f".{uuid.uuid4().hex}.tmp")
+
+        try:
+            fill(temporary)
+            return open(temporary, "rb")
+        finally:
+            # The fill may fail before creating the file
+            try:
+                os.unlink(temporary)
+            except FileNotFoundError:
+                pass
+
+    def fill(self, key: str, fill: Callable[[Path], None]) -> bool:
+        """
+        Fill a cached copy if it isn't cached, evicting the least recently read
+        copies if the cache grows too large. A cached copy is marked as recently
+        read instead.
+
+        Args:
+            key (str): Copy's key.
+            fill (Callable[[Path], None]): Function that writes the content of
+                the copy into the path it's given.
+
+        Returns:
+            bool: Whether the copy was filled, or it was already cached.
+        """
+        path = self.path(key)
+
+        with self._fill_lock(key):
+            if path.exists():
+                self._touch(path)
+                return False
+
+            temporary = Path(self.folder, f".{uuid.uuid4().hex}.tmp")
+
+            try:
+                fill(temporary)
+                os.replace(temporary, path)
+            except BaseException:
+                try:
+                    os.unlink(temporary)
+                except FileNotFoundError:
+                    pass
+                raise
+
+        with self._lock:
+            self.misses += 1
+
+        self.evict(keep=key)
+
+        return True
+
+    def evict(self, keep: str = "") -> int:
+        """
+        Delete the least recently read copies until the cached ones add up to
+        at most `max_bytes`.
+
+        Args:
+            keep (str): Key of a copy not to evict, such as the one just filled.
+                Default is empty.
+
+        Returns:
+            int: Number of evicted copies.
+        """
+        with self._eviction_lock:
+            entries = []
+            size = 0
+
+            for entry in os.scandir(self.folder):
+                # Hidden files are the locks and the fills in progress
+                if entry.name.startswith(".") or not entry.is_file():
+                    continue
+
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+
+                size += stat.st_size
+
+                if entry.name != keep:
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+            evicted = 0
+            entries.sort()
+
+            for _, entry_size, entry_path in entries:
+                if size <= self.max_bytes:
+                    break
+
+                try:
+                    os.unlink(entry_path)
+                except FileNotFoundError:
+                    continue
+
+                size -= entry_size
+                evicted += 1
+
+        with self._lock:
+            self.evictions += evicted
+
+        return evicted
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the counters of the cache in this process.
+
+        Returns:
+            Dict[str, int]: Hits, misses and evictions.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _fill_lock(self, key: str) -> FileLock:
+        """
+        Get the lock of the fills of a key, shared with the other processes.
+        """
+        stripe = int(hashlib.sha256(key.encode("utf8")).hexdigest(), 16) % _LOCK_STRIPES
+
+        with self._lock:
+            if stripe not in self._fill_locks:
+                self._fill_locks[stripe] = FileLock(
+                    str(Path(self.folder, ".locks", str(stripe)))
+                )
+
+            return self._fill_locks[stripe]
+
+    def _touch(self, path: Path) -> None:
+        """
+        Mark a copy as recently read.
+        """
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
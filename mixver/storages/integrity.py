@@ -0,0 +1,94 @@
+"""
+Integrity checks of the stored artifacts.
+
+The SHA-256 of each artifact file is computed while it's written and recorded in
+the registry when the artifact is pushed. It can be checked on every pull, and
+`LocalStorage.verify` checks all the artifacts at once, hashing their files in
+parallel across a process pool.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import BinaryIO, List, Optional
+
+_READ_SIZE = 1024 * 1024
+
+
+class HashingWriter:
+    """
+    Binary file wrapper that hashes the content written through it with
+    SHA-256.
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.hash = hashlib.sha256()
+
+    def write(self, content) -> int:
+        self.hash.update(content)
+        return self.file.write(content)
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+
+def file_checksum(path: str) -> Optional[str]:
+    """
+    Compute the SHA-256 of a file without reading it into memory at once.
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        Optional[str]: Hexadecimal digest, or None if the file doesn't exist.
+    """
+    file_hash = hashlib.sha256()
+    buffer = bytearray(_READ_SIZE)
+    view = memoryview(buffer)
+
+    try:
+        with open(path, "rb", buffering=0) as file:
+            while True:
+                read = file.readinto(buffer)
+
+                if not read:
+                    break
+
+                file_hash.update(view[:read])
+    except FileNotFoundError:
+        return None
+
+    return file_hash.hexdigest()
+
+
+@dataclass
+class VerifyReport:
+    """
+    Outcome of a storage verification.
+
+    Attributes:
+        missing (List[str]): Filenames of the versions in the registry whose
+            artifact file doesn't exist.
+        orphaned (List[str]): Artifact files that aren't in the registry, by
+            filename, and blobs that no artifact file links to, by their path
+            relative to the storage.
+        corrupted (List[str]): Filenames of the artifacts whose file doesn't
+            match the checksum recorded when they were pushed.
+        unverified (List[str]): Filenames of the artifacts without a recorded
+            checksum, such as the ones pushed by older releases.
+        repaired (bool): Whether the registry was repaired, dropping the
+            missing versions and restoring the orphaned artifact files.
+    """
+
+    missing: List[str] = field(default_factory=list)
+    orphaned: List[str] = field(default_factory=list)
+    corrupted: List[str] = field(default_factory=list)
+    unverified: List[str] = field(default_factory=list)
+    repaired: bool = False
+
+    @property
+    def healthy(self) -> bool:
+        """
+        Whether the registry and the artifact files agree and none is corrupted.
+        """
+        return not (self.missing or self.orphaned or self.corrupted)
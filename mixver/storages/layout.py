@@ -0,0 +1,207 @@
+"""
+Directory layouts of the artifact files in a storage.
+
+The "flat" layout keeps all the artifact files in the storage folder, which
+slows down directory operations once it holds hundreds of thousands of files.
+Sharded layouts spread them into subfolders of `artifacts/` instead:
+
+    hash: artifacts/<first 2 hex digits of the SHA-1 of the filename>/
+    name: artifacts/<artifact name>/
+
+The layout of a storage is recorded in `.layout.json` when it's created, and
+storages without it are flat. Existing storages can be moved to another layout
+with `migrate_layout`, or from the command line:
+
+    python -m mixver.storages.layout STORAGE_PATH LAYOUT [--workers N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from mixver.versioning.files import write_atomically
+
+LAYOUTS = ("flat", "hash", "name")
+EXTENSIONS = ("pkl", "json", "blob")
+
+_LAYOUT_FILE = ".layout.json"
+_SHARDS_FOLDER = "artifacts"
+
+
+def check_layout(layout: str) -> None:
+    """
+    Check that a layout exists.
+
+    Args:
+        layout (str): Layout's name.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(
+            f"Unknown layout '{layout}', it must be one of {', '.join(LAYOUTS)}."
+        )
+
+
+def artifact_folder(storage_path: str, layout: str, filename: str) -> Path:
+    """
+    Get the folder of the files of an artifact.
+
+    Args:
+        storage_path (str): Storage path.
+        layout (str): Storage's layout.
+        filename (str): Artifact's filename, `<name>_<version>`.
+
+    Returns:
+        Path: Artifact's folder.
+    """
+    if layout == "flat":
+        return Path(storage_path)
+
+    if layout == "hash":
+        shard = hashlib.sha1(filename.encode("utf8")).hexdigest()[:2]
+    else:
+        shard = filename.rsplit("_", 1)[0]
+
+    return Path(storage_path, _SHARDS_FOLDER, shard)
+
+
+def read_layout(storage_path: str) -> Optional[str]:
+    """
+    Read the layout recorded in a storage.
+
+    Args:
+        storage_path (str): Storage path.
+
+    Returns:
+        Optional[str]: Storage's layout, or None if it isn't recorded.
+    """
+    try:
+        with open(Path(storage_path, _LAYOUT_FILE), encoding="utf8") as file:
+            return json.load(file)["layout"]
+    except FileNotFoundError:
+        return None
+
+
+def write_layout(storage_path: str, layout: str) -> None:
+    """
+    Record the layout of a storage.
+
+    Args:
+        storage_path (str): Storage path.
+        layout (str): Storage's layout.
+    """
+    write_atomically(Path(storage_path, _LAYOUT_FILE), json.dumps({"layout": layout}))
+
+
+def iter_artifact_files(storage_path: str) -> Iterator[Tuple[str, Path]]:
+    """
+    Find the artifact files of a storage, in any layout. Registry and temporary
+    files, which are hidden, are skipped.
+
+    Args:
+        storage_path (str): Storage path.
+
+    Yields:
+        Tuple[str, Path]: Filename of the artifact the file belongs to, and its
+            path.
+    """
+    folders = [Path(storage_path)]
+
+    while folders:
+        folder = folders.pop()
+
+        for entry in os.scandir(folder):
+            if entry.name.startswith("."):
+                continue
+
+            if entry.is_dir():
+                if folder == Path(storage_path) and entry.name != _SHARDS_FOLDER:
+                    # The blob store and other storage folders
+                    continue
+                folders.append(Path(entry.path))
+                continue
+
+            filename, extension = os.path.splitext(entry.name)
+
+            if extension[1:] in EXTENSIONS:
+                yield filename, Path(entry.path)
+
+
+def migrate_layout(
+    storage_path: str, layout: str, max_workers: Optional[int] = None
+) -> int:
+    """
+    Move the artifact files of a storage to another layout. Files are renamed,
+    so deduplicated artifacts keep sharing their blob. An interrupted migration
+    is completed by running it again. The storage must not be used by other
+    processes while it's migrated.
+
+    Args:
+        storage_path (str): Storage path.
+        layout (str): New layout.
+        max_workers (Optional[int]): Threads moving files in parallel. Default
+            is the `ThreadPoolExecutor` default.
+
+    Returns:
+        int: Number of moved files.
+    """
+    check_layout(layout)
+
+    def move(file: Tuple[str, Path]) -> bool:
+        filename, path = file
+        destination = Path(artifact_folder(storage_path, layout, filename), path.name)
+
+        if destination == path:
+            return False
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, destination)
+        return True
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        moved = sum(executor.map(move, list(iter_artifact_files(storage_path))))
+
+    _remove_empty_folders(Path(storage_path, _SHARDS_FOLDER))
+
+    if layout == "flat":
+        try:
+            os.remove(Path(storage_path, _LAYOUT_FILE))
+        except FileNotFoundError:
+            pass
+    else:
+        write_layout(storage_path, layout)
+
+    return moved
+
+
+def _remove_empty_folders(folder: Path) -> None:
+    """
+    Remove the empty folders of a tree, including its root.
+    """
+    if not folder.is_dir():
+        return
+
+    for root, _, _ in os.walk(folder, topdown=False):
+        try:
+            os.rmdir(root)
+        except OSError:
+            # Folders that still hold files
+            continue
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Move the artifact files of a storage to another layout."
+    )
+    parser.add_argument("storage_path")
+    parser.add_argument("layout", choices=LAYOUTS)
+    parser.add_argument("--workers", type=int, default=None)
+    arguments = parser.parse_args()
+
+    count = migrate_layout(
+        arguments.storage_path, arguments.layout, max_workers=arguments.workers
+    )
+    print(f"Moved {count} files to the '{arguments.layout}' layout.")
@@ -1,79 +1,1259 @@
+import json
 import os
-import pickle
+import shutil
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, BinaryIO, Dict, Iterator, Optional
 
-from mixver.cli.visualizer import show_tags
+from mixver import instrumentation
+from mixver.storages import compression, layout, serialization
+from mixver.storages.artifact_cache import ArtifactCache, get_artifact_cache
+from mixver.storages.blob_store import BlobStore
+from mixver.storages.exceptions import CorruptedArtifact
+from mixver.storages.file_cache import FileCache
+from mixver.storages.integrity import HashingWriter, VerifyReport, file_checksum
+from mixver.storages.retention import RetentionPolicy, RetentionReport
+from mixver.versioning.base_versioner import BaseVersioner
+from mixver.versioning.exceptions import EmptyTags
+from mixver.versioning.files import write_atomically
+from mixver.versioning.sqlite_versioner import SQLiteVersioner
 from mixver.versioning.versioner import Versioner
 
+_COPY_SIZE = 1024 * 1024
+
 
 @dataclass
 class LocalStorage:
     """
     Local storage to version ML models.
 
+    Each artifact is stored in a `.pkl` file along with its metadata. The
+    metadata is also written to a `.json` file next to it, so that it can be
+    read without loading the artifact. The SHA-256 of the `.pkl` file is
+    computed while it's written and recorded in the registry.
+
     Attributes:
         storage_path (str): Local path to use as storage.
-        _versioner (Versioner): Artifacts versioning manager.
+        registry (str): Registry backend, either "json" or "sqlite". A SQLite
+            registry created over a storage with a JSON registry starts with its
+            content. Default is "json".
+        registry_cache (bool): Whether to keep the registry files in memory between
+            calls, reloading them only when they change on disk. Only used by the
+            JSON registry. Default is False.
+        registry_journal (bool): Whether to append the registry changes to a
+            journal instead of rewriting the registry files on every push. Only
+            used by the JSON registry. Default is False.
+        registry_snapshot (bool): Whether to resolve the pulled artifacts
+            through a binary snapshot of the registry, memory-mapped and shared
+            by all the processes, such as the workers of a server, instead of
+            parsing the registry files in each of them. Every registry write
+            regenerates the snapshot. Only used by the JSON registry. Default
+            is False.
+        serialization (str): How the artifacts are written, either "pickle" or
+            "stream". The stream serialization writes the large buffers of the
+            artifacts, such as NumPy arrays, in chunks and reads them back
+            without extra copies. Artifacts written with either one can be
+            pulled regardless of this setting. Default is "pickle".
+        memory_map (bool): Whether to memory-map the buffers of the artifacts
+            written with the stream serialization when pulling them, instead of
+            reading them into memory. Processes pulling the same artifact share
+            its pages, and its NumPy arrays are read-only. Default is False.
+        deduplicate (bool): Whether to store the artifacts in a content-addressed
+            blob store, so that identical artifacts are only stored once. Their
+            metadata is then only kept in the `.json` files. Default is False.
+        codec (str): Compression codec of the pushed artifacts: "none", "zlib",
+            "lzma", and "zstd" or "lz4" if their packages are installed. Pulls
+            detect the codec of each artifact. Default is "none".
+        artifact_cache (bool): Whether to keep the pulled artifacts in the
+            process-wide artifact cache, returned by `get_artifact_cache`.
+            Cached artifacts are shared by all the pulls, so they must not be
+            modified. Tags are still looked up in the registry on every pull,
+            which is cheap with `registry_cache`. Default is False.
+        layout (Optional[str]): Directory layout of the artifact files: "flat",
+            which keeps them all in the storage folder, "hash", which spreads
+            them into 256 subfolders by the hash of their filename, or "name",
+            which uses a subfolder per artifact. Sharded layouts keep directory
+            operations fast with hundreds of thousands of artifacts. It's
+            recorded when the storage is created, and existing storages are
+            moved to another layout with `layout.migrate_layout`. Default is
+            None, which is the layout of the storage, or "flat" for new ones.
+        verify_checksums (bool): Whether to check the artifact files against
+            the checksum recorded when they were pushed before loading them,
+            raising `CorruptedArtifact` if they don't match. Artifacts pushed
+            without a checksum aren't checked. Default is False.
+        cache_path (Optional[str]): Local folder where the pulled artifact
+            files are copied, such as a local SSD in front of a storage on NFS,
+            so later pulls of the same versions don't read the storage again.
+            Copies are keyed by filename and checksum, so artifacts pushed
+            without one are always read from the storage, and they're checked
+            against it when they're copied if `verify_checksums` is set. The
+            folder can be shared by all the processes of a host. Default is
+            None, which reads the artifacts from the storage.
+        cache_max_bytes (int): Total size of the copies in the cache folder
+            above which the least recently pulled ones are evicted. Default is
+            10 GiB.
+        _versioner (BaseVersioner): Artifacts versioning manager.
+        _blobs (BlobStore): Deduplicated artifacts store.
+        _artifact_cache (Optional[ArtifactCache]): Pulled artifacts cache.
+        _file_cache (Optional[FileCache]): Local copies of the artifact files.
+        _gc_state_file (str): Filename where an incomplete garbage collection
+            records the last artifact it swept.
     """
 
     storage_path: str
-    _versioner: Versioner = field(init=False)
+    registry: str = "json"
+    registry_cache: bool = False
+    registry_journal: bool = False
+    registry_snapshot: bool = False
+    serialization: str = "pickle"
+    memory_map: bool = False
+    deduplicate: bool = False
+    codec: str = "none"
+    artifact_cache: bool = False
+    layout: Optional[str] = None
+    verify_checksums: bool = False
+    cache_path: Optional[str] = None
+    cache_max_bytes: int = 10 * 1024**3
+    _versioner: BaseVersioner = field(init=False)
+    _blobs: BlobStore = field(init=False)
+    _artifact_cache: Optional[ArtifactCache] = field(init=False, default=None)
+    _file_cache: Optional[FileCache] = field(init=False, default=None)
+    _gc_state_file: str = field(init=False, default=".gc_state.json")
 
     def __post_init__(self) -> None:
         """
         Create the storage.
         """
+        if self.serialization not in serialization.SERIALIZATIONS:
+            raise ValueError(
+                f"Unknown serialization '{self.serialization}', it must be "
+                "'pickle' or 'stream'."
+            )
+
+        if self.codec != "none":
+            compression.get_codec(self.codec)
+
         # TODO: Handle complex paths or random names
         if not os.path.isdir(self.storage_path):
             os.mkdir(self.storage_path)
 
-        self._versioner = Versioner(storage_path=self.storage_path)
+        stored_layout = layout.read_layout(self.storage_path)
+
+        if self.layout is None:
+            self.layout = stored_layout or "flat"
+        else:
+            layout.check_layout(self.layout)
+
+            if self.layout != (stored_layout or "flat"):
+                if stored_layout is not None or next(
+                    layout.iter_artifact_files(self.storage_path), None
+                ):
+                    raise ValueError(
+                        f"The storage uses the '{stored_layout or 'flat'}' layout, "
+                        "it can be moved to another one with "
+                        "mixver.storages.layout.migrate_layout."
+                    )
+
+                layout.write_layout(self.storage_path, self.layout)
+
+        if self.registry == "json":
+            self._versioner = Versioner(
+                storage_path=self.storage_path,
+                cache=self.registry_cache,
+                journal=self.registry_journal,
+                snapshot=self.registry_snapshot,
+            )
+        elif self.registry == "sqlite":
+            self._versioner = SQLiteVersioner(storage_path=self.storage_path)
+        else:
+            raise ValueError(
+                f"Unknown registry '{self.registry}', it must be 'json' or 'sqlite'."
+            )
+
+        self._blobs = BlobStore(storage_path=self.storage_path)
+
+        if self.artifact_cache:
+            self._artifact_cache = get_artifact_cache()
+
+        if self.cache_path is not None:
+            self._file_cache = FileCache(self.cache_path, self.cache_max_bytes)
 
     def push(
-        self, artifact: Any, name: str, metadata: Dict, tags: Optional[list[str]] = None
+        self,
+        artifact: Any,
+        name: str,
+        metadata: Dict,
+        tags: Optional[list[str]] = None,
+        codec: Optional[str] = None,
     ) -> str:
         """
-        Save data into the storage.
+        Save data into the storage. The codec overrides the one of the storage.
         """
-        data = {
-            "artifact": artifact,
-            "metadata": metadata,
-        }
+        codec = self._check_codec(codec)
+        staged = self._stage(artifact, metadata, codec)
 
-        filename = self._versioner.add_artifact(name=name, tags=tags)
+        try:
+            with instrumentation.phase("registry_write"):
+                filename = self._versioner.add_artifact(
+                    name=name, tags=tags, checksum=staged.checksum
+                )
 
-        with open(Path(self.storage_path, f"{filename}.pkl"), "wb") as file:
-            pickle.dump(data, file)
+            self._place(filename, staged)
+        finally:
+            _discard(staged)
 
         return filename
 
+    def push_many(
+        self, artifacts: list[Dict], max_workers: Optional[int] = None
+    ) -> list[str]:
+        """
+        Save several artifacts into the storage, such as the models of an
+        ensemble. Their files are written in parallel, and all of them are then
+        added to the registry in a single update.
+
+        Args:
+            artifacts (list[Dict]): Arguments of `push` for each artifact, that
+                is, its "artifact", "name", "metadata" and optional "tags" and
+                "codec".
+            max_workers (Optional[int]): Maximum number of files written at once.
+                Default is the ThreadPoolExecutor default.
+
+        Returns:
+            list[str]: Artifacts' filenames, in the same order.
+        """
+        codecs = [self._check_codec(item.get("codec")) for item in artifacts]
+        staged: list = []
+
+        try:
+            with ThreadPoolExecutor(max_workers) as executor:
+                writes = [
+                    executor.submit(
+                        self._stage, item["artifact"], item["metadata"], codec
+                    )
+                    for item, codec in zip(artifacts, codecs)
+                ]
+
+                # Every write is waited for, so none is left behind on errors
+                for write in writes:
+                    if write.exception() is None:
+                        staged.append(write.result())
+
+                for write in writes:
+                    write.result()
+
+            with instrumentation.phase("registry_write"):
+                filenames = self._versioner.add_artifacts(
+                    [(item["name"], item.get("tags")) for item in artifacts],
+                    checksums=[files.checksum for files in staged],
+                )
+
+            with ThreadPoolExecutor(max_workers) as executor:
+                placements = [
+                    executor.submit(self._place, filename, files)
+                    for filename, files in zip(filenames, staged)
+                ]
+
+                for placement in placements:
+                    placement.result()
+        finally:
+            for files in staged:
+                _discard(files)
+
+        return filenames
+
     def pull(self, tag: str = "", name: str = "", version: str = "") -> Dict:
         """
         Retrieve data from the storage.
         """
+        with instrumentation.phase("registry_load"):
+            filename = self._get_filename(tag=tag, name=name, version=version)
+
+        return self._read(filename)
+
+    def pull_many(
+        self, references: list[Dict[str, str]], max_workers: Optional[int] = None
+    ) -> list[Dict]:
+        """
+        Retrieve several artifacts from the storage. They are looked up in a
+        single registry read, and their files are read in parallel. References
+        to the same artifact get the same object.
+
+        Args:
+            references (list[Dict[str, str]]): Arguments of `pull` for each
+                artifact, that is, its "tag" or its "name" and optional "version".
+            max_workers (Optional[int]): Maximum number of files read at once.
+                Default is the ThreadPoolExecutor default.
+
+        Returns:
+            list[Dict]: Artifacts' data, in the same order.
+        """
+        if any(not ref.get("tag") and not ref.get("name") for ref in references):
+            raise ValueError("Each reference must have a tag or a name.")
+
+        with instrumentation.phase("registry_load"):
+            filenames = self._versioner.get_artifacts(references)
+
+        unique = list(dict.fromkeys(filenames))
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            loaded = dict(zip(unique, executor.map(self._read, unique)))
+
+        return [loaded[filename] for filename in filenames]
+
+    def pull_metadata(self, tag: str = "", name: str = "", version: str = "") -> Dict:
+        """
+        Retrieve the metadata of an artifact without loading the artifact.
+
+        Args:
+            tag (str): Tag assigned to the artifact. Default is empty.
+            name (str): Artifact's name, used if no tag is passed. Default is
+                empty.
+            version (str): Artifact's version. Default is empty, which means the
+                latest version of the artifact.
+
+        Returns:
+            Dict: Artifact's metadata.
+        """
+        with instrumentation.phase("registry_load"):
+            filename = self._get_filename(tag=tag, name=name, version=version)
+
+        return self._read_metadata(filename)
+
+    def prefetch(self, tags: list[str], max_workers: Optional[int] = None) -> list[str]:
+        """
+        Copy the artifacts that some tags point to into the cache folder, without
+        loading them, so their next pulls don't read the storage. Running it
+        periodically, or after moving the tags, keeps the cache of a serving
+        host warm.
+
+        Args:
+            tags (list[str]): Tags of the artifacts.
+            max_workers (Optional[int]): Maximum number of artifacts copied at
+                once. Default is the ThreadPoolExecutor default.
+
+        Returns:
+            list[str]: Filenames of the artifacts, in the same order.
+        """
+        if self._file_cache is None:
+            raise ValueError("Prefetching needs a storage with a cache_path.")
+
+        with instrumentation.phase("registry_load"):
+            filenames = self._versioner.get_artifacts([{"tag": tag} for tag in tags])
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            list(executor.map(self._fill_cache, dict.fromkeys(filenames)))
+
+        return filenames
+
+    def list_metadata(self, name: str) -> Dict[str, Dict]:
+        """
+        Retrieve the metadata of all the versions of an artifact without loading
+        any of them.
+
+        Args:
+            name (str): Artifact's name.
+
+        Returns:
+            Dict[str, Dict]: Metadata of each version, from the oldest to the
+                newest.
+        """
+        return {
+            version: self._read_metadata(filename)
+            for version, filename in self._versioner.get_filenames(name=name).items()
+        }
+
+    def list_artifacts(
+        self,
+        name_prefix: str = "",
+        since: Optional[float] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        page_size: int = 1000,
+    ) -> Iterator[Dict]:
+        """
+        Lazily list the artifact versions, sorted by name and version. They are
+        read from the registry in pages as the iteration goes on, so browsing a
+        large registry doesn't load all of it.
+
+        Args:
+            name_prefix (str): Prefix of the names of the listed artifacts.
+                Default is empty, which lists all of them.
+            since (Optional[float]): UNIX time from which the listed versions
+                were pushed. Default is None, which lists all of them.
+            limit (Optional[int]): Maximum number of listed versions. Default is
+                None, which doesn't limit them.
+            cursor (Optional[str]): Cursor of a listed version, to resume the
+                listing after it. Default is None, which starts from the first
+                version.
+            page_size (int): Number of versions read from the registry at once.
+                Default is 1000.
+
+        Yields:
+            Dict: Name, version, filename and push time of each version, along
+                with its cursor.
+        """
+        after = tuple(json.loads(cursor)) if cursor else None
+        remaining = limit
+
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            page = self._versioner.list_artifacts(
+                name_prefix=name_prefix, since=since, after=after, limit=size
+            )
+
+            for entry in page:
+                after = (entry["name"], entry["version"])
+                yield {**entry, "cursor": json.dumps(after)}
+
+            if len(page) < size:
+                return
+
+            if remaining is not None:
+                remaining -= len(page)
+
+    def get_tags(self, name: str, version: str = "") -> list[str]:
+        """
+        Get the tags pointing to an artifact.
+
+        Args:
+            name (str): Artifact's name.
+            version (str): Artifact's version. Default is empty, which means the
+                tags of all the versions of the artifact are returned.
+
+        Returns:
+            list[str]: Sorted tags.
+        """
+        return self._versioner.get_tags(name=name, version=version)
+
+    def get_tag_history(self, tag: str) -> list[Dict]:
+        """
+        Get the artifacts a tag pointed to, from the oldest to the newest.
+
+        Args:
+            tag (str): Tag's name.
+
+        Returns:
+            list[Dict]: Name, version, filename and UNIX time of each change.
+                They are None when the tag was detached by a removal.
+        """
+        return self._versioner.get_tag_history(tag=tag)
+
+    def rollback_tag(self, tag: str, steps: int = 1) -> str:
+        """
+        Point a tag back to the artifact it pointed to before its last changes,
+        without moving any artifact file.
+
+        Args:
+            tag (str): Tag's name.
+            steps (int): Number of changes to go back. Default is 1.
+
+        Returns:
+            str: Filename of the artifact the tag points to.
+        """
+        return self._versioner.rollback_tag(tag=tag, steps=steps)
+
+    def update_tags(self, name: str, tags: list[str], version: str = "") -> None:
+        """
+        Point tags to an artifact, moving them from the artifacts they pointed
+        to.
+
+        Args:
+            name (str): Artifact's name.
+            tags (list[str]): Tags to point to the artifact.
+            version (str): Artifact's version. Default is empty, which means the
+                latest version of the artifact.
+        """
+        with instrumentation.phase("registry_write"):
+            self._versioner.update_tags(name=name, tags=tags, version=version)
+
+    def remove(self, name: str, version: str = "") -> None:
+        """
+        Remove an artifact from the storage, along with its tags. Deduplicated
+        artifacts are only deleted from the blob store once no other artifact
+        has the same content.
+
+        Args:
+            name (str): Artifact's name.
+            version (str): Artifact's version. Default is empty, which means all
+                the versions of the artifact will be removed.
+        """
+        with instrumentation.phase("registry_write"):
+            if version:
+                filenames = [
+                    self._versioner.get_artifact_by_version(name=name, version=version)
+                ]
+            else:
+                filenames = list(self._versioner.get_filenames(name=name).values())
+
+            self._versioner.remove_artifact(name=name, version=version)
+
+        for filename in filenames:
+            self._remove_files(filename)
+
+    def collect_garbage(
+        self,
+        policy: RetentionPolicy,
+        dry_run: bool = False,
+        max_names: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ) -> RetentionReport:
+        """
+        Remove the artifact versions that a retention policy doesn't keep, along
+        with the files that no version refers to anymore.
+
+        Artifacts are swept by name. When `max_names` is given, only that many
+        artifacts are swept, and the next collection resumes after the last one,
+        so large storages can be collected incrementally. The versions are
+        removed from the registry before their files, so a collection that's
+        interrupted only leaves orphaned files behind, which are deleted once a
+        sweep goes through all the artifacts. Only the files named like those of
+        the artifacts, `<name>_<version>`, can be orphans, so other files kept
+        in the storage folder aren't deleted.
+
+        Args:
+            policy (RetentionPolicy): Versions to keep.
+            dry_run (bool): Whether to only report what would be removed, without
+                removing anything or moving the sweep forward. Default is False.
+            max_names (Optional[int]): Maximum number of artifacts to sweep.
+                Default is None, which sweeps all the remaining ones.
+            max_workers (Optional[int]): Threads deleting files in parallel.
+                Default is the `ThreadPoolExecutor` default.
+
+        Returns:
+            RetentionReport: Removed versions and files, and reclaimed space.
+        """
+        state_path = Path(self.storage_path, self._gc_state_file)
+
+        try:
+            cursor = json.loads(state_path.read_text("utf8"))["cursor"]
+        except (FileNotFoundError, ValueError, KeyError):
+            cursor = ""
+
+        # Files are listed before the registry is read, so the ones of ongoing
+        # pushes, which add their versions first, aren't taken for orphans
+        stored = self._list_stored_filenames()
+        registry = self._versioner.get_all_filenames()
+
+        names = [name for name in registry if name > cursor]
+        swept = names[:max_names] if max_names is not None else names
+        report = RetentionReport(dry_run=dry_run, complete=len(swept) == len(names))
+
+        try:
+            tags_data = self._versioner.get_tags_data_for_visualization()
+        except EmptyTags:
+            tags_data = ([], [], [], [])
+
+        tagged: Dict[str, set] = {}
+
+        for _, name, version, _ in zip(*tags_data):
+            tagged.setdefault(name, set()).add(version)
+
+        now = time.time()
+        push_times = self._versioner.get_all_push_times()
+        removals = []
+
+        for name in swept:
+            filenames = registry[name]
+            pushed_at = {
+                version: (
+                    push_times[filename]
+                    if filename in push_times
+                    else self._pushed_at(filename, now)
+                )
+                for version, filename in filenames.items()
+            }
+
+            for version in policy.select(pushed_at, tagged.get(name, set()), now):
+                removals.append((name, version))
+                report.removed.append(filenames[version])
+
+        orphaned_filenames, orphaned_blobs = [], []
+
+        if report.complete:
+            referenced = {
+                filename
+                for filenames in registry.values()
+                for filename in filenames.values()
+            }
+            orphaned_filenames = sorted(
+                filename
+                for filename in stored - referenced
+                if _is_artifact_filename(filename)
+            )
+            orphaned_blobs = self._blobs.orphans()
+            report.orphans = [
+                *orphaned_filenames,
+                *(
+                    str(self._blobs.path(digest).relative_to(self.storage_path))
+                    for digest in orphaned_blobs
+                ),
+            ]
+
+        report.reclaimed_bytes = self._reclaimable_bytes(
+            [*report.removed, *orphaned_filenames], orphaned_blobs
+        )
+
+        if dry_run:
+            return report
+
+        for name, version in removals:
+            self._versioner.remove_artifact(name=name, version=version)
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            list(executor.map(self._remove_files, report.removed))
+            list(executor.map(self._remove_files, orphaned_filenames))
+            list(executor.map(self._blobs.release, orphaned_blobs))
+
+        if report.complete:
+            try:
+                os.remove(state_path)
+            except FileNotFoundError:
+                pass
+        elif swept:
+            write_atomically(state_path, json.dumps({"cursor": swept[-1]}))
+
+        return report
+
+    def verify(
+        self, repair: bool = False, max_workers: Optional[int] = None
+    ) -> VerifyReport:
+        """
+        Check the artifact files of the storage against the registry. Files are
+        hashed in parallel by a process pool and compared with the checksums
+        recorded when they were pushed.
+
+        When repairing, the versions whose artifact file is missing are removed
+        from the registry, and the artifact files that aren't in it are added
+        back, without tags, which rebuilds a lost registry from the files on
+        disk. Files left by interrupted removals are restored as well, so a
+        garbage collection should run first if they aren't wanted. Corrupted
+        artifacts are only reported. The storage must not be used by other
+        processes while it's repaired.
+
+        Args:
+            repair (bool): Whether to repair the registry. Default is False.
+            max_workers (Optional[int]): Processes hashing files in parallel.
+                Default is the number of CPUs.
+
+        Returns:
+            VerifyReport: Missing, orphaned, corrupted and unverified artifacts.
+        """
+        report = VerifyReport(repaired=repair)
+        stored = self._list_artifact_files()
+        registered = {
+            filename
+            for filenames in self._versioner.get_all_filenames().values()
+            for filename in filenames.values()
+        }
+        checksums = self._versioner.get_all_checksums()
+
+        # Listings skip hidden files, such as the ones of names starting with a
+        # dot, so the registered files not listed are looked up one by one
+        for filename in registered - set(stored):
+            path = self._path(filename, "pkl")
+
+            if path.is_file():
+                stored[filename] = str(path)
+
+        report.missing = sorted(registered - set(stored))
+        report.orphaned = sorted(set(stored) - registered)
+        expected = {}
+
+        for filename in sorted(set(stored) & registered):
+            checksum = checksums.get(filename)
+
+            # Deduplicated artifacts pushed without a checksum have their digest
+            if checksum is None and os.path.isfile(self._path(filename, "blob")):
+                checksum = self._path(filename, "blob").read_text("utf8")
+
+            if checksum is None:
+                report.unverified.append(filename)
+            else:
+                expected[filename] = checksum
+
+        # Orphans are only hashed to record their checksums when restored
+        to_hash = list(expected) + (report.orphaned if repair else [])
+        digests: Dict[str, Optional[str]] = {}
+
+        if to_hash:
+            digests = dict(
+                zip(
+                    to_hash,
+                    self._hash_artifact_files(
+                        [stored[filename] for filename in to_hash], max_workers
+                    ),
+                )
+            )
+
+        for filename, checksum in expected.items():
+            if digests[filename] is None:
+                # Removed while the storage was being verified
+                report.missing.append(filename)
+            elif digests[filename] != checksum:
+                report.corrupted.append(filename)
+
+        if repair:
+            for filename in report.missing:
+                name, version = filename.rsplit("_", 1)
+                self._versioner.remove_artifact(name=name, version=version)
+
+            restored = []
+
+            for filename in report.orphaned:
+                if _is_artifact_filename(filename):
+                    name, version = filename.rsplit("_", 1)
+                    restored.append(
+                        (
+                            name,
+                            version,
+                            digests[filename],
+                            self._modified_at(stored[filename]),
+                        )
+                    )
+
+            self._versioner.restore_artifacts(restored)
+
+        report.orphaned.extend(
+            str(self._blobs.path(digest).relative_to(self.storage_path))
+            for digest in self._blobs.orphans()
+        )
+
+        return report
+
+    def _list_artifact_files(self) -> Dict[str, str]:
+        """
+        Get the artifact files of the storage, by filename.
+        """
+        return {
+            filename: str(path)
+            for filename, path in layout.iter_artifact_files(self.storage_path)
+            if path.suffix == ".pkl"
+        }
+
+    def _hash_artifact_files(
+        self, paths: list[str], max_workers: Optional[int]
+    ) -> list[Optional[str]]:
+        """
+        Compute the checksums of some artifact files across a process pool. They
+        are None for the files that don't exist anymore.
+        """
+        workers = max_workers or os.cpu_count() or 1
+
+        with ProcessPoolExecutor(workers) as executor:
+            return list(
+                executor.map(
+                    file_checksum,
+                    paths,
+                    chunksize=max(1, len(paths) // (4 * workers)),
+                )
+            )
+
+    def _modified_at(self, path: str) -> float:
+        """
+        Get when an artifact file was last modified.
+        """
+        return os.stat(path).st_mtime
+
+    def _list_stored_filenames(self) -> set:
+        """
+        Get the filenames of the artifacts that have files in the storage.
+        """
+        return {
+            filename for filename, _ in layout.iter_artifact_files(self.storage_path)
+        }
+
+    def _pushed_at(self, filename: str, now: float) -> float:
+        """
+        Get when an artifact was pushed without its push time in the registry,
+        as with the versions pushed by older releases, from the modification
+        time of its metadata file, which isn't shared by deduplicated artifacts.
+        """
+        for extension in ("json", "pkl"):
+            try:
+                return os.stat(self._path(filename, extension)).st_mtime
+            except FileNotFoundError:
+                continue
+
+        return now
+
+    def _reclaimable_bytes(self, filenames: list[str], digests: list[str]) -> int:
+        """
+        Get the disk space freed by deleting the files of some artifacts and some
+        orphaned blobs. Artifact files that are hard links, such as deduplicated
+        ones, only free their space once all their links are deleted.
+        """
+        size = sum(os.stat(self._blobs.path(digest)).st_size for digest in digests)
+        # Size and remaining links of each artifact file, by inode
+        inodes: Dict[tuple, list] = {}
+
+        for filename in filenames:
+            for extension in ("json", "blob"):
+                try:
+                    size += os.stat(self._path(filename, extension)).st_size
+                except FileNotFoundError:
+                    pass
+
+            try:
+                stat = os.stat(self._path(filename, "pkl"))
+            except FileNotFoundError:
+                continue
+
+            key = (stat.st_dev, stat.st_ino)
+
+            if key not in inodes:
+                inodes[key] = [stat.st_size, stat.st_nlink - self._blob_links(filename)]
+
+            inodes[key][1] -= 1
+
+        return size + sum(
+            file_size for file_size, remaining in inodes.values() if remaining <= 0
+        )
+
+    def _blob_links(self, filename: str) -> int:
+        """
+        Get the number of links of an artifact file held by the blob store, which
+        are released along with the last artifact file.
+        """
+        try:
+            digest = self._path(filename, "blob").read_text("utf8")
+            blob = os.stat(self._blobs.path(digest))
+        except FileNotFoundError:
+            return 0
+
+        artifact = os.stat(self._path(filename, "pkl"))
+
+        return int((blob.st_dev, blob.st_ino) == (artifact.st_dev, artifact.st_ino))
+
+    def _path(self, filename: str, extension: str) -> Path:
+        """
+        Get the path of one of the files of an artifact, in the storage layout.
+        """
+        return Path(
+            layout.artifact_folder(self.storage_path, self.layout, filename),
+            f"{filename}.{extension}",
+        )
+
+    def _get_filename(self, tag: str = "", name: str = "", version: str = "") -> str:
+        """
+        Get the filename of an artifact from its tag, or its name and version.
+        """
         if tag:
-            filename = self._versioner.get_artifact_by_tag(tag=tag)
-        elif name:
-            filename = self._versioner.get_artifact_by_version(
-                name=name, version=version
+            return self._versioner.get_artifact_by_tag(tag=tag)
+
+        if name:
+            return self._versioner.get_artifact_by_version(name=name, version=version)
+
+        message = (
+            "The identifier must be an integer to identify an artifact by its version or "
+            "a string to identify the artifact by its tag."
+        )
+        raise ValueError(message)
+
+    def _check_codec(self, codec: Optional[str]) -> str:
+        """
+        Get the codec of a push, checking that it's available.
+        """
+        codec = codec or self.codec
+
+        if codec != "none":
+            compression.get_codec(codec)
+
+        return codec
+
+    def _stage(self, artifact: Any, metadata: Dict, codec: str) -> "_StagedFile":
+        """
+        Write the artifact file of a push to a temporary file, before its
+        version is known, computing its checksum on the way. The metadata file
+        is serialized first, so metadata that can't be written fails the push
+        before anything is registered. When the instrumentation is enabled, the
+        writes are timed apart from the serialization.
+        """
+        metadata_json = _metadata_json(metadata)
+        data = {
+            "artifact": artifact,
+            "metadata": metadata,
+        }
+        timed = None
+        seconds = 0.0
+
+        def dump(file) -> None:
+            nonlocal timed, seconds
+
+            if not instrumentation.enabled():
+                serialization.dump(
+                    data, file, serialization=self.serialization, codec=codec
+                )
+                return
+
+            timed = instrumentation.TimedFile(file)
+            start = time.perf_counter()
+            serialization.dump(
+                data, timed, serialization=self.serialization, codec=codec
             )
+            seconds = time.perf_counter() - start
+
+        if self.deduplicate:
+            # Without the metadata, identical artifacts have the same content
+            del data["metadata"]
+            temporary, checksum = self._blobs.write(dump)
+        else:
+            temporary = Path(self.storage_path, f".{uuid.uuid4().hex}.tmp")
+
+            try:
+                with open(temporary, "xb") as file:
+                    writer = HashingWriter(file)
+                    dump(writer)
+            except BaseException:
+                os.unlink(temporary)
+                raise
+
+            checksum = writer.hash.hexdigest()
+
+        staged = _StagedFile(temporary, checksum, self.deduplicate, metadata_json)
+
+        if timed is not None:
+            staged.write_seconds = timed.seconds
+            staged.nbytes = timed.nbytes
+            instrumentation.emit("serialize", seconds - timed.seconds, timed.nbytes)
+
+        return staged
+
+    def _place(self, filename: str, staged: "_StagedFile") -> None:
+        """
+        Write the metadata file of a pushed artifact and move its staged artifact
+        file into place, so a crash never leaves a partially written one.
+        """
+        start = time.perf_counter()
+        path = self._path(filename, "pkl")
+
+        if self.layout != "flat":
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._write_metadata(filename, staged.metadata_json)
+
+        if staged.blob:
+            self._blobs.link(staged.path, staged.checksum, path)
+            write_atomically(self._path(filename, "blob"), staged.checksum)
         else:
-            message = (
-                "The identifier must be an integer to identify an artifact by its version or "
-                "a string to identify the artifact by its tag."
+            os.replace(staged.path, path)
+
+        if instrumentation.enabled():
+            instrumentation.emit(
+                "blob_write",
+                staged.write_seconds + time.perf_counter() - start,
+                staged.nbytes,
+            )
+
+    def _read(self, filename: str) -> Dict:
+        """
+        Read an artifact along with its metadata, from the artifact cache if
+        it's enabled.
+        """
+        if self._artifact_cache is None:
+            return self._read_file(filename)
+
+        return self._artifact_cache.get_or_load(
+            os.path.abspath(self._path(filename, "pkl")),
+            lambda: self._read_file(filename),
+        )
+
+    def _read_file(self, filename: str) -> Dict:
+        """
+        Read an artifact along with its metadata from its files.
+        """
+        # Cached copies are checked when they're copied
+        if self.verify_checksums and self._file_cache is None:
+            self._verify_checksum(filename)
+
+        data = self._load(filename)
+
+        # Deduplicated artifacts are stored without their metadata
+        if "metadata" not in data:
+            data["metadata"] = self._read_metadata(filename)
+
+        return data
+
+    def _verify_checksum(self, filename: str) -> None:
+        """
+        Check an artifact file against the checksum recorded when it was pushed,
+        or the digest of its blob for deduplicated artifacts pushed without one.
+        """
+        expected = self._expected_checksum(filename)
+
+        if expected is None:
+            return
+
+        path = self._path(filename, "pkl")
+
+        if file_checksum(path) != expected:
+            raise CorruptedArtifact(
+                str(path), "its checksum doesn't match the one recorded at push time"
+            )
+
+    def _expected_checksum(self, filename: str) -> Optional[str]:
+        """
+        Get the checksum of an artifact file recorded when it was pushed, or the
+        digest of its blob for deduplicated artifacts pushed without one.
+        """
+        name, version = filename.rsplit("_", 1)
+        expected = self._versioner.get_checksum(name, version)
+
+        if expected is None:
+            try:
+                expected = self._path(filename, "blob").read_text("utf8")
+            except FileNotFoundError:
+                return None
+
+        return expected
+
+    def _open_artifact_file(self, filename: str) -> BinaryIO:
+        """
+        Open the file of an artifact, or its copy in the cache folder if it's
+        enabled, copying it first if it isn't there.
+        """
+        if self._file_cache is not None:
+            checksum = self._expected_checksum(filename)
+
+            if checksum is not None:
+                return self._file_cache.open(
+                    f"{filename}.{checksum}.pkl",
+                    lambda path: self._fetch(filename, checksum, path),
+                )
+
+        return self._open_storage_file(filename)
+
+    def _open_storage_file(self, filename: str) -> BinaryIO:
+        """
+        Open the file of an artifact in the storage.
+        """
+        return open(self._path(filename, "pkl"), "rb")
+
+    def _fill_cache(self, filename: str) -> None:
+        """
+        Copy an artifact file into the cache folder if it isn't there.
+        """
+        checksum = self._expected_checksum(filename)
+
+        if checksum is not None:
+            self._file_cache.fill(
+                f"{filename}.{checksum}.pkl",
+                lambda path: self._fetch(filename, checksum, path),
+            )
+
+    def _fetch(self, filename: str, checksum: str, path: Path) -> None:
+        """
+        Copy an artifact file from the storage into a file of the cache folder,
+        checking it on the way if `verify_checksums` is set.
+        """
+        start = time.perf_counter()
+        source = self._path(filename, "pkl")
+
+        with open(source, "rb") as file, open(path, "xb") as copy:
+            writer = HashingWriter(copy)
+            shutil.copyfileobj(file, writer, _COPY_SIZE)
+            copy.flush()
+            os.fsync(copy.fileno())
+
+        if self.verify_checksums and writer.hash.hexdigest() != checksum:
+            raise CorruptedArtifact(
+                str(source), "its checksum doesn't match the one recorded at push time"
             )
-            raise ValueError(message)
 
-        with open(Path(self.storage_path, f"{filename}.pkl"), "rb") as file:
-            data = pickle.load(file)
+        if instrumentation.enabled():
+            instrumentation.emit(
+                "blob_read", time.perf_counter() - start, os.path.getsize(path)
+            )
+
+    def _load(self, filename: str) -> Dict:
+        with self._open_artifact_file(filename) as file:
+            if not instrumentation.enabled():
+                return serialization.load(file, memory_map=self.memory_map)
+
+            # The reads are timed apart from the deserialization. Memory-mapped
+            # buffers are only read when they're accessed, after the pull.
+            timed = instrumentation.TimedFile(file)
+            start = time.perf_counter()
+            data = serialization.load(timed, memory_map=self.memory_map)
+            seconds = time.perf_counter() - start
+
+        instrumentation.emit("blob_read", timed.seconds, timed.nbytes)
+        instrumentation.emit("deserialize", seconds - timed.seconds, timed.nbytes)
 
         return data
 
-    def visualize(self):
+    def _remove_files(self, filename: str) -> None:
+        """
+        Delete the files of an artifact, releasing its blob if it has one.
+        """
+        try:
+            digest = self._path(filename, "blob").read_text("utf8")
+        except FileNotFoundError:
+            digest = ""
+
+        if self._artifact_cache is not None:
+            self._artifact_cache.invalidate(
+                os.path.abspath(self._path(filename, "pkl"))
+            )
+
+        for extension in ("pkl", "json", "blob"):
+            try:
+                os.remove(self._path(filename, extension))
+            except FileNotFoundError:
+                pass
+
+        if digest:
+            self._blobs.release(digest)
+
+    def _write_metadata(self, filename: str, content: str) -> None:
+        """
+        Write the metadata file of an artifact, serialized by `_metadata_json`.
+        """
+        write_atomically(self._path(filename, "json"), content)
+
+    def _read_metadata(self, filename: str) -> Dict:
+        """
+        Read the metadata file of an artifact. Artifacts pushed before metadata
+        files existed are loaded once to create it.
         """
-        Visualize the tags and their associated artifacts.
+        try:
+            with open(self._path(filename, "json"), encoding="utf8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            self._write_metadata(
+                filename, _metadata_json(self._load(filename)["metadata"])
+            )
+
+        return self._read_metadata(filename)
+
+    def visualize(
+        self,
+        view: str = "tags",
+        tag_pattern: str = "*",
+        name_pattern: str = "*",
+        limit: Optional[int] = None,
+    ) -> int:
         """
-        tags, names, versions, paths = self._versioner.get_tags_data_for_visualization()
-        show_tags(tags, names, versions, paths)
+        Visualize the tags and their associated artifacts, or the artifacts and
+        their latest versions. The rows are printed while they're read from the
+        registry. Patterns are case-sensitive, and `[!...]` negates a set, with
+        either registry backend.
+
+        Args:
+            view (str): Either "tags" or "versions". Default is "tags".
+            tag_pattern (str): Shell-style pattern the shown tags must match.
+                Only used by the "tags" view. Default is "*".
+            name_pattern (str): Shell-style pattern the names of the shown
+                artifacts must match. Default is "*".
+            limit (Optional[int]): Maximum number of rows to show. Default is
+                None, which shows all of them.
+
+        Returns:
+            int: Number of shown rows.
+        """
+        # rich takes longer to import than the rest of the package, so headless
+        # scripts don't import it
+        from mixver.cli.visualizer import show_tags, show_versions
+
+        if view == "tags":
+            return show_tags(
+                self._versioner.iter_tags(tag_pattern, name_pattern), limit=limit
+            )
+
+        if view == "versions":
+            return show_versions(
+                self._versioner.iter_latest_versions(name_pattern), limit=limit
+            )
+
+        raise ValueError(f"Unknown view '{view}', it must be either tags or versions.")
+
+
+@dataclass
+class _StagedFile:
+    """
+    Artifact file of a push, written before its version is known.
+
+    Attributes:
+        path (Path): Temporary file.
+        checksum (str): Its SHA-256.
+        blob (bool): Whether it's a blob of the blob store.
+        metadata_json (str): Content of the metadata file.
+        write_seconds (float): Time spent writing it, only measured when the
+            instrumentation is enabled. Default is 0.
+        nbytes (int): Bytes written, only counted when the instrumentation is
+            enabled. Default is 0.
+    """
+
+    path: Path
+    checksum: str
+    blob: bool
+    metadata_json: str
+    write_seconds: float = 0.0
+    nbytes: int = 0
+
+
+def _is_artifact_filename(filename: str) -> bool:
+    """
+    Check whether a filename follows the `<name>_<version>` naming of the
+    artifact files.
+    """
+    name, _, version = filename.rpartition("_")
+
+    return bool(name) and version.isdigit()
+
+
+def _discard(staged: _StagedFile) -> None:
+    """
+    Delete the temporary file of a push if it wasn't moved into place.
+    """
+    try:
+        os.unlink(staged.path)
+    except FileNotFoundError:
+        pass
+
+
+def _metadata_json(metadata: Dict) -> str:
+    """
+    Serialize the metadata of an artifact for its metadata file. Values that
+    JSON can't represent, such as NumPy scalars, are converted to lists or
+    numbers when possible, and to strings otherwise, and so are the keys that
+    JSON can't represent, such as tuples.
+    """
+    try:
+        return json.dumps(metadata, default=_to_json)
+    except TypeError:
+        return json.dumps(_json_keys(metadata), default=_to_json)
+
+
+def _json_keys(value: Any) -> Any:
+    """
+    Convert the dictionary keys of a metadata value that the json module can't
+    serialize to strings.
+    """
+    if isinstance(value, dict):
+        return {
+            (
+                key
+                if key is None or isinstance(key, (str, int, float, bool))
+                else str(key)
+            ): _json_keys(item)
+            for key, item in value.items()
+        }
+
+    if isinstance(value, (list, tuple)):
+        return [_json_keys(item) for item in value]
+
+    return value
+
+
+def _to_json(value: Any) -> Any:
+    """
+    Convert a metadata value that the json module can't serialize.
+    """
+    if hasattr(value, "tolist"):
+        return value.tolist()
+
+    return str(value)
@@ -0,0 +1,279 @@
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+from mixver import instrumentation
+from mixver.storages import serialization, transfer
+from mixver.storages.exceptions import CorruptedArtifact
+from mixver.storages.integrity import file_checksum
+from mixver.storages.local_storage import LocalStorage, _StagedFile
+from mixver.storages.object_store import ObjectStore
+
+
+@dataclass
+class ObjectStorage(LocalStorage):
+    """
+    Storage that keeps the artifact files in an object store, such as S3, while
+    the registry stays in the storage path, which must be shared by all the
+    processes using the storage.
+
+    Each artifact is stored in a `<filename>.pkl` object, along with a
+    `<filename>.json` object with its metadata. Artifacts larger than a part are
+    uploaded and downloaded in parallel parts, and pulled artifacts go through a
+    temporary file in the storage path before they're loaded.
+
+    With a `cache_path`, pulled artifacts are downloaded into the cache folder
+    instead, and later pulls of the same versions read them from there. The
+    artifacts can't be deduplicated, and they can only be memory-mapped from
+    the cache folder, since both need their files on a local filesystem. With
+    `artifact_cache`, pulled artifacts are cached by object key, along with the
+    checksum recorded when they were pushed and the size and modification time
+    of their objects, so each pull still requests the attributes of the object.
+    The rest of the attributes of `LocalStorage` work the same way.
+
+    Attributes:
+        object_store (Optional[ObjectStore]): Object store of the artifact
+            files. It's required.
+        part_size (int): Size in bytes of the parts of the transfers. Default
+            is 8 MiB.
+        max_transfers (int): Maximum number of parts of an artifact transferred
+            at once. Default is 8.
+    """
+
+    object_store: Optional[ObjectStore] = None
+    part_size: int = transfer.PART_SIZE
+    max_transfers: int = transfer.MAX_WORKERS
+
+    def __post_init__(self) -> None:
+        """
+        Create the storage.
+        """
+        if self.object_store is None:
+            raise ValueError("The object storage needs an object store.")
+
+        if self.deduplicate:
+            raise ValueError(
+                "The artifacts of an object storage can't be deduplicated."
+            )
+
+        if self.memory_map and self.cache_path is None:
+            raise ValueError(
+                "The artifacts of an object storage can only be memory-mapped "
+                "from a cache_path."
+            )
+
+        super().__post_init__()
+
+    def _place(self, filename: str, staged: _StagedFile) -> None:
+        """
+        Upload the metadata and the staged artifact file of a pushed artifact.
+        The artifact object only appears once it's completely uploaded.
+        """
+        start = time.perf_counter()
+        self._write_metadata(filename, staged.metadata_json)
+        transfer.upload_file(
+            self.object_store,
+            f"{filename}.pkl",
+            staged.path,
+            part_size=self.part_size,
+            max_workers=self.max_transfers,
+        )
+
+        if instrumentation.enabled():
+            instrumentation.emit(
+                "blob_write",
+                staged.write_seconds + time.perf_counter() - start,
+                os.path.getsize(staged.path),
+            )
+
+    def _read(self, filename: str) -> Dict:
+        """
+        Read an artifact along with its metadata, from the artifact cache if
+        it's enabled. There's no local file to check the cached artifacts
+        against, so they're checked against the attributes of their objects.
+        """
+        if self._artifact_cache is None:
+            return self._read_file(filename)
+
+        info = self.object_store.head(f"{filename}.pkl")
+        checksum = self._expected_checksum(filename)
+
+        return self._artifact_cache.get_or_load_signed(
+            self._cache_key(filename),
+            (checksum, info.size, info.modified),
+            info.size,
+            lambda: self._read_file(filename),
+            # Checksums tell apart the objects replaced at once
+            modified_ns=None if checksum else int(info.modified * 1e9),
+        )
+
+    def _cache_key(self, filename: str) -> str:
+        """
+        Get the key of an artifact in the artifact cache, which is shared by
+        the storages of the process.
+        """
+        return f"{os.path.abspath(self.storage_path)}:{filename}.pkl"
+
+    def _read_file(self, filename: str) -> Dict:
+        """
+        Download an artifact into a temporary file and load it, unless it can
+        be read from the cache folder.
+        """
+        if self._file_cache is not None:
+            return super()._read_file(filename)
+
+        temporary = Path(self.storage_path, f".{uuid.uuid4().hex}.tmp")
+
+        try:
+            start = time.perf_counter()
+            nbytes = self._download(filename, temporary)
+            downloaded = time.perf_counter()
+
+            if self.verify_checksums:
+                self._verify_download(filename, temporary)
+
+            with open(temporary, "rb") as file:
+                data = serialization.load(file)
+        finally:
+            try:
+                os.unlink(temporary)
+            except FileNotFoundError:
+                pass
+
+        if instrumentation.enabled():
+            loaded = time.perf_counter()
+            instrumentation.emit("blob_read", downloaded - start, nbytes)
+            instrumentation.emit("deserialize", loaded - downloaded, nbytes)
+
+        return data
+
+    def _open_storage_file(self, filename: str) -> BinaryIO:
+        """
+        Download an artifact into a temporary file and open it, for the pulls
+        through the cache folder of artifacts pushed without a checksum.
+        """
+        temporary = Path(self.storage_path, f".{uuid.uuid4().hex}.tmp")
+
+        try:
+            self._download(filename, temporary)
+            return open(temporary, "rb")
+        finally:
+            try:
+                os.unlink(temporary)
+            except FileNotFoundError:
+                pass
+
+    def _fetch(self, filename: str, checksum: str, path: Path) -> None:
+        """
+        Download an artifact into a file of the cache folder, checking it if
+        `verify_checksums` is set.
+        """
+        start = time.perf_counter()
+        nbytes = self._download(filename, path)
+
+        if self.verify_checksums:
+            self._verify_download(filename, path, checksum)
+
+        if instrumentation.enabled():
+            instrumentation.emit("blob_read", time.perf_counter() - start, nbytes)
+
+    def _download(self, filename: str, path: Path) -> int:
+        """
+        Download an artifact into a file, in parallel parts.
+        """
+        return transfer.download_file(
+            self.object_store,
+            f"{filename}.pkl",
+            path,
+            part_size=self.part_size,
+            max_workers=self.max_transfers,
+        )
+
+    def _verify_download(
+        self, filename: str, path: Path, expected: Optional[str] = None
+    ) -> None:
+        """
+        Check a downloaded artifact file against the checksum recorded when it
+        was pushed.
+        """
+        if expected is None:
+            expected = self._expected_checksum(filename)
+
+        if expected is not None and file_checksum(str(path)) != expected:
+            raise CorruptedArtifact(
+                f"{filename}.pkl",
+                "its checksum doesn't match the one recorded at push time",
+            )
+
+    def _write_metadata(self, filename: str, content: str) -> None:
+        self.object_store.put(f"{filename}.json", content.encode("utf8"))
+
+    def _read_metadata(self, filename: str) -> Dict:
+        return json.loads(self.object_store.get(f"{filename}.json"))
+
+    def _remove_files(self, filename: str) -> None:
+        if self._artifact_cache is not None:
+            self._artifact_cache.invalidate(self._cache_key(filename))
+
+        for extension in ("pkl", "json"):
+            self.object_store.delete(f"{filename}.{extension}")
+
+    def _list_artifact_files(self) -> Dict[str, str]:
+        return {
+            key[: -len(".pkl")]: key
+            for key in self.object_store.list()
+            if key.endswith(".pkl")
+        }
+
+    def _hash_artifact_files(
+        self, paths: list[str], max_workers: Optional[int]
+    ) -> list[Optional[str]]:
+        """
+        Compute the checksums of some artifact objects, streaming them in
+        parallel threads, since they're bound by the transfers.
+        """
+        with ThreadPoolExecutor(max_workers or self.max_transfers) as executor:
+            return list(
+                executor.map(
+                    lambda key: transfer.object_checksum(
+                        self.object_store, key, self.part_size
+                    ),
+                    paths,
+                )
+            )
+
+    def _modified_at(self, path: str) -> float:
+        return self.object_store.head(path).modified
+
+    def _list_stored_filenames(self) -> set:
+        return {
+            key.rsplit(".", 1)[0]
+            for key in self.object_store.list()
+            if key.endswith((".pkl", ".json"))
+        }
+
+    def _pushed_at(self, filename: str, now: float) -> float:
+        for extension in ("json", "pkl"):
+            try:
+                return self.object_store.head(f"{filename}.{extension}").modified
+            except FileNotFoundError:
+                continue
+
+        return now
+
+    def _reclaimable_bytes(self, filenames: list[str], digests: list[str]) -> int:
+        size = 0
+
+        for filename in filenames:
+            for extension in ("pkl", "json"):
+                try:
+                    size += self.object_store.head(f"{filename}.{extension}").size
+                except FileNotFoundError:
+                    pass
+
+        return size
@@ -0,0 +1,496 @@
+"""
+Object stores where `ObjectStorage` keeps the artifact files.
+
+An object store maps keys to immutable objects, which are written whole or in
+parts through multipart uploads, and read whole or by byte ranges, like S3 and
+the stores compatible with it. `S3ObjectStore` uses one of them, and
+`DirectoryObjectStore` keeps the objects in a local folder with the same
+semantics, so the storage can be used and tested without a remote store.
+
+Missing objects raise `FileNotFoundError`, like missing files, and reads of
+objects that don't have the expected tag raise `ObjectChanged`.
+"""
+
+import os
+import shutil
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, List, Optional
+
+from mixver.storages.exceptions import ObjectChanged
+
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    """
+    Attributes of a stored object.
+
+    Attributes:
+        size (int): Size in bytes.
+        modified (float): UNIX time when it was written.
+        etag (Optional[str]): Tag of its content, which changes whenever it's
+            replaced. Default is None, for stores without them.
+    """
+
+    size: int
+    modified: float
+    etag: Optional[str] = None
+
+
+class ObjectStore(ABC):
+    """
+    Interface of the object stores. Implementations must be thread-safe, since
+    the parts of a transfer are sent concurrently.
+    """
+
+    @abstractmethod
+    def put(self, key: str, content: bytes) -> None:
+        """
+        Write an object in a single request, replacing it if it exists.
+
+        Args:
+            key (str): Object's key.
+            content (bytes): Object's content.
+        """
+
+    @abstractmethod
+    def get(
+        self,
+        key: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        if_match: Optional[str] = None,
+    ) -> bytes:
+        """
+        Read an object or a byte range of it.
+
+        Args:
+            key (str): Object's key.
+            start (int): First byte to read. Default is 0.
+            end (Optional[int]): Byte after the last one to read. Default is
+                None, which reads until the end of the object.
+            if_match (Optional[str]): Tag the object must have, as returned by
+                `head`, so that the byte ranges of a transfer are read from the
+                same object. Default is None, which reads any.
+
+        Returns:
+            bytes: Content read.
+        """
+
+    @abstractmethod
+    def head(self, key: str) -> ObjectInfo:
+        """
+        Get the attributes of an object without reading it.
+
+        Args:
+            key (str): Object's key.
+
+        Returns:
+            ObjectInfo: Object's size, modification time and tag.
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Delete an object. Missing objects are ignored.
+
+        Args:
+            key (str): Object's key.
+        """
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> Iterator[str]:
+        """
+        List the keys of the objects.
+
+        Args:
+            prefix (str): Prefix of the listed keys. Default is empty, which
+                lists all of them.
+
+        Yields:
+            str: Object's key.
+        """
+
+    @abstractmethod
+    def create_multipart(self, key: str) -> str:
+        """
+        Start a multipart upload. The object isn't visible until the upload is
+        completed.
+
+        Args:
+            key (str): Object's key.
+
+        Returns:
+            str: Upload's identifier.
+        """
+
+    @abstractmethod
+    def upload_part(self, key: str, upload_id: str, number: int, content: bytes) -> str:
+        """
+        Upload a part of a multipart upload. Parts can be uploaded concurrently
+        and in any order.
+
+        Args:
+            key (str): Object's key.
+            upload_id (str): Upload's identifier.
+            number (int): Part's number, starting at 1.
+            content (bytes): Part's content.
+
+        Returns:
+            str: Part's tag, passed to `complete_multipart`.
+        """
+
+    @abstractmethod
+    def complete_multipart(self, key: str, upload_id: str, parts: List[str]) -> None:
+        """
+        Assemble the uploaded parts into the object, replacing it if it exists.
+
+        Args:
+            key (str): Object's key.
+            upload_id (str): Upload's identifier.
+            parts (List[str]): Tags of the parts, in order.
+        """
+
+    @abstractmethod
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        """
+        Discard a multipart upload and its uploaded parts.
+
+        Args:
+            key (str): Object's key.
+            upload_id (str): Upload's identifier.
+        """
+
+
+@dataclass(frozen=True)
+class DirectoryObjectStore(ObjectStore):
+    """
+    Object store kept in a local folder, where each object is a file named by
+    its key. Parts of multipart uploads are kept apart until they're completed.
+
+    It can also stand in for a remote store in tests and benchmarks, delaying
+    every request and limiting the bandwidth of each one, which is what makes
+    parallel transfers faster against remote stores.
+
+    Attributes:
+        root (str): Folder of the objects.
+        latency (float): Seconds each request waits before it's served.
+            Default is 0.
+        stream_bandwidth (Optional[float]): Bytes per second transferred by
+            each request. Default is None, which doesn't limit them.
+        _uploads_folder (str): Folder of the multipart uploads, relative to the
+            root.
+    """
+
+    root: str
+    latency: float = 0.0
+    stream_bandwidth: Optional[float] = None
+    _uploads_folder: str = field(default=".uploads", init=False)
+
+    def __post_init__(self) -> None:
+        os.makedirs(Path(self.root, self._uploads_folder), exist_ok=True)
+
+    def put(self, key: str, content: bytes) -> None:
+        self._wait(len(content))
+        _write_file(self._path(key), content)
+
+    def get(
+        self,
+        key: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        if_match: Optional[str] = None,
+    ) -> bytes:
+        with open(self._path(key), "rb") as file:
+            if if_match is not None and _etag(os.fstat(file.fileno())) != if_match:
+                raise ObjectChanged(key)
+
+            file.seek(start)
+            content = file.read() if end is None else file.read(end - start)
+
+        self._wait(len(content))
+
+        return content
+
+    def head(self, key: str) -> ObjectInfo:
+        self._wait(0)
+        stat = os.stat(self._path(key))
+
+        return ObjectInfo(size=stat.st_size, modified=stat.st_mtime, etag=_etag(stat))
+
+    def delete(self, key: str) -> None:
+        self._wait(0)
+
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def list(self, prefix: str = "") -> Iterator[str]:
+        self._wait(0)
+
+        for folder, folders, files in os.walk(self.root):
+            if folder == self.root:
+                folders.remove(self._uploads_folder)
+
+            relative = Path(folder).relative_to(self.root)
+
+            for filename in files:
+                key = Path(relative, filename).as_posix()
+
+                # Hidden files are the temporary files of ongoing writes
+                if not filename.startswith(".") and key.startswith(prefix):
+                    yield key
+
+    def create_multipart(self, key: str) -> str:
+        self._wait(0)
+        upload_id = uuid.uuid4().hex
+        os.mkdir(Path(self.root, self._uploads_folder, upload_id))
+
+        return upload_id
+
+    def upload_part(self, key: str, upload_id: str, number: int, content: bytes) -> str:
+        self._wait(len(content))
+        _write_file(
+            Path(self.root, self._uploads_folder, upload_id, str(number)), content
+        )
+
+        return str(number)
+
+    def complete_multipart(self, key: str, upload_id: str, parts: List[str]) -> None:
+        self._wait(0)
+        folder = Path(self.root, self._uploads_folder, upload_id)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f".{path.name}.{upload_id}.tmp")
+
+        try:
+            with open(temporary, "xb") as file:
+                for part in parts:
+                    with open(Path(folder, part), "rb") as part_file:
+                        shutil.copyfileobj(part_file, file)
+
+                file.flush()
+                os.fsync(file.fileno())
+
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+        shutil.rmtree(folder)
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        self._wait(0)
+        shutil.rmtree(
+            Path(self.root, self._uploads_folder, upload_id), ignore_errors=True
+        )
+
+    def _path(self, key: str) -> Path:
+        """
+        Get the file of an object.
+        """
+        return Path(self.root, key)
+
+    def _wait(self, nbytes: int) -> None:
+        """
+        Delay a request that transfers some bytes, as a remote store would.
+        """
+        seconds = self.latency
+
+        if self.stream_bandwidth:
+            seconds += nbytes / self.stream_bandwidth
+
+        if seconds:
+            time.sleep(seconds)
+
+
+@dataclass(frozen=True)
+class S3ObjectStore(ObjectStore):
+    """
+    Object store in an S3 bucket, or in any store compatible with the S3 API,
+    such as MinIO. It needs the `boto3` package.
+
+    The client keeps a pool of connections, which are reused by the requests of
+    all the threads, so it should hold at least as many connections as parts
+    are transferred at once.
+
+    Attributes:
+        bucket (str): Bucket's name.
+        prefix (str): Prefix of the keys of the objects in the bucket. Default
+            is empty.
+        endpoint_url (Optional[str]): URL of a store compatible with S3.
+            Default is None, which uses AWS.
+        max_connections (int): Size of the connection pool. Default is 16.
+        client (Any): boto3 S3 client to use instead of creating one. Default
+            is None.
+    """
+
+    bucket: str
+    prefix: str = ""
+    endpoint_url: Optional[str] = None
+    max_connections: int = 16
+    client: Any = None
+
+    def __post_init__(self) -> None:
+        if self.client is not None:
+            return
+
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError as exc:
+            raise ImportError(
+                "The S3 object store needs the boto3 package, install it with "
+                "`pip install boto3`."
+            ) from exc
+
+        client = boto3.client(
+            "s3",
+            endpoint_url=self.endpoint_url,
+            config=Config(max_pool_connections=self.max_connections),
+        )
+        object.__setattr__(self, "client", client)
+
+    def put(self, key: str, content: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=content)
+
+    def get(
+        self,
+        key: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        if_match: Optional[str] = None,
+    ) -> bytes:
+        options = {}
+
+        if start or end is not None:
+            options["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+
+        if if_match is not None:
+            options["IfMatch"] = if_match
+
+        with _client_errors(key):
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=self.prefix + key, **options
+            )
+
+        return response["Body"].read()
+
+    def head(self, key: str) -> ObjectInfo:
+        with _client_errors(key):
+            response = self.client.head_object(
+                Bucket=self.bucket, Key=self.prefix + key
+            )
+
+        return ObjectInfo(
+            size=response["ContentLength"],
+            modified=response["LastModified"].timestamp(),
+            etag=response.get("ETag"),
+        )
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def list(self, prefix: str = "") -> Iterator[str]:
+        paginator = self.client.get_paginator("list_objects_v2")
+
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix + prefix):
+            for item in page.get("Contents", []):
+                yield item["Key"][len(self.prefix) :]
+
+    def create_multipart(self, key: str) -> str:
+        response = self.client.create_multipart_upload(
+            Bucket=self.bucket, Key=self.prefix + key
+        )
+
+        return response["UploadId"]
+
+    def upload_part(self, key: str, upload_id: str, number: int, content: bytes) -> str:
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.prefix + key,
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=content,
+        )
+
+        return response["ETag"]
+
+    def complete_multipart(self, key: str, upload_id: str, parts: List[str]) -> None:
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.prefix + key,
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [
+                    {"ETag": tag, "PartNumber": number}
+                    for number, tag in enumerate(parts, start=1)
+                ]
+            },
+        )
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        self.client.abort_multipart_upload(
+            Bucket=self.bucket, Key=self.prefix + key, UploadId=upload_id
+        )
+
+
+def _write_file(path: Path, content: bytes) -> None:
+    """
+    Write a file through a hidden temporary file, so it's never listed or read
+    partially written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+    try:
+        with open(temporary, "xb") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _etag(stat: os.stat_result) -> str:
+    """
+    Get the tag of an object file. Objects are replaced by renaming a new file
+    over them, so their inode changes along with the tag.
+    """
+    return f"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+@contextmanager
+def _client_errors(key: str) -> Iterator[None]:
+    """
+    Raise `FileNotFoundError` for the client errors of missing objects, and
+    `ObjectChanged` for the ones of failed tag conditions.
+    """
+    try:
+        yield
+    except Exception as exc:
+        response = getattr(exc, "response", None)
+        code = (
+            response.get("Error", {}).get("Code")
+            if isinstance(response, dict)
+            else None
+        )
+
+        if code in ("404", "NoSuchKey"):
+            raise FileNotFoundError(f"Object '{key}' doesn't exist.") from exc
+
+        if code in ("412", "PreconditionFailed"):
+            raise ObjectChanged(key) from exc
+
+        raise
@@ -0,0 +1,92 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    Rules deciding which artifact versions a garbage collection removes. A
+    version is removed if it isn't one of the `keep_last` latest versions of its
+    artifact, or if it's older than `max_age`, unless it's tagged and
+    `keep_tagged` is set.
+
+    Attributes:
+        keep_last (Optional[int]): Number of latest versions to keep of each
+            artifact. Default is None, which doesn't limit the number of
+            versions.
+        max_age (Optional[float]): Age in seconds after which versions are
+            removed. Default is None, which doesn't limit their age.
+        keep_tagged (bool): Whether to keep the versions pointed to by a tag.
+            Default is True.
+    """
+
+    keep_last: Optional[int] = None
+    max_age: Optional[float] = None
+    keep_tagged: bool = True
+
+    def __post_init__(self) -> None:
+        if self.keep_last is not None and self.keep_last < 0:
+            raise ValueError("The number of versions to keep can't be negative.")
+
+        if self.max_age is not None and self.max_age < 0:
+            raise ValueError("The maximum age can't be negative.")
+
+    def select(
+        self, pushed_at: Dict[str, float], tagged: Set[str], now: float
+    ) -> List[str]:
+        """
+        Select the versions of an artifact to remove.
+
+        Args:
+            pushed_at (Dict[str, float]): UNIX time when each version was pushed,
+                from the oldest to the newest version.
+            tagged (Set[str]): Versions pointed to by a tag.
+            now (float): Current UNIX time.
+
+        Returns:
+            List[str]: Versions to remove, from the oldest to the newest.
+        """
+        versions = list(pushed_at)
+        recent = set()
+
+        if self.keep_last is not None:
+            recent = set(versions[max(len(versions) - self.keep_last, 0) :])
+
+        selected = []
+
+        for version in versions:
+            if self.keep_tagged and version in tagged:
+                continue
+
+            if (self.keep_last is not None and version not in recent) or (
+                self.max_age is not None and now - pushed_at[version] > self.max_age
+            ):
+                selected.append(version)
+
+        return selected
+
+
+@dataclass
+class RetentionReport:
+    """
+    Outcome of a garbage collection, or of its dry run.
+
+    Attributes:
+        dry_run (bool): Whether nothing was actually removed.
+        removed (List[str]): Filenames of the versions removed by the policy, or
+            that would be removed.
+        orphans (List[str]): Files left in the storage that no version refers
+            to, such as the ones of interrupted pushes or removals. Artifact
+            files are given by filename and blobs by their path relative to the
+            storage. They are only looked for once the sweep is complete.
+        reclaimed_bytes (int): Disk space freed, or that would be freed.
+        complete (bool): Whether the sweep went through all the artifacts.
+            Otherwise, the next collection resumes after the last artifact
+            swept by this one.
+    """
+
+    dry_run: bool
+    removed: List[str] = field(default_factory=list)
+    orphans: List[str] = field(default_factory=list)
+    reclaimed_bytes: int = 0
+    complete: bool = True
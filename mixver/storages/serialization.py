@@ -0,0 +1,267 @@
+"""
+Serialization of the artifacts stored in the storages.
+
+Besides plain pickle files, artifacts can be stored in a stream format that
+uses pickle protocol 5 with out-of-band buffers. The large contiguous buffers
+of the artifact, such as NumPy arrays, aren't copied into the pickle. Instead,
+they are written to the file in chunks straight from the artifact's memory,
+and they are read back into the memory of the rebuilt objects. Peak memory is
+therefore close to the artifact size on both ends.
+
+Stream files are laid out as:
+
+    MAGIC | pickle skeleton | buffer segments | footer | footer size | MAGIC
+
+where the footer is a JSON object with the offset and size of the skeleton and
+of each buffer segment. Segments start at offsets aligned to `ALIGNMENT`, so
+they can also be memory-mapped and used in place, sharing the page cache
+between the processes that load the same file.
+
+Compressed artifacts start with `COMPRESSED_MAGIC` and the name of their codec,
+followed by the compressed frames of a protocol 5 pickle. Their buffers are
+pickled in-band, since they can't be read in place anyway, and they are still
+read straight into the rebuilt objects.
+"""
+
+import json
+import mmap
+import pickle
+import struct
+from typing import Any, BinaryIO, List
+
+from mixver.storages import compression
+from mixver.storages.exceptions import CorruptedArtifact
+
+# Pickle files start with the PROTO opcode (0x80), so they never match it
+MAGIC = b"\x00MIXVER1"
+COMPRESSED_MAGIC = b"\x00MIXVERZ"
+CHUNK_SIZE = 8 * 1024 * 1024
+ALIGNMENT = 64
+# Smaller buffers are kept inside the pickle skeleton
+MIN_SEGMENT_SIZE = 4096
+SERIALIZATIONS = ("pickle", "stream")
+
+_FOOTER_SIZE = struct.Struct("<Q")
+_TRAILER_SIZE = _FOOTER_SIZE.size + len(MAGIC)
+
+
+def dump(
+    data: Any,
+    file: BinaryIO,
+    serialization: str = "pickle",
+    chunk_size: int = CHUNK_SIZE,
+    codec: str = "none",
+) -> None:
+    """
+    Serialize data into a binary file.
+
+    Args:
+        data (Any): Data to serialize.
+        file (BinaryIO): File opened for writing.
+        serialization (str): Either "pickle" or "stream". Default is "pickle".
+        chunk_size (int): Maximum bytes written at once by the stream
+            serialization. Default is 8 MiB.
+        codec (str): Compression codec, or "none" to store the data
+            uncompressed. Compressed data is always written as a protocol 5
+            pickle, regardless of the serialization. Default is "none".
+    """
+    if serialization not in SERIALIZATIONS:
+        raise ValueError(
+            f"Unknown serialization '{serialization}', it must be one of "
+            f"{', '.join(SERIALIZATIONS)}."
+        )
+
+    if codec != "none":
+        dump_compressed(data, file, compression.get_codec(codec))
+    elif serialization == "pickle":
+        pickle.dump(data, file)
+    else:
+        dump_stream(data, file, chunk_size=chunk_size)
+
+
+def load(file: BinaryIO, memory_map: bool = False) -> Any:
+    """
+    Deserialize data from a binary file, detecting its serialization and its
+    compression codec.
+
+    Args:
+        file (BinaryIO): File opened for reading, positioned at its start.
+        memory_map (bool): Whether to memory-map the buffer segments of stream
+            files instead of reading them. Default is False.
+
+    Returns:
+        Any: Deserialized data.
+    """
+    magic = file.read(len(MAGIC))
+
+    if magic == MAGIC:
+        return load_stream(file, memory_map=memory_map)
+
+    if magic == COMPRESSED_MAGIC:
+        return load_compressed(file)
+
+    file.seek(0)
+    return pickle.load(file)
+
+
+def dump_compressed(data: Any, file: BinaryIO, codec: compression.Codec) -> None:
+    """
+    Serialize data with pickle protocol 5, compressing it in parallel chunks.
+
+    Args:
+        data (Any): Data to serialize.
+        file (BinaryIO): File opened for writing.
+        codec (compression.Codec): Compression codec.
+    """
+    name = codec.name.encode("utf8")
+    file.write(COMPRESSED_MAGIC + bytes([len(name)]) + name)
+
+    writer = compression.CompressedWriter(file, codec)
+    pickle.dump(data, writer, protocol=5)
+    writer.close()
+
+
+def load_compressed(file: BinaryIO) -> Any:
+    """
+    Deserialize a compressed file, positioned after its magic header.
+
+    Args:
+        file (BinaryIO): Compressed file opened for reading.
+
+    Returns:
+        Any: Deserialized data.
+    """
+    name = file.read(file.read(1)[0]).decode("utf8")
+
+    with compression.open_decompressed(file, compression.get_codec(name)) as reader:
+        return pickle.load(reader)
+
+
+def dump_stream(data: Any, file: BinaryIO, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Serialize data with pickle protocol 5, writing its out-of-band buffers
+    after the pickle in chunks. Buffers smaller than `MIN_SEGMENT_SIZE` are
+    kept in the pickle.
+
+    Args:
+        data (Any): Data to serialize.
+        file (BinaryIO): Seekable file opened for writing.
+        chunk_size (int): Maximum bytes written at once. Default is 8 MiB.
+    """
+    buffers: List[pickle.PickleBuffer] = []
+
+    def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+        # Returning True keeps the buffer in-band
+        if buffer.raw().nbytes < MIN_SEGMENT_SIZE:
+            return True
+
+        buffers.append(buffer)
+        return False
+
+    file.write(MAGIC)
+    skeleton_offset = file.tell()
+    pickle.Pickler(file, protocol=5, buffer_callback=buffer_callback).dump(data)
+    skeleton = [skeleton_offset, file.tell() - skeleton_offset]
+
+    segments = []
+
+    for buffer in buffers:
+        view = buffer.raw()
+        file.write(bytes(-file.tell() % ALIGNMENT))
+        segments.append([file.tell(), view.nbytes])
+
+        for start in range(0, view.nbytes, chunk_size):
+            file.write(view[start : start + chunk_size])
+
+    footer = json.dumps({"skeleton": skeleton, "buffers": segments}).encode("utf8")
+    file.write(footer)
+    file.write(_FOOTER_SIZE.pack(len(footer)))
+    file.write(MAGIC)
+
+
+def read_footer(file: BinaryIO) -> dict:
+    """
+    Read the footer of a stream file.
+
+    Args:
+        file (BinaryIO): Stream file opened for reading.
+
+    Returns:
+        dict: Skeleton and buffer segments' positions.
+    """
+    name = getattr(file, "name", "<stream>")
+    file.seek(0, 2)
+    size = file.tell()
+
+    if size < len(MAGIC) + _TRAILER_SIZE:
+        raise CorruptedArtifact(name, "the file is truncated")
+
+    file.seek(size - _TRAILER_SIZE)
+    trailer = file.read(_TRAILER_SIZE)
+
+    if trailer[_FOOTER_SIZE.size :] != MAGIC:
+        raise CorruptedArtifact(name, "the file is truncated")
+
+    (footer_size,) = _FOOTER_SIZE.unpack(trailer[: _FOOTER_SIZE.size])
+    file.seek(size - _TRAILER_SIZE - footer_size)
+
+    try:
+        return json.loads(file.read(footer_size))
+    except ValueError as exc:
+        raise CorruptedArtifact(name, "the footer can't be parsed") from exc
+
+
+def load_stream(file: BinaryIO, memory_map: bool = False) -> Any:
+    """
+    Deserialize a stream file. Each out-of-band buffer is read straight into
+    the memory of the object it belongs to.
+
+    When the file is memory-mapped, the objects are rebuilt over read-only
+    views of the mapping instead, so nothing is copied and the pages are
+    shared with other processes mapping the same file. NumPy arrays rebuilt
+    this way are read-only. The mapping is released once all of them are
+    garbage collected.
+
+    Args:
+        file (BinaryIO): Stream file opened for reading.
+        memory_map (bool): Whether to memory-map the buffer segments. Default
+            is False.
+
+    Returns:
+        Any: Deserialized data.
+    """
+    footer = read_footer(file)
+
+    if memory_map and footer["buffers"]:
+        mapping = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+        buffers = [
+            mapping[offset : offset + size] for offset, size in footer["buffers"]
+        ]
+    else:
+        buffers = [
+            _read_buffer(file, offset, size) for offset, size in footer["buffers"]
+        ]
+
+    file.seek(footer["skeleton"][0])
+    return pickle.load(file, buffers=buffers)
+
+
+def _read_buffer(file: BinaryIO, offset: int, size: int) -> bytearray:
+    """
+    Read a buffer segment without intermediate copies.
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    file.seek(offset)
+
+    while view:
+        read = file.readinto(view)
+
+        if not read:
+            raise CorruptedArtifact(
+                getattr(file, "name", "<stream>"), "a buffer is truncated"
+            )
+
+        view = view[read:]
+
+    return buffer
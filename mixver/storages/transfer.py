@@ -0,0 +1,186 @@
+"""
+Parallel transfers of files to and from object stores.
+
+Files larger than a part are uploaded through multipart uploads and downloaded
+through byte range requests, sending several parts at once. A single request to
+a remote store is usually limited well below the bandwidth of the network, so
+large artifacts are transferred many times faster than with one request. Each
+part is read or written in place by the thread that transfers it, so at most
+`max_workers` parts are held in memory.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from mixver import instrumentation
+from mixver.storages.exceptions import ObjectChanged
+from mixver.storages.object_store import ObjectInfo, ObjectStore
+
+PART_SIZE = 8 * 1024 * 1024
+MAX_WORKERS = 8
+
+# Limit of parts of an S3 multipart upload
+_MAX_PARTS = 10_000
+
+
+def upload_file(
+    store: ObjectStore,
+    key: str,
+    path: Path,
+    part_size: int = PART_SIZE,
+    max_workers: int = MAX_WORKERS,
+) -> None:
+    """
+    Upload a file, in parallel parts if it's larger than a part. A failed
+    upload is aborted, so no part is left behind.
+
+    Args:
+        store (ObjectStore): Object store.
+        key (str): Object's key.
+        path (Path): File to upload.
+        part_size (int): Size of the parts in bytes. It's increased when the
+            file would need more parts than S3 allows. Default is 8 MiB.
+        max_workers (int): Maximum number of parts uploaded at once. Default
+            is 8.
+    """
+    size = os.path.getsize(path)
+
+    if size <= part_size:
+        with open(path, "rb") as file:
+            content = file.read()
+
+        instrumentation.add_bytes(len(content))
+        store.put(key, content)
+        return
+
+    ranges = _split(size, max(part_size, -(-size // _MAX_PARTS)))
+    upload_id = store.create_multipart(key)
+
+    def upload(number: int, start: int, end: int) -> str:
+        with open(path, "rb") as file:
+            file.seek(start)
+            content = file.read(end - start)
+
+        return store.upload_part(key, upload_id, number, content)
+
+    try:
+        with ThreadPoolExecutor(max_workers) as executor:
+            parts = list(
+                executor.map(
+                    upload,
+                    range(1, len(ranges) + 1),
+                    *zip(*ranges),
+                )
+            )
+
+        store.complete_multipart(key, upload_id, parts)
+    except BaseException:
+        store.abort_multipart(key, upload_id)
+        raise
+
+    instrumentation.add_bytes(size)
+
+
+def download_file(
+    store: ObjectStore,
+    key: str,
+    path: Path,
+    part_size: int = PART_SIZE,
+    max_workers: int = MAX_WORKERS,
+    info: Optional[ObjectInfo] = None,
+) -> int:
+    """
+    Download an object into a file, in parallel byte ranges if it's larger than
+    a part. The ranges are pinned to the tag of the object, so an object that's
+    replaced during the download raises `ObjectChanged` instead of mixing the
+    content of both.
+
+    Args:
+        store (ObjectStore): Object store.
+        key (str): Object's key.
+        path (Path): File to write. It's replaced if it exists.
+        part_size (int): Size of the byte ranges. Default is 8 MiB.
+        max_workers (int): Maximum number of ranges downloaded at once.
+            Default is 8.
+        info (Optional[ObjectInfo]): Object's attributes, if they're known.
+            Default is None, which requests them first.
+
+    Returns:
+        int: Number of bytes downloaded.
+    """
+    if info is None:
+        info = store.head(key)
+
+    size = info.size
+
+    if size <= part_size:
+        content = store.get(key)
+
+        with open(path, "wb") as file:
+            file.write(content)
+
+        instrumentation.add_bytes(len(content))
+
+        return len(content)
+
+    with open(path, "wb") as file:
+        file.truncate(size)
+
+    def download(start: int, end: int) -> None:
+        content = store.get(key, start, end, if_match=info.etag)
+
+        # Stores without tags only tell replaced objects of other sizes apart
+        if len(content) != end - start:
+            raise ObjectChanged(key)
+
+        with open(path, "r+b") as file:
+            file.seek(start)
+            file.write(content)
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        list(executor.map(download, *zip(*_split(size, part_size))))
+
+    instrumentation.add_bytes(size)
+
+    return size
+
+
+def object_checksum(
+    store: ObjectStore, key: str, part_size: int = PART_SIZE
+) -> Optional[str]:
+    """
+    Compute the SHA-256 of an object, reading it by byte ranges so it's never
+    held in memory at once. The ranges are pinned to the tag of the object, like
+    in `download_file`.
+
+    Args:
+        store (ObjectStore): Object store.
+        key (str): Object's key.
+        part_size (int): Size of the byte ranges. Default is 8 MiB.
+
+    Returns:
+        Optional[str]: Hexadecimal digest, or None if the object doesn't exist.
+    """
+    file_hash = hashlib.sha256()
+
+    try:
+        info = store.head(key)
+
+        for start, end in _split(info.size, part_size):
+            file_hash.update(store.get(key, start, end, if_match=info.etag))
+    except FileNotFoundError:
+        return None
+
+    return file_hash.hexdigest()
+
+
+def _split(size: int, part_size: int) -> List[Tuple[int, int]]:
+    """
+    Split a number of bytes into ranges of at most a part.
+    """
+    return [
+        (start, min(start + part_size, size)) for start in range(0, size, part_size)
+    ]
@@ -0,0 +1,316 @@
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+
+class BaseVersioner(ABC):
+    """
+    Interface of the registries that keep track of the artifacts' versions and
+    tags of a storage.
+    """
+
+    @abstractmethod
+    def add_artifact(
+        self,
+        name: str,
+        tags: Optional[list[str]] = None,
+        checksum: Optional[str] = None,
+    ) -> str:
+        """
+        Add an artifact to the system. In the case that the artifact already
+        exists, its version will be upgraded.
+
+        Args:
+            name (str): Artifact's name.
+            tags (list[str]): Artifact's tags. Default is []
+            checksum (Optional[str]): SHA-256 of the artifact file. Default is
+                None, which doesn't record it.
+
+        Returns:
+            str: Artifact's filename.
+        """
+
+    @abstractmethod
+    def add_artifacts(
+        self,
+        artifacts: list[tuple[str, Optional[list[str]]]],
+        checksums: Optional[list[Optional[str]]] = None,
+    ) -> list[str]:
+        """
+        Add several artifacts to the system in a single registry update. An
+        artifact can appear more than once, getting a new version each time.
+
+        Args:
+            artifacts (list[tuple[str, Optional[list[str]]]]): Name and tags of
+                each artifact.
+            checksums (Optional[list[Optional[str]]]): SHA-256 of the file of
+                each artifact. Default is None, which doesn't record them.
+
+        Returns:
+            list[str]: Artifacts' filenames, in the same order.
+        """
+
+    @abstractmethod
+    def restore_artifacts(
+        self, artifacts: list[tuple[str, str, Optional[str], Optional[float]]]
+    ) -> None:
+        """
+        Add artifact versions found in the storage back to the registry, without
+        tags. Versions already in the registry are left as they are, and later
+        pushes get versions after the restored ones.
+
+        Args:
+            artifacts (list[tuple[str, str, Optional[str], Optional[float]]]):
+                Name, version, checksum and push time of each artifact version.
+        """
+
+    @abstractmethod
+    def update_tags(self, name: str, tags: list[str], version: str = "") -> None:
+        """
+        Update the tags with a given artifact. In the case that no version is passed,
+        it uses the latest version of that artifact.
+
+        Args:
+            name (str): Artifact's name.
+            tags (list[str]): List of tags to be updated.
+            version (str): Artifact's version. Default is empty, which means the
+                latest version of the artifact will be used.
+        """
+
+    @abstractmethod
+    def remove_artifact(self, name: str, version: str = "") -> None:
+        """
+        Remove an artifact from the registry, along with the tags assigned to it.
+        Versions of a removed artifact aren't reused by later pushes, unless all
+        of them are removed.
+
+        Args:
+            name (str): Artifact's name.
+            version (str): Artifact's version. Default is empty, which means all
+                the versions of the artifact will be removed.
+        """
+
+    @abstractmethod
+    def get_artifact_by_version(self, name: str, version: str = "") -> str:
+        """
+        Retrieves an artifact by its version. If the version is empty, the
+        latest version will be returned.
+
+        Args:
+            name (str): Artifact's name.
+            version (str): Artifact's version. Default is empty.
+
+        Returns:
+            str: Artifact's filepath.
+        """
+
+    @abstractmethod
+    def get_artifact_by_tag(self, tag: str) -> str:
+        """
+        Retrieves the artifact a tag is assigned to.
+
+        Args:
+            tag (str): Tag assigned to the desired artifact.
+
+        Returns:
+            str: Artifact's filepath.
+        """
+
+    @abstractmethod
+    def get_artifacts(self, references: list[dict[str, str]]) -> list[str]:
+        """
+        Retrieves several artifacts in a single registry read.
+
+        Args:
+            references (list[dict[str, str]]): Either the "tag" or the "name" and
+                optional "version" of each artifact.
+
+        Returns:
+            list[str]: Artifacts' filepaths, in the same order.
+        """
+
+    @abstractmethod
+    def get_versions(self, name: str) -> list[str]:
+        """
+        Get the versions of an artifact, from the oldest to the newest.
+
+        Args:
+            name (str): Artifact's name.
+
+        Returns:
+            list[str]: Artifact's versions.
+        """
+
+    @abstractmethod
+    def get_filenames(self, name: str) -> dict[str, str]:
+        """
+        Get the filename of each version of an artifact.
+
+        Args:
+            name (str): Artifact's name.
+
+        Returns:
+            dict[str, str]: Filenames by version, from the oldest to the newest.
+        """
+
+    @abstractmethod
+    def get_all_filenames(self) -> dict[str, dict[str, str]]:
+        """
+        Get the filename of each version of every artifact in a single registry
+        read.
+
+        Returns:
+            dict[str, dict[str, str]]: Filenames by version, from the oldest to
+                the newest, of each artifact, sorted by name.
+        """
+
+    @abstractmethod
+    def get_checksum(self, name: str, version: str) -> Optional[str]:
+        """
+        Get the checksum recorded when an artifact version was pushed.
+
+        Args:
+            name (str): Artifact's name.
+            version (str): Artifact's version.
+
+        Returns:
+            Optional[str]: SHA-256 of the artifact file, or None if it wasn't
+                recorded, as with the versions pushed by older releases.
+        """
+
+    @abstractmethod
+    def get_all_checksums(self) -> dict[str, str]:
+        """
+        Get the checksums of all the artifact versions that have one in a single
+        registry read.
+
+        Returns:
+            dict[str, str]: SHA-256 of the file of each artifact, by filename.
+        """
+
+    @abstractmethod
+    def get_all_push_times(self) -> dict[str, float]:
+        """
+        Get the push times of all the artifact versions that have one in a
+        single registry read. Versions pushed by releases that didn't record
+        push times are left out.
+
+        Returns:
+            dict[str, float]: UNIX time when each artifact was pushed, by
+                filename.
+        """
+
+    @abstractmethod
+    def list_artifacts(
+        self,
+        name_prefix: str = "",
+        since: Optional[float] = None,
+        after: Optional[tuple[str, str]] = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """
+        Get a page of the artifact versions, sorted by name and version.
+
+        Args:
+            name_prefix (str): Prefix of the names of the listed artifacts.
+                Default is empty, which lists all of them.
+            since (Optional[float]): UNIX time from which the listed versions
+                were pushed. Versions pushed by releases that didn't record push
+                times are left out. Default is None, which lists all of them.
+            after (Optional[tuple[str, str]]): Name and version after which the
+                page starts. Default is None, which starts from the first one.
+            limit (int): Maximum number of versions in the page. Default is 100.
+
+        Returns:
+            list[dict]: Name, version, filename and push time of each version.
+        """
+
+    @abstractmethod
+    def get_tags(self, name: str, version: str = "") -> list[str]:
+        """
+        Get the tags pointing to an artifact, without scanning all the tags.
+
+        Args:
+            name (str): Artifact's name.
+            version (str): Artifact's version. Default is empty, which means the
+                tags of all the versions of the artifact are returned.
+
+        Returns:
+            list[str]: Sorted tags.
+        """
+
+    @abstractmethod
+    def get_tag_history(self, tag: str) -> list[dict]:
+        """
+        Get the artifacts a tag pointed to, from the oldest to the newest. Tags
+        detached by the removal of their artifact have a None name, version and
+        filename.
+
+        Args:
+            tag (str): Tag's name.
+
+        Returns:
+            list[dict]: Name, version, filename and UNIX time of each change.
+        """
+
+    @abstractmethod
+    def rollback_tag(self, tag: str, steps: int = 1) -> str:
+        """
+        Point a tag back to the artifact it pointed to before its last changes.
+        The rollback is a change itself, so rolling back twice by one step
+        restores the original artifact.
+
+        Args:
+            tag (str): Tag's name.
+            steps (int): Number of changes to go back. Default is 1.
+
+        Returns:
+            str: Filename of the artifact the tag points to.
+        """
+
+    @abstractmethod
+    def iter_tags(
+        self, tag_pattern: str = "*", name_pattern: str = "*"
+    ) -> Iterator[tuple[str, str, str, str]]:
+        """
+        Iterate over the tags, sorted, along with the name, version and filename
+        of their artifacts. Tags detached by the removal of their artifact are
+        skipped. Patterns are matched as by `fnmatch.fnmatchcase` in every
+        backend: case-sensitively, with `[!...]` negating a set.
+
+        Args:
+            tag_pattern (str): Shell-style pattern the tags must match. Default
+                is "*", which matches all of them.
+            name_pattern (str): Shell-style pattern the names of the tagged
+                artifacts must match. Default is "*", which matches all of them.
+
+        Yields:
+            tuple[str, str, str, str]: Tag, name, version and filename.
+        """
+
+    @abstractmethod
+    def iter_latest_versions(
+        self, name_pattern: str = "*"
+    ) -> Iterator[tuple[str, str, str]]:
+        """
+        Iterate over the artifacts, sorted by name, along with their latest
+        version. The pattern is matched as in `iter_tags`.
+
+        Args:
+            name_pattern (str): Shell-style pattern the names must match. Default
+                is "*", which matches all of them.
+
+        Yields:
+            tuple[str, str, str]: Name, latest version and its filename.
+        """
+
+    @abstractmethod
+    def get_tags_data_for_visualization(
+        self,
+    ) -> tuple[list[str], list[str], list[str], list[str]]:
+        """
+        Get the tags along with the name, version and filename of their artifacts.
+
+        Returns:
+            tuple[list[str], list[str], list[str], list[str]]: Tags, names,
+                versions and filenames.
+        """
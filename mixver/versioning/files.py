@@ -0,0 +1,161 @@
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import List, Optional, Union
+
+from mixver import instrumentation
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+def write_atomically(file_path: str, content: Union[str, bytes]) -> None:
+    """
+    Replace the content of a file by writing a temporary file next to it and
+    renaming it over the original one. Readers see either the old or the new
+    content, never a truncated or partially written file, and a crash leaves
+    the original file intact.
+
+    Args:
+        file_path (str): File to replace.
+        content (Union[str, bytes]): New content, written as UTF-8 if it's a
+            string.
+    """
+    file_path = Path(file_path)
+    binary = isinstance(content, bytes)
+
+    with tempfile.NamedTemporaryFile(
+        mode="wb" if binary else "w",
+        encoding=None if binary else "utf8",
+        dir=file_path.parent,
+        prefix=f"{file_path.name}.",
+        suffix=".tmp",
+        delete=False,
+    ) as file:
+        try:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+            instrumentation.add_bytes(len(content))
+
+            # Temporary files are only readable by their owner
+            if file_path.exists():
+                os.chmod(file.name, stat.S_IMODE(file_path.stat().st_mode))
+        except BaseException:
+            os.unlink(file.name)
+            raise
+
+    os.replace(file.name, file_path)
+    fsync_directory(file_path.parent)
+
+
+def append_lines(file_path: str, lines: List[str]) -> None:
+    """
+    Durably append lines to a file, creating it if it doesn't exist. If a
+    previous append was interrupted midway, its incomplete line is terminated
+    first, so readers can skip it.
+
+    Args:
+        file_path (str): File to append to.
+        lines (List[str]): Lines to append, without line breaks.
+    """
+    if not lines:
+        return
+
+    content = "".join(f"{line}\n" for line in lines).encode("utf8")
+
+    with open(file_path, mode="a+b") as file:
+        size = os.fstat(file.fileno()).st_size
+
+        if size:
+            file.seek(size - 1)
+            if file.read(1) != b"\n":
+                content = b"\n" + content
+
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+        instrumentation.add_bytes(len(content))
+
+
+def fsync_directory(path: str) -> None:
+    """
+    Persist the entries of a directory, such as a file that was just renamed.
+    It does nothing on platforms where directories can't be opened.
+
+    Args:
+        path (str): Directory path.
+    """
+    try:
+        descriptor = os.open(path, os.O_RDONLY)
+    except OSError:  # pragma: no cover - Windows
+        return
+
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class FileLock:
+    """
+    Advisory lock over a file, shared by processes and threads.
+
+    The lock is reentrant for the thread holding it, so nested read-modify-write
+    cycles can take it again. Processes are synchronized with `fcntl.flock`,
+    which isn't available on Windows, where only threads are synchronized.
+
+    Attributes:
+        file_path (str): Lock file path. It's created on the first acquisition.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self._thread_lock = threading.RLock()
+        self._file: Optional[int] = None
+        self._depth = 0
+
+    def acquire(self) -> None:
+        """
+        Wait until the lock is available and take it.
+        """
+        self._thread_lock.acquire()
+
+        try:
+            if self._depth == 0:
+                self._file = os.open(self.file_path, os.O_RDWR | os.O_CREAT, 0o666)
+
+                if fcntl is not None:
+                    fcntl.flock(self._file, fcntl.LOCK_EX)
+        except BaseException:
+            if self._file is not None:
+                os.close(self._file)
+                self._file = None
+            self._thread_lock.release()
+            raise
+
+        self._depth += 1
+
+    def release(self) -> None:
+        """
+        Release the lock.
+        """
+        self._depth -= 1
+
+        if self._depth == 0:
+            # Closing the descriptor releases the flock
+            os.close(self._file)
+            self._file = None
+
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
@@ -0,0 +1,377 @@
+import copy
+import json
+import os
+import threading
+from contextlib import contextmanager
+from json.decoder import JSONDecodeError
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from mixver import instrumentation
+from mixver.versioning.files import FileLock, write_atomically
+
+
+def apply_operation(data: dict, operation: list) -> None:
+    """
+    Apply a registry change to parsed registry data.
+
+    Operations are either `["set", path, value]` or `["del", path]`, where the
+    path is the list of keys leading to the changed entry. Applying the same
+    operations twice in a row leaves the data unchanged, so replaying a whole
+    journal over a snapshot that already contains it is safe, as long as no
+    later operations are in the snapshot.
+
+    Args:
+        data (dict): Parsed registry data.
+        operation (list): Change to apply.
+    """
+    action, path = operation[0], operation[1]
+    parent = data
+
+    for key in path[:-1]:
+        if key not in parent:
+            if action == "del":
+                return
+            parent[key] = {}
+        parent = parent[key]
+
+    if action == "set":
+        parent[path[-1]] = copy.deepcopy(operation[2])
+    else:
+        parent.pop(path[-1], None)
+
+
+class JSONJournal:
+    """
+    Registry file stored as a JSON snapshot plus an append-only journal with the
+    changes made since the snapshot was written.
+
+    Each journal line holds the operations of one update, so an update whose
+    append was interrupted is ignored as a whole. The replayed content is kept in
+    memory and only the journal lines appended since the last load are read.
+    Once the journal holds more than `compact_threshold` updates, it's merged
+    into the snapshot by a background thread.
+
+    Appends and compactions hold `lock`, so that processes sharing the registry
+    don't lose each other's updates. Readers don't need it. Once a compaction
+    has rewritten the files, `on_compact` is called without holding the
+    in-memory content, so it can read the registry, such as to rebuild what's
+    derived from its files.
+
+    Attributes:
+        file_path (Path): Snapshot path.
+        journal_path (Path): Journal path.
+        compact_threshold (int): Number of journal updates that triggers a
+            background compaction.
+        lock (FileLock): Lock shared by the registry writers.
+        on_compact (Optional[Callable[[], None]]): Function called after each
+            compaction, in the thread that ran it.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        compact_threshold: int = 1000,
+        lock: Optional[FileLock] = None,
+        on_compact: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.file_path = Path(file_path)
+        self.journal_path = self.file_path.with_suffix(".journal")
+        self.compact_threshold = compact_threshold
+        self.lock = lock or FileLock(str(self.file_path.with_suffix(".lock")))
+        self.on_compact = on_compact
+        self._lock = threading.RLock()
+        self._compaction: Optional[threading.Thread] = None
+        self._data: Optional[dict] = None
+        self._empty = True
+        self._snapshot_signature: Optional[Tuple[int, int, int]] = None
+        self._journal_inode: Optional[int] = None
+        self._journal_offset = 0
+        self._journal_updates = 0
+
+    def load(self, raise_exceptions: Optional[Exception] = None) -> dict:
+        """
+        Get the registry content, reading only what changed since the last load.
+        The returned object is shared, so it must not be modified.
+
+        Args:
+            raise_exceptions (Optional[Exception]): Exception raised if nothing
+                has ever been written to the registry.
+
+        Returns:
+            dict: Registry content.
+        """
+        with self._lock:
+            if not self._refresh():
+                self._reload()
+
+            if self._empty and raise_exceptions:
+                raise raise_exceptions
+
+            return self._data
+
+    @contextmanager
+    def read(self, raise_exceptions: Optional[Exception] = None) -> Iterator[dict]:
+        """
+        Keep the registry content unchanged by this process while reading it.
+
+        Args:
+            raise_exceptions (Optional[Exception]): Exception raised if nothing
+                has ever been written to the registry.
+
+        Yields:
+            dict: Registry content.
+        """
+        with self._lock:
+            yield self.load(raise_exceptions=raise_exceptions)
+
+    @contextmanager
+    def transaction(self) -> Iterator[dict]:
+        """
+        Hold the registry lock while reading and updating the registry content.
+        The lock is always taken before the in-memory content, so that
+        transactions and background compactions don't wait for each other.
+
+        Yields:
+            dict: Registry content.
+        """
+        with self.lock, self._lock:
+            yield self.load()
+
+    def append(self, operations: List[list]) -> None:
+        """
+        Persist the operations of an update, which must already be applied to
+        the loaded content.
+
+        Args:
+            operations (List[list]): Update operations.
+        """
+        if not operations:
+            return
+
+        line = json.dumps(operations).encode("utf8") + b"\n"
+
+        with self.lock, self._lock:
+            try:
+                with open(self.journal_path, mode="a+b") as file:
+                    size = os.fstat(file.fileno()).st_size
+
+                    # A previous append may have been interrupted midway
+                    if size:
+                        file.seek(size - 1)
+                        if file.read(1) != b"\n":
+                            line = b"\n" + line
+
+                    file.write(line)
+                    instrumentation.add_bytes(len(line))
+                    file.flush()
+                    os.fsync(file.fileno())
+                    stat = os.fstat(file.fileno())
+            except BaseException:
+                self.invalidate()
+                raise
+
+            # Skip our own line on the next load, unless someone else appended
+            # before it, in which case the replay is harmless.
+            if (
+                stat.st_ino == self._journal_inode
+                and stat.st_size == self._journal_offset + len(line)
+            ) or (self._journal_inode is None and stat.st_size == len(line)):
+                self._journal_inode = stat.st_ino
+                self._journal_offset = stat.st_size
+
+            self._empty = False
+            self._journal_updates += 1
+
+            if self._journal_updates >= self.compact_threshold:
+                self.compact_in_background()
+
+    def pending(self) -> bool:
+        """
+        Check whether the journal holds changes that aren't in the snapshot.
+
+        Returns:
+            bool: True if the journal isn't empty.
+        """
+        return self.journal_path.is_file() and self.journal_path.stat().st_size > 0
+
+    def compact(self) -> None:
+        """
+        Merge the journal into the snapshot and start a new, empty journal.
+        """
+        with self.lock, self._lock:
+            if not self._refresh():
+                self._reload()
+
+            if not self.pending():
+                return
+
+            write_atomically(self.file_path, json.dumps(self._data))
+            write_atomically(self.journal_path, "")
+
+            self._snapshot_signature = self._signature(os.stat(self.file_path))
+            self._journal_inode = os.stat(self.journal_path).st_ino
+            self._journal_offset = 0
+            self._journal_updates = 0
+
+        if self.on_compact is not None:
+            self.on_compact()
+
+    def compact_in_background(self) -> None:
+        """
+        Compact the journal in a separate thread, unless a compaction is running.
+        The thread isn't a daemon, so the interpreter waits for it on exit.
+        """
+        with self._lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return
+
+            self._compaction = threading.Thread(
+                target=self.compact, name="mixver-journal-compaction"
+            )
+            self._compaction.start()
+
+    def wait(self) -> None:
+        """
+        Wait for the running background compaction, if any.
+        """
+        compaction = self._compaction
+
+        if compaction is not None:
+            compaction.join()
+
+    def invalidate(self) -> None:
+        """
+        Drop the in-memory content, forcing the next load to read the files again.
+        """
+        with self._lock:
+            self._data = None
+
+    @staticmethod
+    def _signature(stat: os.stat_result) -> Tuple[int, int, int]:
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _snapshot_stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            return self._signature(os.stat(self.file_path))
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self) -> bool:
+        """
+        Bring the in-memory content up to date by reading the new journal lines.
+
+        Returns:
+            bool: False if the files must be read again from scratch.
+        """
+        if self._data is None:
+            return False
+
+        # The journal is checked before the snapshot: compactions replace the
+        # snapshot before the journal, so a new journal implies a new snapshot.
+        try:
+            journal_stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            journal_stat = None
+
+        if self._snapshot_stat() != self._snapshot_signature:
+            return False
+
+        if journal_stat is None:
+            return self._journal_inode is None
+
+        if self._journal_inode is None:
+            self._journal_inode = journal_stat.st_ino
+        elif (
+            journal_stat.st_ino != self._journal_inode
+            or journal_stat.st_size < self._journal_offset
+        ):
+            return False
+
+        if journal_stat.st_size > self._journal_offset:
+            self._read_journal()
+
+        return True
+
+    def _reload(self) -> None:
+        """
+        Read the snapshot and replay the whole journal over it.
+
+        The journal is read before the snapshot, and both are read again if a
+        compaction replaces the snapshot in between, since an older journal
+        replayed over a newer snapshot could undo the changes made after the
+        compaction. A journal that a compaction is about to replace is already
+        in the snapshot, and it's complete, since compactions hold the lock, so
+        replaying it again leaves the snapshot unchanged.
+        """
+        while True:
+            self._journal_inode = None
+            self._journal_offset = 0
+            expected = self._snapshot_stat()
+            lines = self._read_journal_lines()
+
+            try:
+                file = open(self.file_path, mode="r", encoding="utf8")
+            except FileNotFoundError:
+                # Registry files that are only created on their first write
+                signature, text = None, ""
+            else:
+                with file:
+                    stat = os.fstat(file.fileno())
+                    signature = self._signature(stat)
+                    text = file.read()
+                    instrumentation.add_bytes(stat.st_size)
+
+            if signature == expected:
+                break
+
+        self._snapshot_signature = signature
+        self._journal_updates = 0
+
+        try:
+            self._data = json.loads(text)
+            self._empty = False
+        except JSONDecodeError:
+            self._data = {}
+            self._empty = True
+
+        self._apply_lines(lines)
+
+    def _read_journal(self) -> None:
+        self._apply_lines(self._read_journal_lines())
+
+    def _read_journal_lines(self) -> List[bytes]:
+        """
+        Read the complete journal lines appended after the current offset.
+        """
+        try:
+            file = open(self.journal_path, mode="rb")
+        except FileNotFoundError:
+            return []
+
+        with file:
+            self._journal_inode = os.fstat(file.fileno()).st_ino
+            file.seek(self._journal_offset)
+            content = file.read()
+
+        instrumentation.add_bytes(len(content))
+
+        # An incomplete last line is an update that's still being appended
+        content = content[: content.rfind(b"\n") + 1]
+        self._journal_offset += len(content)
+
+        return content.splitlines()
+
+    def _apply_lines(self, lines: List[bytes]) -> None:
+        for line in lines:
+            try:
+                operations: Any = json.loads(line)
+            except JSONDecodeError:
+                # Leftover of an interrupted append
+                continue
+
+            for operation in operations:
+                apply_operation(self._data, operation)
+
+            self._empty = False
+            self._journal_updates += 1
@@ -0,0 +1,307 @@
+"""
+Read-only binary snapshot of the JSON registry, shared by processes through
+memory mapping.
+
+The snapshot holds three tables sorted by key, each one mapping a key to an
+artifact filename: the versions, keyed by name and version, the latest version
+of each artifact, keyed by name, and the tags. Lookups binary search the mapped
+file, so processes resolving artifacts don't parse the registry files or keep
+copies of them in their heap, and the pages of the file are shared by all of
+them.
+
+Layout, in the byte order of the machine that wrote it:
+
+    header: magic, byte order mark, format version, flags, number of source
+        files, and offset and number of entries of each table.
+    source signatures: inode, size and modification time of each registry
+        file when the snapshot was written, all zeros for missing files.
+    tables: offsets of the keys in the strings, as 64-bit integers, followed
+        by the lengths of the keys and the lengths of the values, as 32-bit
+        integers.
+    strings: UTF-8 keys, each one followed by its value.
+
+Registry writers regenerate the snapshot after every write, and readers only
+use it while the registry files keep the signatures it recorded, so writes that
+didn't regenerate it, such as the ones of older releases, aren't hidden.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from itertools import accumulate, chain
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from mixver.versioning.files import write_atomically
+
+_MAGIC = b"MIXVSNAP"
+# Read back as another number on machines with the other byte order
+_BYTE_ORDER_MARK = 0x01020304
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("=8sIIII6Q")
+_SIGNATURE = struct.Struct("=3Q")
+
+# Flags of the registry files that were empty when the snapshot was written
+VERSIONS_EMPTY = 1
+TAGS_EMPTY = 2
+
+# Separates the name from the version in the keys of the versions table. It
+# can't be part of a name, since filenames can't contain it.
+_SEPARATOR = "\x00"
+
+Signature = Tuple[int, int, int]
+
+
+def file_signature(file_path: Path) -> Signature:
+    """
+    Get the inode, size and modification time of a file.
+
+    Args:
+        file_path (Path): File path.
+
+    Returns:
+        Signature: File signature, all zeros if it doesn't exist.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return 0, 0, 0
+
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def version_key(name: str, version: str) -> bytes:
+    """
+    Get the key of an artifact version in the versions table.
+
+    Args:
+        name (str): Artifact's name.
+        version (str): Artifact's version.
+
+    Returns:
+        bytes: Versions table key.
+    """
+    return f"{name}{_SEPARATOR}{version}".encode("utf8")
+
+
+def write_snapshot(
+    file_path: Path,
+    versions: Dict[Tuple[str, str], str],
+    latest: Dict[str, str],
+    tags: Dict[str, str],
+    signatures: List[Signature],
+    flags: int = 0,
+) -> None:
+    """
+    Write a registry snapshot, replacing the previous one atomically.
+
+    Args:
+        file_path (Path): Snapshot path.
+        versions (Dict[Tuple[str, str], str]): Filename of each name and
+            version.
+        latest (Dict[str, str]): Filename of the latest version of each name.
+        tags (Dict[str, str]): Filename of each tag.
+        signatures (List[Signature]): Signatures of the registry files the
+            snapshot was built from.
+        flags (int): `VERSIONS_EMPTY` and `TAGS_EMPTY` flags. Default is 0.
+    """
+    strings: List[bytes] = []
+    size = 0
+    tables = []
+
+    for entries in (
+        {
+            version_key(name, version): filename
+            for (name, version), filename in versions.items()
+        },
+        {name.encode("utf8"): filename for name, filename in latest.items()},
+        {tag.encode("utf8"): filename for tag, filename in tags.items()},
+    ):
+        keys = sorted(entries)
+        values = [entries[key].encode("utf8") for key in keys]
+        pairs = list(chain.from_iterable(zip(keys, values)))
+        starts = array("Q", accumulate(map(len, pairs), initial=size))
+        size = starts.pop()
+        # Values come right after their keys, so only the keys are located
+        tables.append(
+            (
+                b"".join(
+                    (
+                        starts[0::2].tobytes(),
+                        array("I", map(len, keys)).tobytes(),
+                        array("I", map(len, values)).tobytes(),
+                    )
+                ),
+                len(keys),
+            )
+        )
+        strings += pairs
+
+    position = _HEADER.size + _SIGNATURE.size * len(signatures)
+    table_positions = []
+
+    for table, count in tables:
+        table_positions.extend((position, count))
+        position += len(table)
+
+    write_atomically(
+        file_path,
+        b"".join(
+            (
+                _HEADER.pack(
+                    _MAGIC,
+                    _BYTE_ORDER_MARK,
+                    _FORMAT_VERSION,
+                    flags,
+                    len(signatures),
+                    *table_positions,
+                ),
+                *(_SIGNATURE.pack(*signature) for signature in signatures),
+                *(table for table, _ in tables),
+                *strings,
+            )
+        ),
+    )
+
+
+class _Table:
+    """
+    Columns of a snapshot table, read in place from the mapped file.
+    """
+
+    def __init__(self, buffer: memoryview, offset: int, count: int) -> None:
+        self.starts = buffer[offset : offset + 8 * count].cast("Q")
+        self.key_lengths = buffer[offset + 8 * count : offset + 12 * count].cast("I")
+        self.value_lengths = buffer[offset + 12 * count : offset + 16 * count].cast("I")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+class SnapshotView:
+    """
+    Tables of a mapped snapshot.
+
+    Attributes:
+        signature (Signature): Signature of the snapshot file.
+        flags (int): `VERSIONS_EMPTY` and `TAGS_EMPTY` flags.
+        sources (List[Signature]): Signatures of the registry files the
+            snapshot was built from.
+    """
+
+    def __init__(self, buffer: mmap.mmap, signature: Signature) -> None:
+        header = _HEADER.unpack_from(buffer)
+
+        if header[:3] != (_MAGIC, _BYTE_ORDER_MARK, _FORMAT_VERSION):
+            raise ValueError("Unknown registry snapshot format.")
+
+        view = memoryview(buffer)
+        self.signature = signature
+        self.flags = header[3]
+        self.sources = [
+            _SIGNATURE.unpack_from(buffer, _HEADER.size + _SIGNATURE.size * i)
+            for i in range(header[4])
+        ]
+        self.versions = _Table(view, header[5], header[6])
+        self.latest = _Table(view, header[7], header[8])
+        self.tags = _Table(view, header[9], header[10])
+        self._buffer = buffer
+        # The strings come right after the tags table
+        self._strings = header[9] + 16 * header[10]
+
+    def find(self, table: _Table, key: bytes) -> Optional[str]:
+        """
+        Binary search a key in a table.
+
+        Args:
+            table (_Table): One of `versions`, `latest` and `tags`.
+            key (bytes): Key to find.
+
+        Returns:
+            Optional[str]: Filename of the key, or None if it isn't there.
+        """
+        buffer, strings = self._buffer, self._strings
+        starts, key_lengths = table.starts, table.key_lengths
+        low, high = 0, len(starts)
+
+        while low < high:
+            middle = (low + high) // 2
+            start = strings + starts[middle]
+            end = start + key_lengths[middle]
+            current = buffer[start:end]
+
+            if current == key:
+                return buffer[end : end + table.value_lengths[middle]].decode("utf8")
+
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        return None
+
+
+class RegistrySnapshot:
+    """
+    Reader of a registry snapshot. The snapshot file is mapped on the first
+    lookup and mapped again whenever it's regenerated. It's only trusted while
+    the registry files have the signatures it recorded.
+
+    Attributes:
+        file_path (Path): Snapshot path.
+        sources (List[Path]): Registry files the snapshot is built from.
+    """
+
+    def __init__(self, file_path: Path, sources: List[Path]) -> None:
+        self.file_path = Path(file_path)
+        self.sources = [Path(source) for source in sources]
+        self._view: Optional[SnapshotView] = None
+
+    def view(self) -> Optional[SnapshotView]:
+        """
+        Get the tables of the snapshot if it's up to date with the registry.
+
+        Returns:
+            Optional[SnapshotView]: Snapshot tables, or None if the snapshot
+                is missing or out of date and the registry files must be read.
+        """
+        signature = file_signature(self.file_path)
+
+        if signature == (0, 0, 0):
+            return None
+
+        view = self._view
+
+        if view is None or view.signature != signature:
+            view = self._map()
+
+            if view is None:
+                return None
+
+        if view.sources != [file_signature(source) for source in self.sources]:
+            return None
+
+        return view
+
+    def _map(self) -> Optional[SnapshotView]:
+        """
+        Map the snapshot file. The previous mapping is closed once the lookups
+        using it are done, when it's no longer referenced.
+        """
+        try:
+            with open(self.file_path, "rb") as file:
+                stat = os.fstat(file.fileno())
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        try:
+            # The file may have been replaced since it was checked
+            view = SnapshotView(buffer, (stat.st_ino, stat.st_size, stat.st_mtime_ns))
+        except (ValueError, struct.error):
+            return None
+
+        self._view = view
+
+        return view
@@ -0,0 +1,768 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+from mixver.versioning.base_versioner import BaseVersioner
+from mixver.versioning.exceptions import ArtifactDoesNotExist, EmptyRegistry, EmptyTags
+from mixver.versioning.versioner import Versioner
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    pushed_at REAL,
+    checksum TEXT,
+    PRIMARY KEY (name, version)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL PRIMARY KEY,
+    name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    filename TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS tags_artifact ON tags (name, version);
+
+CREATE TABLE IF NOT EXISTS names (
+    name TEXT NOT NULL PRIMARY KEY,
+    latest INTEGER NOT NULL,
+    counter INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS tag_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tag TEXT NOT NULL,
+    name TEXT,
+    version INTEGER,
+    filename TEXT,
+    time REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS tag_history_tag ON tag_history (tag, id);
+"""
+
+# Databases are upgraded to this schema version when they are opened
+_SCHEMA_VERSION = 3
+
+
+def _parse_version(version: str) -> Optional[int]:
+    """
+    Convert a version to the integer stored in the database. Versions that the
+    JSON registry wouldn't find, such as "01", aren't converted.
+    """
+    try:
+        number = int(version)
+    except ValueError:
+        return None
+
+    return number if str(number) == version else None
+
+
+@dataclass(frozen=True)
+class SQLiteVersioner(BaseVersioner):
+    """
+    Class that manages the artifacts versioning using a SQLite database.
+
+    Versions and tags are stored in indexed tables, so looking up a version or
+    the artifact of a tag doesn't depend on the size of the registry. The
+    latest version and the version counter of each artifact are kept in the
+    `names` table, and every change of a tag is appended to the `tag_history`
+    table. The database uses write-ahead logging, so readers in other
+    processes aren't blocked by writers.
+
+    When the database doesn't exist yet, it's created with the content of the
+    JSON registry files found in the storage path, if any.
+
+    Attributes:
+        storage_path (str): Path where to create the database.
+        timeout (float): Seconds to wait for other writers to release the
+            database. Default is 30.
+        _database_file (str): Database filename.
+        _local (threading.local): Database connection of each thread.
+    """
+
+    storage_path: str
+    timeout: float = 30.0
+    _database_file: str = field(default=".registry.db", init=False)
+    _local: threading.local = field(
+        default_factory=threading.local, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        """
+        The post initializer creates the database if it doesn't exist, migrating
+        the existing JSON registry into it.
+        """
+        exists = os.path.isfile(Path(self.storage_path, self._database_file))
+        connection = self._connect()
+        connection.executescript(_SCHEMA)
+
+        if not exists:
+            migrate_json_registry(self)
+
+        if connection.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            with self._transaction() as connection:
+                _add_push_times(connection)
+                _add_checksums(connection)
+                _index_names(connection)
+                connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Get the database connection of the current thread. Connections aren't
+        shared with forked processes.
+
+        Returns:
+            sqlite3.Connection: Database connection.
+        """
+        connection = getattr(self._local, "connection", None)
+
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                Path(self.storage_path, self._database_file),
+                timeout=self.timeout,
+                isolation_level=None,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Write transaction. The database is locked for other writers from its
+        start, so concurrent read-modify-write cycles don't interleave.
+
+        Yields:
+            sqlite3.Connection: Database connection.
+        """
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        connection.execute("COMMIT")
+
+    def close(self) -> None:
+        """
+        Close the database connection of the current thread.
+        """
+        connection = getattr(self._local, "connection", None)
+
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _raise_not_found(self, name: str) -> None:
+        """
+        Raise the exception for an artifact that isn't in the registry.
+        """
+        if self._connect().execute("SELECT 1 FROM versions LIMIT 1").fetchone():
+            raise ArtifactDoesNotExist(name)
+
+        raise EmptyRegistry()
+
+    def add_artifact(
+        self,
+        name: str,
+        tags: Optional[list[str]] = None,
+        checksum: Optional[str] = None,
+    ) -> str:
+        return self.add_artifacts([(name, tags)], checksums=[checksum])[0]
+
+    def add_artifacts(
+        self,
+        artifacts: list[tuple[str, Optional[list[str]]]],
+        checksums: Optional[list[Optional[str]]] = None,
+    ) -> list[str]:
+        filenames = []
+        checksums = checksums or [None] * len(artifacts)
+        now = time.time()
+
+        with self._transaction() as connection:
+            for (name, tags), checksum in zip(artifacts, checksums):
+                row = connection.execute(
+                    "SELECT counter FROM names WHERE name = ?", (name,)
+                ).fetchone()
+                new_version = (row[0] if row else 0) + 1
+                filename = f"{name}_{new_version}"
+
+                connection.execute(
+                    "INSERT INTO versions (name, version, filename, pushed_at, "
+                    "checksum) VALUES (?, ?, ?, ?, ?)",
+                    (name, new_version, filename, now, checksum),
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO names (name, latest, counter) "
+                    "VALUES (?, ?, ?)",
+                    (name, new_version, new_version),
+                )
+                _retag(
+                    connection,
+                    [(tag, (name, new_version, filename)) for tag in tags or []],
+                )
+                filenames.append(filename)
+
+        return filenames
+
+    def restore_artifacts(
+        self, artifacts: list[tuple[str, str, Optional[str], Optional[float]]]
+    ) -> None:
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO versions (name, version, filename, pushed_at, "
+                "checksum) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (name, int(version), f"{name}_{version}", pushed_at, checksum)
+                    for name, version, checksum, pushed_at in artifacts
+                ],
+            )
+            connection.executemany(
+                "INSERT INTO names (name, latest, counter) "
+                "SELECT name, MAX(version), MAX(version) FROM versions "
+                "WHERE name = ? GROUP BY name "
+                "ON CONFLICT (name) DO UPDATE SET latest = excluded.latest, "
+                "counter = MAX(counter, excluded.counter)",
+                [(name,) for name in {artifact[0] for artifact in artifacts}],
+            )
+
+    def update_tags(self, name: str, tags: list[str], version: str = "") -> None:
+        with self._transaction() as connection:
+            if version:
+                row = connection.execute(
+                    "SELECT version, filename FROM versions "
+                    "WHERE name = ? AND version = ?",
+                    (name, _parse_version(version)),
+                ).fetchone()
+            else:
+                row = connection.execute(
+                    "SELECT versions.version, versions.filename FROM names "
+                    "JOIN versions ON versions.name = names.name "
+                    "AND versions.version = names.latest WHERE names.name = ?",
+                    (name,),
+                ).fetchone()
+
+            if row is None:
+                raise ArtifactDoesNotExist(name)
+
+            _retag(connection, [(tag, (name, *row)) for tag in tags])
+
+    def remove_artifact(self, name: str, version: str = "") -> None:
+        with self._transaction() as connection:
+            if not version:
+                cursor = connection.execute(
+                    "DELETE FROM versions WHERE name = ?", (name,)
+                )
+
+                if not cursor.rowcount:
+                    raise ArtifactDoesNotExist(name)
+
+                _detach_tags(connection, "name = ?", (name,))
+                connection.execute("DELETE FROM names WHERE name = ?", (name,))
+                return
+
+            cursor = connection.execute(
+                "DELETE FROM versions WHERE name = ? AND version = ?",
+                (name, _parse_version(version)),
+            )
+
+            if not cursor.rowcount:
+                raise ArtifactDoesNotExist(name)
+
+            _detach_tags(connection, "name = ? AND version = ?", (name, int(version)))
+            latest = connection.execute(
+                "SELECT MAX(version) FROM versions WHERE name = ?", (name,)
+            ).fetchone()[0]
+
+            if latest is None:
+                connection.execute("DELETE FROM names WHERE name = ?", (name,))
+            else:
+                connection.execute(
+                    "UPDATE names SET latest = ? WHERE name = ?", (latest, name)
+                )
+
+    def get_artifact_by_version(self, name: str, version: str = "") -> str:
+        connection = self._connect()
+
+        if version:
+            row = connection.execute(
+                "SELECT filename FROM versions WHERE name = ? AND version = ?",
+                (name, _parse_version(version)),
+            ).fetchone()
+        else:
+            row = connection.execute(
+                "SELECT versions.filename FROM names "
+                "JOIN versions ON versions.name = names.name "
+                "AND versions.version = names.latest WHERE names.name = ?",
+                (name,),
+            ).fetchone()
+
+        if row is None:
+            self._raise_not_found(name)
+
+        return row[0]
+
+    def get_artifact_by_tag(self, tag: str) -> str:
+        connection = self._connect()
+        row = connection.execute(
+            "SELECT filename FROM tags WHERE tag = ?", (tag,)
+        ).fetchone()
+
+        if row is None:
+            if not connection.execute("SELECT 1 FROM tags LIMIT 1").fetchone():
+                raise EmptyTags()
+            raise ArtifactDoesNotExist(tag, is_tag=True)
+
+        return row[0]
+
+    def get_artifacts(self, references: list[dict[str, str]]) -> list[str]:
+        connection = self._connect()
+        # A read transaction, so all the references see the same registry
+        connection.execute("BEGIN")
+
+        try:
+            return [
+                (
+                    self.get_artifact_by_tag(reference["tag"])
+                    if reference.get("tag")
+                    else self.get_artifact_by_version(
+                        reference["name"], reference.get("version", "")
+                    )
+                )
+                for reference in references
+            ]
+        finally:
+            connection.execute("COMMIT")
+
+    def get_versions(self, name: str) -> list[str]:
+        rows = (
+            self._connect()
+            .execute(
+                "SELECT version FROM versions WHERE name = ? ORDER BY version", (name,)
+            )
+            .fetchall()
+        )
+
+        if not rows:
+            self._raise_not_found(name)
+
+        return [str(row[0]) for row in rows]
+
+    def get_filenames(self, name: str) -> dict[str, str]:
+        rows = (
+            self._connect()
+            .execute(
+                "SELECT version, filename FROM versions WHERE name = ? "
+                "ORDER BY version",
+                (name,),
+            )
+            .fetchall()
+        )
+
+        if not rows:
+            self._raise_not_found(name)
+
+        return {str(version): filename for version, filename in rows}
+
+    def get_all_filenames(self) -> dict[str, dict[str, str]]:
+        filenames: dict[str, dict[str, str]] = {}
+        rows = (
+            self._connect()
+            .execute(
+                "SELECT name, version, filename FROM versions ORDER BY name, version"
+            )
+            .fetchall()
+        )
+
+        for name, version, filename in rows:
+            filenames.setdefault(name, {})[str(version)] = filename
+
+        return filenames
+
+    def get_checksum(self, name: str, version: str) -> Optional[str]:
+        row = (
+            self._connect()
+            .execute(
+                "SELECT checksum FROM versions WHERE name = ? AND version = ?",
+                (name, _parse_version(version)),
+            )
+            .fetchone()
+        )
+
+        return row[0] if row else None
+
+    def get_all_checksums(self) -> dict[str, str]:
+        rows = self._connect().execute(
+            "SELECT filename, checksum FROM versions WHERE checksum IS NOT NULL"
+        )
+
+        return dict(rows)
+
+    def get_all_push_times(self) -> dict[str, float]:
+        rows = self._connect().execute(
+            "SELECT filename, pushed_at FROM versions WHERE pushed_at IS NOT NULL"
+        )
+
+        return dict(rows)
+
+    def list_artifacts(
+        self,
+        name_prefix: str = "",
+        since: Optional[float] = None,
+        after: Optional[tuple[str, str]] = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        # Range conditions over the primary key, so only the page is read
+        start = max(name_prefix, after[0]) if after else name_prefix
+        conditions, parameters = ["name >= ?"], [start]
+
+        if name_prefix:
+            conditions.append("name < ?")
+            parameters.append(_prefix_end(name_prefix))
+
+        if after:
+            conditions.append("(name > ? OR version > ?)")
+            parameters.extend([after[0], int(after[1])])
+
+        if since is not None:
+            conditions.append("pushed_at >= ?")
+            parameters.append(since)
+
+        rows = (
+            self._connect()
+            .execute(
+                "SELECT name, version, filename, pushed_at FROM versions "
+                f"WHERE {' AND '.join(conditions)} ORDER BY name, version LIMIT ?",
+                (*parameters, limit),
+            )
+            .fetchall()
+        )
+
+        return [
+            {
+                "name": name,
+                "version": str(version),
+                "filename": filename,
+                "pushed_at": pushed_at,
+            }
+            for name, version, filename, pushed_at in rows
+        ]
+
+    def iter_tags(
+        self, tag_pattern: str = "*", name_pattern: str = "*"
+    ) -> Iterator[tuple[str, str, str, str]]:
+        cursor = self._connect().execute(
+            "SELECT tag, name, version, filename FROM tags "
+            "WHERE tag GLOB ? AND name GLOB ? ORDER BY tag",
+            (_glob(tag_pattern), _glob(name_pattern)),
+        )
+
+        for tag, name, version, filename in cursor:
+            yield tag, name, str(version), filename
+
+    def iter_latest_versions(
+        self, name_pattern: str = "*"
+    ) -> Iterator[tuple[str, str, str]]:
+        # Latest version pointers, as in the lookups of a single artifact
+        cursor = self._connect().execute(
+            "SELECT names.name, versions.version, versions.filename FROM names "
+            "JOIN versions ON versions.name = names.name "
+            "AND versions.version = names.latest "
+            "WHERE names.name GLOB ? ORDER BY names.name",
+            (_glob(name_pattern),),
+        )
+
+        for name, version, filename in cursor:
+            yield name, str(version), filename
+
+    def get_tags_data_for_visualization(self):
+        rows = (
+            self._connect()
+            .execute("SELECT tag, name, version, filename FROM tags ORDER BY tag")
+            .fetchall()
+        )
+
+        if not rows:
+            raise EmptyTags()
+
+        tags, names, versions, paths = (list(column) for column in zip(*rows))
+        return tags, names, [str(version) for version in versions], paths
+
+    def get_tags(self, name: str, version: str = "") -> list[str]:
+        if version:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT tag FROM tags WHERE name = ? AND version = ? ORDER BY tag",
+                    (name, _parse_version(version)),
+                )
+                .fetchall()
+            )
+        else:
+            rows = (
+                self._connect()
+                .execute("SELECT tag FROM tags WHERE name = ? ORDER BY tag", (name,))
+                .fetchall()
+            )
+
+        return [row[0] for row in rows]
+
+    def get_tag_history(self, tag: str) -> list[dict]:
+        rows = (
+            self._connect()
+            .execute(
+                "SELECT name, version, filename, time FROM tag_history "
+                "WHERE tag = ? ORDER BY id",
+                (tag,),
+            )
+            .fetchall()
+        )
+
+        return [
+            {
+                "name": name,
+                "version": None if version is None else str(version),
+                "filename": filename,
+                "time": changed,
+            }
+            for name, version, filename, changed in rows
+        ]
+
+    def rollback_tag(self, tag: str, steps: int = 1) -> str:
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT name, version, filename FROM tag_history "
+                "WHERE tag = ? ORDER BY id DESC LIMIT 1 OFFSET ?",
+                (tag, steps),
+            ).fetchone()
+
+            if row is None or row[0] is None:
+                raise ArtifactDoesNotExist(tag, is_tag=True)
+
+            name, version, filename = row
+            exists = connection.execute(
+                "SELECT 1 FROM versions WHERE name = ? AND version = ?",
+                (name, version),
+            ).fetchone()
+
+            if not exists:
+                raise ArtifactDoesNotExist(name)
+
+            _retag(connection, [(tag, (name, version, filename))])
+
+        return filename
+
+
+def _retag(
+    connection: sqlite3.Connection,
+    changes: list[tuple[str, Optional[tuple[str, int, str]]]],
+) -> None:
+    """
+    Point tags to artifacts, or detach them from their artifact, recording the
+    changes in the tag history. Tags that already point to their new artifact
+    aren't changed.
+    """
+    now = time.time()
+
+    for tag, target in changes:
+        current = connection.execute(
+            "SELECT name, version, filename FROM tags WHERE tag = ?", (tag,)
+        ).fetchone()
+
+        if current == target:
+            continue
+
+        if target is None:
+            connection.execute("DELETE FROM tags WHERE tag = ?", (tag,))
+        else:
+            connection.execute(
+                "INSERT OR REPLACE INTO tags (tag, name, version, filename) "
+                "VALUES (?, ?, ?, ?)",
+                (tag, *target),
+            )
+
+        connection.execute(
+            "INSERT INTO tag_history (tag, name, version, filename, time) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (tag, *(target or (None, None, None)), now),
+        )
+
+
+def _detach_tags(connection: sqlite3.Connection, condition: str, parameters) -> None:
+    """
+    Detach the tags of the artifacts matching a condition, found through the
+    index of the tags by artifact.
+    """
+    rows = connection.execute(
+        f"SELECT tag FROM tags WHERE {condition}", parameters
+    ).fetchall()
+    _retag(connection, [(tag, None) for (tag,) in rows])
+
+
+def _prefix_end(prefix: str) -> str:
+    """
+    Get the smallest string greater than all the ones starting with a prefix.
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _add_push_times(connection: sqlite3.Connection) -> None:
+    """
+    Add the push time column to the `versions` table of databases created
+    before it existed. The versions already in them don't get a push time.
+    """
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(versions)")]
+
+    if "pushed_at" not in columns:
+        connection.execute("ALTER TABLE versions ADD COLUMN pushed_at REAL")
+
+
+def _add_checksums(connection: sqlite3.Connection) -> None:
+    """
+    Add the checksum column to the `versions` table of databases created before
+    it existed. The versions already in them don't get a checksum.
+    """
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(versions)")]
+
+    if "checksum" not in columns:
+        connection.execute("ALTER TABLE versions ADD COLUMN checksum TEXT")
+
+
+def _index_names(connection: sqlite3.Connection) -> None:
+    """
+    Add the artifacts that are missing from the `names` table, such as the ones
+    of databases created before it existed.
+    """
+    connection.execute(
+        "INSERT OR IGNORE INTO names (name, latest, counter) "
+        "SELECT name, MAX(version), MAX(version) FROM versions GROUP BY name"
+    )
+
+
+def migrate_json_registry(versioner: SQLiteVersioner) -> None:
+    """
+    Copy the JSON registry files of a storage into its SQLite database. Entries
+    that are already in the database are kept, so it can be run more than once.
+
+    Args:
+        versioner (SQLiteVersioner): Versioner of the destination database.
+    """
+    storage_path = versioner.storage_path
+
+    if not os.path.isfile(Path(storage_path, ".versions.json")):
+        return
+
+    # The JSON versioner merges any pending journal into the files
+    json_versioner = Versioner(storage_path=storage_path)
+
+    with json_versioner._read(
+        json_versioner._index_file
+    ) as index_data, json_versioner._read(json_versioner._version_file) as version_data:
+        versions = [
+            (
+                name,
+                int(version),
+                filename,
+                index_data.get(name, {}).get("pushed", {}).get(version),
+                index_data.get(name, {}).get("checksum", {}).get(version),
+            )
+            for name, name_versions in version_data.items()
+            for version, filename in name_versions.items()
+        ]
+
+    with json_versioner._read(json_versioner._tags_file) as tags_data:
+        tags = [
+            (tag, name, int(version), filename)
+            for tag, tagged in tags_data.items()
+            for name, tagged_versions in tagged.items()
+            for version, filename in tagged_versions.items()
+        ]
+
+    history = [
+        (
+            entry["tag"],
+            entry["name"],
+            None if entry["version"] is None else int(entry["version"]),
+            entry["filename"],
+            entry["time"],
+        )
+        for entry in json_versioner._read_tag_history()
+    ]
+
+    with versioner._transaction() as connection:
+        connection.executemany(
+            "INSERT OR IGNORE INTO versions (name, version, filename, pushed_at, "
+            "checksum) VALUES (?, ?, ?, ?, ?)",
+            versions,
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO tags (tag, name, version, filename) "
+            "VALUES (?, ?, ?, ?)",
+            tags,
+        )
+
+        # The history would be duplicated by a second migration
+        if not connection.execute("SELECT 1 FROM tag_history LIMIT 1").fetchone():
+            connection.executemany(
+                "INSERT INTO tag_history (tag, name, version, filename, time) "
+                "VALUES (?, ?, ?, ?, ?)",
+                history,
+            )
+        _index_names(connection)
+
+
+def _glob(pattern: str) -> str:
+    """
+    Translate a shell-style pattern, as matched by `fnmatch.fnmatchcase`, into
+    a SQLite GLOB pattern. Both are case-sensitive, but GLOB negates sets with
+    `[^...]` instead of `[!...]`, and a `[` without its closing bracket is
+    taken literally by fnmatch only.
+    """
+    translated = []
+    i = 0
+
+    while i < len(pattern):
+        char = pattern[i]
+        i += 1
+
+        if char != "[":
+            translated.append(char)
+            continue
+
+        # A "]" right after the opening bracket, or its negation, is literal
+        end = i + 1 if pattern[i : i + 1] == "!" else i
+        end = pattern.find("]", end + 1 if pattern[end : end + 1] == "]" else end)
+
+        if end == -1:
+            translated.append("[[]")
+            continue
+
+        content = pattern[i:end]
+        i = end + 1
+
+        if content.startswith("!"):
+            content = "^" + content[1:]
+        elif content == "^":
+            translated.append("^")
+            continue
+        elif content.startswith("^"):
+            # A literal "^" for fnmatch, which GLOB only takes as such elsewhere
+            content = content[1:] + "^"
+
+        translated.append(f"[{content}]")
+
+    return "".join(translated)
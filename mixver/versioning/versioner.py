@@ -1,16 +1,119 @@
+import bisect
+import fnmatch
 import json
 import os
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from json.decoder import JSONDecodeError
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterator, Optional, Tuple
 
+from mixver import instrumentation
+from mixver.versioning.base_versioner import BaseVersioner
 from mixver.versioning.exceptions import ArtifactDoesNotExist, EmptyRegistry, EmptyTags
+from mixver.versioning.files import FileLock, append_lines, write_atomically
+from mixver.versioning.journal import JSONJournal, apply_operation
+from mixver.versioning.snapshot import (
+    TAGS_EMPTY,
+    VERSIONS_EMPTY,
+    RegistrySnapshot,
+    SnapshotView,
+    file_signature,
+    version_key,
+    write_snapshot,
+)
+
+
+@dataclass
+class _CachedFile:
+    """
+    Parsed content of a registry file along with the file state it was read from.
+    """
+
+    signature: Tuple[int, int, int]
+    data: dict
+    text: str
+
+
+class RegistryCache:
+    """
+    In-memory cache of parsed registry files.
+
+    An entry is reused as long as the inode, size and modification time of the
+    file stay the same, so changes made by other processes are still observed.
+    Entries whose file was modified within `racy_window_ns` of being cached are
+    never trusted, since a second write inside the same timestamp tick could
+    leave the signature unchanged.
+
+    Attributes:
+        racy_window_ns (int): Minimum age, in nanoseconds, of a file modification
+            for its cached content to be reused.
+    """
+
+    def __init__(self, racy_window_ns: int = 10_000_000) -> None:
+        self.racy_window_ns = racy_window_ns
+        self._entries: Dict[str, _CachedFile] = {}
+
+    @staticmethod
+    def _signature(file_path: str) -> Tuple[int, int, int]:
+        stat = os.stat(file_path)
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def get(self, file_path: str) -> Optional[Tuple[dict, str]]:
+        """
+        Get the cached content of a file if it hasn't changed on disk.
+
+        Args:
+            file_path (str): Registry file path.
+
+        Returns:
+            Optional[Tuple[dict, str]]: Parsed content and the text it was parsed
+                from, or None if it must be reloaded.
+        """
+        entry = self._entries.get(str(file_path))
+
+        if entry is None or entry.signature != self._signature(file_path):
+            return None
+
+        return entry.data, entry.text
+
+    def put(self, file_path: str, data: dict, text: str) -> None:
+        """
+        Cache the parsed content of a file with its current signature.
+
+        Args:
+            file_path (str): Registry file path.
+            data (dict): Parsed content.
+            text (str): File content.
+        """
+        signature = self._signature(file_path)
+
+        if time.time_ns() - signature[2] < self.racy_window_ns:
+            self.invalidate(file_path)
+        else:
+            self._entries[str(file_path)] = _CachedFile(signature, data, text)
+
+    def invalidate(self, file_path: str) -> None:
+        """
+        Drop the cached content of a file.
+
+        Args:
+            file_path (str): Registry file path.
+        """
+        self._entries.pop(str(file_path), None)
 
 
 class JSONManager:
     """
     This class manages reading and writing JSON files.
+
+    The file is only rewritten on exit if its content changed, and it's replaced
+    atomically, so readers never see it partially written. When a cache is
+    given, the parsed content is taken from it if the file hasn't changed since
+    it was cached. The cached object is returned as is to read-only users, who
+    must not modify it, while writers get their own copy, which replaces the
+    cached one on exit, so readers never see the content change under them.
     """
 
     def __init__(
@@ -19,6 +122,7 @@ class JSONManager:
         catch_exceptions: Optional[Exception] = JSONDecodeError,
         raise_exceptions: Optional[Exception] = None,
         write: bool = True,
+        cache: Optional[RegistryCache] = None,
     ):
         self.file_path = file_path
         self.catch_exception = catch_exceptions
@@ -26,42 +130,162 @@ class JSONManager:
         self.read_file = None
         self.write_file = None
         self.data = None
+        self.text = None
         self.write = write
+        self.cache = cache
 
     def __enter__(self):
+        cached = self.cache.get(self.file_path) if self.cache is not None else None
+
+        if cached is not None:
+            self.data, self.text = cached
+
+            if self.write:
+                self.data = json.loads(self.text)
+
+            return self.data
+
         self.read_file = open(self.file_path, mode="r", encoding="utf8")
+        self.text = self.read_file.read()
+        instrumentation.add_bytes(len(self.text))
 
         try:
-            self.data = json.load(self.read_file)
+            self.data = json.loads(self.text)
         except self.catch_exception as exc:
             if self.raise_exceptions:
                 raise self.raise_exceptions from exc
             self.data = {}
+        else:
+            if self.cache is not None:
+                self.cache.put(self.file_path, self.data, self.text)
 
         return self.data
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.read_file.close()
+        if self.read_file is not None:
+            self.read_file.close()
 
         if self.write:
-            with open(self.file_path, mode="w", encoding="utf8") as write_file:
-                json.dump(self.data, write_file)
+            text = json.dumps(self.data)
+
+            if text != self.text:
+                write_atomically(self.file_path, text)
+
+            if self.cache is not None:
+                self.cache.put(self.file_path, self.data, text)
+
+
+class _RegistryUpdate:
+    """
+    Changes made to a registry file during a read-modify-write cycle. They are
+    applied to the parsed content as soon as they are recorded, so `data` always
+    reflects them.
+
+    Attributes:
+        data (dict): Parsed registry content.
+        operations (list[list]): Recorded changes, as journal operations.
+    """
+
+    def __init__(self, data: dict) -> None:
+        self.data = data
+        self.operations: list[list] = []
+
+    def set(self, path: list[str], value: Any) -> None:
+        """
+        Set an entry, creating its parents if needed. Setting an entry to the
+        value it already has isn't recorded as a change.
+
+        Args:
+            path (list[str]): Keys leading to the entry.
+            value (Any): New value.
+        """
+        parent = self.data
+
+        for key in path[:-1]:
+            parent = parent.get(key, {})
+
+        if path[-1] in parent and parent[path[-1]] == value:
+            return
+
+        self._record(["set", path, value])
+
+    def delete(self, path: list[str]) -> None:
+        """
+        Delete an entry.
+
+        Args:
+            path (list[str]): Keys leading to the entry.
+        """
+        self._record(["del", path])
+
+    def _record(self, operation: list) -> None:
+        apply_operation(self.data, operation)
+        self.operations.append(operation)
 
 
 @dataclass(frozen=True)
-class Versioner:
+class Versioner(BaseVersioner):
     """
-    Class that manages the artifacts versioning
+    Class that manages the artifacts versioning using JSON files.
 
     Attributes:
         storage_path (str): Path where to create the version and tag files.
+        cache (bool): Whether to keep the parsed version and tag files in memory,
+            reloading them only when they change on disk. Default is False.
+        journal (bool): Whether to append the registry changes to a journal
+            instead of rewriting the version and tag files on every update. The
+            journal is merged into the files in the background. Default is False.
+        snapshot (bool): Whether to resolve names, versions and tags through the
+            binary registry snapshot, which is memory-mapped and shared by all
+            the processes using the storage, instead of parsing the version and
+            tag files. Default is False.
         _version_file (str): Version filename.
         _tags_file (str): Tags filename.
+        _index_file (str): Filename of the index with the latest version, the
+            version counter, and the push times and checksums of each artifact.
+            It's created on the first push.
+        _tag_index_file (str): Filename of the reverse index with the tags of
+            each artifact version. It's built from the tags file on its first use
+            if it's missing.
+        _tag_history_file (str): Filename of the append-only log with the
+            artifact each tag pointed to over time.
+        _snapshot_file (str): Filename of the binary registry snapshot. Once it
+            exists, every write regenerates it.
+        _lock_file (str): Lock filename.
+        _lock (FileLock): Lock held by the read-modify-write cycles, shared with
+            other processes using the same storage path.
+        _cache (RegistryCache): Parsed registry files, if the cache is enabled.
+        _journals (Dict[str, JSONJournal]): Journal of each registry file, if
+            the journal is enabled.
+        _tag_index_built (bool): Whether the reverse tag index is known to exist.
+        _snapshot (Optional[RegistrySnapshot]): Snapshot reader, if the snapshot
+            is enabled.
+        _write_depth (int): Number of nested writes holding the lock.
     """
 
     storage_path: str
+    cache: bool = False
+    journal: bool = False
+    snapshot: bool = False
     _version_file: str = field(default=".versions.json", init=False)
     _tags_file: str = field(default=".tags.json", init=False)
+    _index_file: str = field(default=".index.json", init=False)
+    _tag_index_file: str = field(default=".tag_index.json", init=False)
+    _tag_history_file: str = field(default=".tag_history.jsonl", init=False)
+    _snapshot_file: str = field(default=".registry.snapshot", init=False)
+    _lock_file: str = field(default=".registry.lock", init=False)
+    _lock: FileLock = field(default=None, init=False, repr=False, compare=False)
+    _cache: Optional[RegistryCache] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _journals: Dict[str, JSONJournal] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _tag_index_built: bool = field(default=False, init=False, repr=False, compare=False)
+    _snapshot: Optional[RegistrySnapshot] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _write_depth: int = field(default=0, init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         """
@@ -79,22 +303,298 @@ class Versioner:
             with open(tags_filepath, "a", encoding="utf8"):
                 pass
 
-    def _get_last_version(self, versions_data: dict, name: str) -> int:
+        # The dataclass is frozen, so its private state has to be set bypassing it
+        lock = FileLock(str(Path(self.storage_path, self._lock_file)))
+        object.__setattr__(self, "_lock", lock)
+
+        if self.cache:
+            object.__setattr__(self, "_cache", RegistryCache())
+
+        for filename in (
+            self._version_file,
+            self._tags_file,
+            self._index_file,
+            self._tag_index_file,
+        ):
+            # Compactions, including the background ones, change the files the
+            # snapshot is built from
+            journal = JSONJournal(
+                Path(self.storage_path, filename),
+                lock=lock,
+                on_compact=self._refresh_snapshot,
+            )
+
+            if self.journal:
+                self._journals[filename] = journal
+            elif journal.pending():
+                # The files would be missing the changes made in journal mode
+                journal.compact()
+
+        if self.snapshot:
+            snapshot = RegistrySnapshot(
+                Path(self.storage_path, self._snapshot_file),
+                self._snapshot_sources(),
+            )
+            object.__setattr__(self, "_snapshot", snapshot)
+
+            if snapshot.view() is None:
+                self._refresh_snapshot()
+
+    def _snapshot_sources(self) -> list[Path]:
+        """
+        Get the registry files the snapshot is built from, along with their
+        journals.
+
+        Returns:
+            list[Path]: Registry file paths.
+        """
+        paths = [
+            Path(self.storage_path, filename)
+            for filename in (self._version_file, self._tags_file, self._index_file)
+        ]
+
+        return [*paths, *(path.with_suffix(".journal") for path in paths)]
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        """
+        Hold the registry lock during a write. Once the outermost write ends,
+        the registry snapshot is regenerated if it exists.
+        """
+        with self._lock:
+            object.__setattr__(self, "_write_depth", self._write_depth + 1)
+
+            try:
+                yield
+            finally:
+                object.__setattr__(self, "_write_depth", self._write_depth - 1)
+
+            if self._write_depth == 0:
+                self._refresh_snapshot()
+
+    def _refresh_snapshot(self) -> None:
         """
-        Get the latest version of an artifact.
+        Regenerate the registry snapshot if it's enabled or exists, so that
+        processes reading it see the writes of the ones that don't.
+        """
+        if self._snapshot is not None or os.path.isfile(
+            Path(self.storage_path, self._snapshot_file)
+        ):
+            with self._lock:
+                self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        """
+        Regenerate the registry snapshot from the registry files. The registry
+        lock must be held, so that they don't change meanwhile.
+        """
+        # The files are read after their signatures are taken, so a change in
+        # between only makes the snapshot look out of date
+        signatures = [file_signature(path) for path in self._snapshot_sources()]
+        versions, latest, tags = {}, {}, {}
+        flags = 0
+
+        with self._read(self._index_file) as index_data:
+            try:
+                with self._read(
+                    self._version_file, raise_exceptions=EmptyRegistry()
+                ) as version_data:
+                    for name, filenames in version_data.items():
+                        for version, filename in filenames.items():
+                            versions[(name, version)] = filename
+
+                        if filenames:
+                            last = self._get_last_version(
+                                version_data, name, index_data
+                            )
+                            latest[name] = filenames[str(last)]
+            except EmptyRegistry:
+                flags |= VERSIONS_EMPTY
+
+        try:
+            with self._read(self._tags_file, raise_exceptions=EmptyTags()) as tags_data:
+                for tag in tags_data:
+                    if tags_data[tag]:
+                        tags[tag] = self._find_by_tag(tags_data, tag)
+        except EmptyTags:
+            flags |= TAGS_EMPTY
+
+        write_snapshot(
+            Path(self.storage_path, self._snapshot_file),
+            versions,
+            latest,
+            tags,
+            signatures,
+            flags,
+        )
+
+    def _snapshot_view(self) -> Optional[SnapshotView]:
+        """
+        Get the registry snapshot if it's enabled and up to date.
+
+        Returns:
+            Optional[SnapshotView]: Snapshot tables, or None if the registry
+                files must be read.
+        """
+        return self._snapshot.view() if self._snapshot is not None else None
+
+    def _tag_index_missing(self) -> bool:
+        """
+        Check whether the reverse tag index has to be built from the tags, as in
+        registries written by older releases. It's built on the first use of
+        the index, so opening a registry doesn't write to it.
+
+        Returns:
+            bool: Whether the reverse tag index doesn't exist.
+        """
+        if self._tag_index_built:
+            return False
+
+        tag_index_path = Path(self.storage_path, self._tag_index_file)
+
+        return (
+            not tag_index_path.exists()
+            and not tag_index_path.with_suffix(".journal").exists()
+        )
+
+    def _build_tag_index(self) -> None:
+        """
+        Build the reverse tag index if it doesn't exist.
+        """
+        with self._lock:
+            if self._tag_index_missing():
+                with self._read(self._tags_file) as tags_data, self._update(
+                    self._tag_index_file
+                ) as tag_index:
+                    _index_tags(tag_index, tags_data)
+
+        object.__setattr__(self, "_tag_index_built", True)
+
+    @contextmanager
+    def _read(
+        self, filename: str, raise_exceptions: Optional[Exception] = None
+    ) -> Iterator[dict]:
+        """
+        Read a registry file. The content must not be modified.
+
+        Args:
+            filename (str): Registry filename.
+            raise_exceptions (Optional[Exception]): Exception raised if the file
+                is empty.
+
+        Yields:
+            dict: Registry file content.
+        """
+        file_path = Path(self.storage_path, filename)
+
+        if self.journal:
+            with self._journals[filename].read(raise_exceptions) as data:
+                yield data
+        elif not os.path.isfile(file_path):
+            # Files that are only created on their first write
+            yield {}
+        else:
+            with JSONManager(
+                file_path=Path(self.storage_path, filename),
+                write=False,
+                raise_exceptions=raise_exceptions,
+                cache=self._cache,
+            ) as data:
+                yield data
+
+    @contextmanager
+    def _update(self, filename: str) -> Iterator[_RegistryUpdate]:
+        """
+        Read-modify-write cycle over a registry file, holding the registry lock.
+        Only the recorded changes are persisted, and nothing is written if there
+        aren't any or if an exception is raised.
+
+        Args:
+            filename (str): Registry filename.
+
+        Yields:
+            _RegistryUpdate: Registry file content and its changes.
+        """
+        if self.journal:
+            journal = self._journals[filename]
+
+            with journal.transaction() as data:
+                update = _RegistryUpdate(data)
+
+                try:
+                    yield update
+                except BaseException:
+                    journal.invalidate()
+                    raise
+
+                journal.append(update.operations)
+        else:
+            file_path = Path(self.storage_path, filename)
+            manager = JSONManager(file_path=file_path, cache=self._cache)
+
+            with self._lock:
+                if not os.path.isfile(file_path):
+                    with open(file_path, "a", encoding="utf8"):
+                        pass
+
+                with manager as data:
+                    update = _RegistryUpdate(data)
+
+                    try:
+                        yield update
+                    except BaseException:
+                        manager.write = False
+                        if self._cache is not None:
+                            self._cache.invalidate(file_path)
+                        raise
+
+                    manager.write = bool(update.operations)
+
+    def compact(self) -> None:
+        """
+        Merge the registry journals into the version and tag files. It does
+        nothing if the journal is disabled.
+        """
+        for journal in self._journals.values():
+            journal.wait()
+            journal.compact()
+
+    def _get_last_version(
+        self, versions_data: dict, name: str, index_data: Optional[dict] = None
+    ) -> int:
+        """
+        Get the latest version of an artifact. The latest version pointer of the
+        index is used if it's up to date, otherwise all the versions are scanned.
 
         Args:
             versions_data (dict): Artifacts' versioning data.
             name (str): Artifact's name
+            index_data (Optional[dict]): Artifacts' index data.
 
         Returns:
             int: Latest artifact version.
         """
-        versions = versions_data[name].keys()
-        versions = list(map(int, versions))
+        versions = versions_data[name]
+        entry = (index_data or {}).get(name)
+
+        # Versions pushed by older releases, which don't update the index, always
+        # come right after the latest one
+        if (
+            entry is not None
+            and str(entry["latest"]) in versions
+            and str(entry["latest"] + 1) not in versions
+        ):
+            return entry["latest"]
+
+        versions = list(map(int, versions.keys()))
         return max(versions)
 
-    def add_artifact(self, name: str, tags: Optional[list[str]] = None) -> str:
+    def add_artifact(
+        self,
+        name: str,
+        tags: Optional[list[str]] = None,
+        checksum: Optional[str] = None,
+    ) -> str:
         """
         Add an artifact to the system. In the case that the artifact already
         exists, its version will be upgraded.
@@ -102,30 +602,114 @@ class Versioner:
         Args:
             name (str): Artifact's name.
             tags (list[str]): Artifact's tags. Default is []
+            checksum (Optional[str]): SHA-256 of the artifact file. Default is
+                None, which doesn't record it.
 
         Returns:
             str: Artifact's filename.
         """
-        with JSONManager(
-            file_path=Path(self.storage_path, self._version_file)
-        ) as version_data:
-            if name in version_data:
-                new_version = self._get_last_version(version_data, name) + 1
-            else:
-                new_version = 1
-                version_data[name] = {}
+        return self.add_artifacts([(name, tags)], checksums=[checksum])[0]
 
-            filename = f"{name}_{new_version}"
-            version_data[name][new_version] = filename
+    def add_artifacts(
+        self,
+        artifacts: list[tuple[str, Optional[list[str]]]],
+        checksums: Optional[list[Optional[str]]] = None,
+    ) -> list[str]:
+        """
+        Add several artifacts to the system with a single update of each
+        registry file. An artifact can appear more than once, getting a new
+        version each time.
 
-        if tags:
-            with JSONManager(
-                file_path=Path(self.storage_path, self._tags_file)
-            ) as tags_data:
-                for tag in tags:
-                    tags_data[tag] = {name: {str(new_version): f"{name}_{new_version}"}}
+        Args:
+            artifacts (list[tuple[str, Optional[list[str]]]]): Name and tags of
+                each artifact.
+            checksums (Optional[list[Optional[str]]]): SHA-256 of the file of
+                each artifact, recorded in the index. Default is None, which
+                doesn't record them.
 
-        return filename
+        Returns:
+            list[str]: Artifacts' filenames, in the same order.
+        """
+        new_versions, filenames = [], []
+        checksums = checksums or [None] * len(artifacts)
+        now = time.time()
+
+        # Concurrent pushes must not get the same version
+        with self._write():
+            with self._update(self._index_file) as index, self._update(
+                self._version_file
+            ) as versions:
+                for (name, _), checksum in zip(artifacts, checksums):
+                    if name in versions.data:
+                        latest = self._get_last_version(versions.data, name, index.data)
+                        counter = index.data.get(name, {}).get("counter", 0)
+                        new_version = max(latest, counter) + 1
+                    else:
+                        new_version = 1
+
+                    filename = f"{name}_{new_version}"
+                    versions.set([name, str(new_version)], filename)
+                    index.set([name, "latest"], new_version)
+                    index.set([name, "counter"], new_version)
+                    index.set([name, "pushed", str(new_version)], now)
+
+                    if checksum is not None:
+                        index.set([name, "checksum", str(new_version)], checksum)
+
+                    new_versions.append(str(new_version))
+                    filenames.append(filename)
+
+            if any(tags for _, tags in artifacts):
+                self._retag(
+                    [
+                        (tag, (name, version, filename))
+                        for (name, tags), version, filename in zip(
+                            artifacts, new_versions, filenames
+                        )
+                        for tag in tags or []
+                    ]
+                )
+
+        return filenames
+
+    def restore_artifacts(
+        self, artifacts: list[tuple[str, str, Optional[str], Optional[float]]]
+    ) -> None:
+        """
+        Add artifact versions found in the storage back to the registry, without
+        tags. Versions already in the registry are left as they are, and later
+        pushes get versions after the restored ones.
+
+        Args:
+            artifacts (list[tuple[str, str, Optional[str], Optional[float]]]):
+                Name, version, checksum and push time of each artifact version.
+        """
+        with self._write():
+            with self._update(self._index_file) as index, self._update(
+                self._version_file
+            ) as versions:
+                for name, version, checksum, pushed_at in artifacts:
+                    if version in versions.data.get(name, {}):
+                        continue
+
+                    latest = int(version)
+
+                    if name in versions.data:
+                        latest = max(
+                            latest,
+                            self._get_last_version(versions.data, name, index.data),
+                        )
+
+                    versions.set([name, version], f"{name}_{version}")
+                    counter = index.data.get(name, {}).get("counter", 0)
+                    index.set([name, "latest"], latest)
+                    index.set([name, "counter"], max(latest, counter))
+
+                    if pushed_at is not None:
+                        index.set([name, "pushed", version], pushed_at)
+
+                    if checksum is not None:
+                        index.set([name, "checksum", version], checksum)
 
     def update_tags(self, name: str, tags: list[str], version: str = "") -> None:
         """
@@ -138,48 +722,228 @@ class Versioner:
             version (str): Artifact's version. Default is empty, which means the
                 latest version of the artifact will be used.
         """
-        with JSONManager(
-            file_path=Path(self.storage_path, self._version_file), write=False
-        ) as version_data:
-            if name not in version_data:
-                raise ArtifactDoesNotExist(name)
+        with self._write():
+            with self._read(self._index_file) as index_data, self._read(
+                self._version_file
+            ) as version_data:
+                if name not in version_data:
+                    raise ArtifactDoesNotExist(name)
 
-            if not version:
-                version = self._get_last_version(version_data, name)
-            else:
-                versions = version_data[name].keys()
+                if not version:
+                    version = self._get_last_version(version_data, name, index_data)
+                else:
+                    versions = version_data[name].keys()
 
-                if not version in versions:
+                    if not version in versions:
+                        raise ArtifactDoesNotExist(name)
+
+            target = (name, str(version), f"{name}_{version}")
+            self._retag([(tag, target) for tag in tags])
+
+    def remove_artifact(self, name: str, version: str = "") -> None:
+        """
+        Remove an artifact from the registry, along with the tags assigned to it.
+        Versions of a removed artifact aren't reused by later pushes, unless all
+        of them are removed.
+
+        Args:
+            name (str): Artifact's name.
+            version (str): Artifact's version. Default is empty, which means all
+                the versions of the artifact will be removed.
+        """
+        with self._write():
+            with self._update(self._index_file) as index, self._update(
+                self._version_file
+            ) as versions:
+                if name not in versions.data:
                     raise ArtifactDoesNotExist(name)
 
-        with JSONManager(
-            file_path=Path(self.storage_path, self._tags_file)
-        ) as tags_data:
-            for tag in tags:
-                tags_data[tag] = {name: {str(version): f"{name}_{version}"}}
+                if version and version not in versions.data[name]:
+                    raise ArtifactDoesNotExist(name)
+
+                if version and len(versions.data[name]) > 1:
+                    latest = self._get_last_version(versions.data, name, index.data)
+                    counter = max(latest, index.data.get(name, {}).get("counter", 0))
+                    versions.delete([name, version])
+
+                    # Only removing the latest version requires a scan
+                    if int(version) == latest:
+                        latest = self._get_last_version(versions.data, name)
 
-    def remove_artifact(self, name: str) -> None:
+                    index.set([name, "latest"], latest)
+                    index.set([name, "counter"], counter)
+                    index.delete([name, "pushed", version])
+                    index.delete([name, "checksum", version])
+                else:
+                    versions.delete([name])
+                    index.delete([name])
+
+            # The reverse index gives the tags to detach without scanning them all
+            self._build_tag_index()
+
+            with self._read(self._tag_index_file) as tag_index_data:
+                tagged = tag_index_data.get(name, {})
+                detached = [
+                    tag
+                    for tagged_version in ([version] if version else list(tagged))
+                    for tag in tagged.get(tagged_version, {})
+                ]
+
+            self._retag([(tag, None) for tag in detached])
+
+    def _retag(self, changes: list[tuple[str, Optional[tuple[str, str, str]]]]) -> None:
         """
-        Remove an artifact from the registry.
+        Point tags to artifacts, or detach them from their artifact, keeping the
+        reverse tag index and the tag history in sync. Tags that already point
+        to their new artifact aren't changed.
+
+        Args:
+            changes (list[tuple[str, Optional[tuple[str, str, str]]]]): Each tag
+                along with the name, version and filename of its new artifact,
+                or None to detach it.
+        """
+        history = []
+        now = time.time()
+
+        with self._write():
+            missing = self._tag_index_missing()
+
+            with self._update(self._tags_file) as tags_update, self._update(
+                self._tag_index_file
+            ) as tag_index:
+                if missing:
+                    _index_tags(tag_index, tags_update.data)
+
+                for tag, target in changes:
+                    tagged = tags_update.data.get(tag, {})
+                    current = [
+                        (name, version, filename)
+                        for name, versions in tagged.items()
+                        for version, filename in versions.items()
+                    ]
+
+                    if current == ([target] if target else []):
+                        continue
+
+                    for name, version, _ in current:
+                        _unindex_tag(tag_index, tag, name, version)
+
+                    if target is None:
+                        for name in list(tagged):
+                            tags_update.delete([tag, name])
+                    else:
+                        name, version, filename = target
+                        tags_update.set([tag], {name: {version: filename}})
+                        tag_index.set([name, version, tag], True)
+
+                    name, version, filename = target or (None, None, None)
+                    history.append(
+                        {
+                            "tag": tag,
+                            "name": name,
+                            "version": version,
+                            "filename": filename,
+                            "time": now,
+                        }
+                    )
+
+            object.__setattr__(self, "_tag_index_built", True)
+
+            # Only the changes that were persisted are logged
+            append_lines(
+                str(Path(self.storage_path, self._tag_history_file)),
+                [json.dumps(entry) for entry in history],
+            )
+
+    def get_tags(self, name: str, version: str = "") -> list[str]:
+        """
+        Get the tags pointing to an artifact, looked up in the reverse tag index.
 
         Args:
             name (str): Artifact's name.
+            version (str): Artifact's version. Default is empty, which means the
+                tags of all the versions of the artifact are returned.
+
+        Returns:
+            list[str]: Sorted tags.
         """
-        with JSONManager(
-            file_path=Path(self.storage_path, self._version_file)
-        ) as version_data:
-            if name not in version_data:
-                raise ArtifactDoesNotExist(name)
+        if not self._tag_index_built:
+            self._build_tag_index()
 
-            del version_data[name]
+        with self._read(self._tag_index_file) as tag_index_data:
+            tagged = tag_index_data.get(name, {})
+            versions = [version] if version else list(tagged)
 
-        with JSONManager(
-            file_path=Path(self.storage_path, self._tags_file)
-        ) as tags_data:
+            return sorted(
+                tag for version in versions for tag in tagged.get(version, {})
+            )
 
-            for tag in tags_data.keys():
-                if name in tags_data[tag]:
-                    del tags_data[tag][name]
+    def get_tag_history(self, tag: str) -> list[dict]:
+        """
+        Get the artifacts a tag pointed to, from the oldest to the newest. Tags
+        detached by the removal of their artifact have a None name, version and
+        filename.
+
+        Args:
+            tag (str): Tag's name.
+
+        Returns:
+            list[dict]: Name, version, filename and UNIX time of each change.
+        """
+        history = []
+
+        for entry in self._read_tag_history():
+            if entry.pop("tag") == tag:
+                history.append(entry)
+
+        return history
+
+    def _read_tag_history(self) -> Iterator[dict]:
+        """
+        Read the changes of all the tags from the tag history, from the oldest to
+        the newest.
+
+        Yields:
+            dict: Tag, name, version, filename and UNIX time of each change.
+        """
+        try:
+            file = open(
+                Path(self.storage_path, self._tag_history_file), "r", encoding="utf8"
+            )
+        except FileNotFoundError:
+            return
+
+        with file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except JSONDecodeError:
+                    # Line left incomplete by an interrupted append
+                    continue
+
+    def rollback_tag(self, tag: str, steps: int = 1) -> str:
+        """
+        Point a tag back to the artifact it pointed to before its last changes.
+        The rollback is a change itself, so rolling back twice by one step
+        restores the original artifact.
+
+        Args:
+            tag (str): Tag's name.
+            steps (int): Number of changes to go back. Default is 1.
+
+        Returns:
+            str: Filename of the artifact the tag points to.
+        """
+        with self._write():
+            history = self.get_tag_history(tag)
+
+            if len(history) <= steps or history[-1 - steps]["name"] is None:
+                raise ArtifactDoesNotExist(tag, is_tag=True)
+
+            entry = history[-1 - steps]
+            self.update_tags(entry["name"], [tag], entry["version"])
+
+        return entry["filename"]
 
     def get_artifact_by_version(self, name: str, version: str = "") -> str:
         """
@@ -193,25 +957,18 @@ class Versioner:
         Returns:
             str: Artifact's filepath.
         """
-        with JSONManager(
-            file_path=Path(self.storage_path, self._version_file),
-            write=False,
-            raise_exceptions=EmptyRegistry(),
-        ) as version_data:
-            if name not in version_data:
-                raise ArtifactDoesNotExist(name)
-
-            if not version:
-                version = str(self._get_last_version(version_data, name))
-            else:
-                versions = version_data[name].keys()
+        view = self._snapshot_view()
 
-                if not version in versions:
-                    raise ArtifactDoesNotExist(name)
+        if view is not None:
+            if view.flags & VERSIONS_EMPTY:
+                raise EmptyRegistry()
 
-            filename = version_data[name][version]
+            return self._find_in_snapshot(view, name, version)
 
-        return filename
+        with self._read(self._index_file) as index_data, self._read(
+            self._version_file, raise_exceptions=EmptyRegistry()
+        ) as version_data:
+            return self._find_by_version(version_data, index_data, name, version)
 
     def get_artifact_by_tag(self, tag: str) -> str:
         """
@@ -224,28 +981,287 @@ class Versioner:
         Returns:
             str: Artifact's filepath.
         """
-        with JSONManager(
-            file_path=Path(self.storage_path, self._tags_file),
-            write=False,
-            raise_exceptions=EmptyTags(),
+        view = self._snapshot_view()
+
+        if view is not None:
+            if view.flags & TAGS_EMPTY:
+                raise EmptyTags()
+
+            return self._find_tag_in_snapshot(view, tag)
+
+        with self._read(self._tags_file, raise_exceptions=EmptyTags()) as tags_data:
+            return self._find_by_tag(tags_data, tag)
+
+    def get_artifacts(self, references: list[dict[str, str]]) -> list[str]:
+        """
+        Retrieves several artifacts, reading each registry file once.
+
+        Args:
+            references (list[dict[str, str]]): Either the "tag" or the "name" and
+                optional "version" of each artifact.
+
+        Returns:
+            list[str]: Artifacts' filepaths, in the same order.
+        """
+        view = self._snapshot_view()
+
+        if view is not None:
+            filenames = []
+
+            for reference in references:
+                if reference.get("tag"):
+                    if view.flags & TAGS_EMPTY:
+                        raise EmptyTags()
+                    filenames.append(self._find_tag_in_snapshot(view, reference["tag"]))
+                else:
+                    if view.flags & VERSIONS_EMPTY:
+                        raise EmptyRegistry()
+                    filenames.append(
+                        self._find_in_snapshot(
+                            view, reference["name"], reference.get("version", "")
+                        )
+                    )
+
+            return filenames
+
+        # Empty registry files only raise for the kinds of references resolved,
+        # as in the lookups of a single artifact
+        by_tag = any(reference.get("tag") for reference in references)
+        by_version = not all(reference.get("tag") for reference in references)
+
+        with self._read(self._index_file) as index_data, self._read(
+            self._version_file,
+            raise_exceptions=EmptyRegistry() if by_version else None,
+        ) as version_data, self._read(
+            self._tags_file, raise_exceptions=EmptyTags() if by_tag else None
         ) as tags_data:
-            if tag not in tags_data:
-                raise ArtifactDoesNotExist(tag, is_tag=True)
+            filenames = []
+
+            for reference in references:
+                if reference.get("tag"):
+                    filenames.append(self._find_by_tag(tags_data, reference["tag"]))
+                else:
+                    filenames.append(
+                        self._find_by_version(
+                            version_data,
+                            index_data,
+                            reference["name"],
+                            reference.get("version", ""),
+                        )
+                    )
+
+        return filenames
+
+    def _find_by_version(
+        self, version_data: dict, index_data: dict, name: str, version: str
+    ) -> str:
+        """
+        Find the filename of an artifact's version in the registry content.
+        """
+        if name not in version_data:
+            raise ArtifactDoesNotExist(name)
+
+        if not version:
+            version = str(self._get_last_version(version_data, name, index_data))
+        elif version not in version_data[name]:
+            raise ArtifactDoesNotExist(name)
+
+        return version_data[name][version]
+
+    @staticmethod
+    def _find_in_snapshot(view: SnapshotView, name: str, version: str) -> str:
+        """
+        Find the filename of an artifact's version in the registry snapshot.
+        """
+        if version:
+            filename = view.find(view.versions, version_key(name, version))
+        else:
+            filename = view.find(view.latest, name.encode("utf8"))
+
+        if filename is None:
+            raise ArtifactDoesNotExist(name)
+
+        return filename
+
+    @staticmethod
+    def _find_tag_in_snapshot(view: SnapshotView, tag: str) -> str:
+        """
+        Find the filename of a tagged artifact in the registry snapshot.
+        """
+        filename = view.find(view.tags, tag.encode("utf8"))
 
-            name = list(tags_data[tag].keys())[0]
-            filename = list(tags_data[tag][name].values())[0]
+        if filename is None:
+            raise ArtifactDoesNotExist(tag, is_tag=True)
 
         return filename
 
+    @staticmethod
+    def _find_by_tag(tags_data: dict, tag: str) -> str:
+        """
+        Find the filename of a tagged artifact in the registry content.
+        """
+        if not tags_data.get(tag):
+            raise ArtifactDoesNotExist(tag, is_tag=True)
+
+        name = list(tags_data[tag].keys())[0]
+
+        return list(tags_data[tag][name].values())[0]
+
+    def get_versions(self, name: str) -> list[str]:
+        """
+        Get the versions of an artifact, from the oldest to the newest.
+
+        Args:
+            name (str): Artifact's name.
+
+        Returns:
+            list[str]: Artifact's versions.
+        """
+        with self._read(
+            self._version_file, raise_exceptions=EmptyRegistry()
+        ) as version_data:
+            if name not in version_data:
+                raise ArtifactDoesNotExist(name)
+
+            return sorted(version_data[name], key=int)
+
+    def get_filenames(self, name: str) -> dict[str, str]:
+        with self._read(
+            self._version_file, raise_exceptions=EmptyRegistry()
+        ) as version_data:
+            if name not in version_data:
+                raise ArtifactDoesNotExist(name)
+
+            return {
+                version: version_data[name][version]
+                for version in sorted(version_data[name], key=int)
+            }
+
+    def get_all_filenames(self) -> dict[str, dict[str, str]]:
+        with self._read(self._version_file) as version_data:
+            return {
+                name: {
+                    version: version_data[name][version]
+                    for version in sorted(version_data[name], key=int)
+                }
+                for name in sorted(version_data)
+            }
+
+    def get_checksum(self, name: str, version: str) -> Optional[str]:
+        with self._read(self._index_file) as index_data:
+            return index_data.get(name, {}).get("checksum", {}).get(version)
+
+    def get_all_checksums(self) -> dict[str, str]:
+        with self._read(self._index_file) as index_data:
+            return {
+                f"{name}_{version}": checksum
+                for name, entry in index_data.items()
+                for version, checksum in entry.get("checksum", {}).items()
+            }
+
+    def get_all_push_times(self) -> dict[str, float]:
+        with self._read(self._index_file) as index_data:
+            return {
+                f"{name}_{version}": pushed_at
+                for name, entry in index_data.items()
+                for version, pushed_at in entry.get("pushed", {}).items()
+            }
+
+    def list_artifacts(
+        self,
+        name_prefix: str = "",
+        since: Optional[float] = None,
+        after: Optional[tuple[str, str]] = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        with self._read(self._index_file) as index_data, self._read(
+            self._version_file
+        ) as version_data:
+            names = sorted(version_data)
+            start = max(name_prefix, after[0]) if after else name_prefix
+            entries = []
+
+            for name in names[bisect.bisect_left(names, start) :]:
+                if not name.startswith(name_prefix):
+                    break
+
+                pushed = index_data.get(name, {}).get("pushed", {})
+
+                for version in sorted(version_data[name], key=int):
+                    if after and (name, int(version)) <= (after[0], int(after[1])):
+                        continue
+
+                    pushed_at = pushed.get(version)
+
+                    if since is not None and (pushed_at is None or pushed_at < since):
+                        continue
+
+                    entries.append(
+                        {
+                            "name": name,
+                            "version": version,
+                            "filename": version_data[name][version],
+                            "pushed_at": pushed_at,
+                        }
+                    )
+
+                    if len(entries) == limit:
+                        return entries
+
+        return entries
+
+    def iter_tags(
+        self, tag_pattern: str = "*", name_pattern: str = "*"
+    ) -> Iterator[tuple[str, str, str, str]]:
+        # The rows are copied out, so the registry isn't held while they're used
+        with self._read(self._tags_file) as tags_data:
+            rows = []
+
+            for tag in sorted(
+                tag for tag in tags_data if fnmatch.fnmatchcase(tag, tag_pattern)
+            ):
+                # Tags detached by the removal of their artifact
+                if not tags_data[tag]:
+                    continue
+
+                name = next(iter(tags_data[tag]))
+
+                if not fnmatch.fnmatchcase(name, name_pattern):
+                    continue
+
+                version, filename = next(iter(tags_data[tag][name].items()))
+                rows.append((tag, name, version, filename))
+
+        yield from rows
+
+    def iter_latest_versions(
+        self, name_pattern: str = "*"
+    ) -> Iterator[tuple[str, str, str]]:
+        with self._read(self._index_file) as index_data, self._read(
+            self._version_file
+        ) as version_data:
+            rows = []
+
+            for name in sorted(
+                name for name in version_data if fnmatch.fnmatchcase(name, name_pattern)
+            ):
+                if not version_data[name]:
+                    continue
+
+                version = str(self._get_last_version(version_data, name, index_data))
+                rows.append((name, version, version_data[name][version]))
+
+        yield from rows
+
     def get_tags_data_for_visualization(self):
         tags, names, versions, paths = [], [], [], []
 
-        with JSONManager(
-            file_path=Path(self.storage_path, self._tags_file),
-            write=False,
-            raise_exceptions=EmptyTags(),
-        ) as tags_data:
+        with self._read(self._tags_file, raise_exceptions=EmptyTags()) as tags_data:
             for tag in tags_data.keys():
+                # Tags detached by the removal of their artifact
+                if not tags_data[tag]:
+                    continue
+
                 tags.append(tag)
 
                 name = list(tags_data[tag].keys())[0]
@@ -258,3 +1274,27 @@ class Versioner:
                 paths.append(filename)
 
             return tags, names, versions, paths
+
+
+def _unindex_tag(tag_index: _RegistryUpdate, tag: str, name: str, version: str) -> None:
+    """
+    Remove a tag from the reverse tag index, along with the entries it leaves
+    empty.
+    """
+    tag_index.delete([name, version, tag])
+
+    if not tag_index.data.get(name, {}).get(version):
+        tag_index.delete([name, version])
+
+        if not tag_index.data.get(name):
+            tag_index.delete([name])
+
+
+def _index_tags(tag_index: _RegistryUpdate, tags_data: dict) -> None:
+    """
+    Add all the tags to the reverse tag index.
+    """
+    for tag, tagged in tags_data.items():
+        for name, versions in tagged.items():
+            for version in versions:
+                tag_index.set([name, version, tag], True)
@@ -0,0 +1,69 @@
+import multiprocessing
+import os
+import shutil
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+
+from mixver.config import ROOT
+from mixver.storages.local_storage import LocalStorage
+
+PROCESSES = 8
+PUSHES = 10
+
+
+def _push_artifacts(folder, options):
+    storage = LocalStorage(storage_path=folder, **options)
+    filenames, latencies = [], []
+
+    for i in range(PUSHES):
+        start = time.perf_counter()
+        filename = storage.push(
+            artifact={"weights": [i]}, name="model", metadata={}, tags=["latest"]
+        )
+        latencies.append(time.perf_counter() - start)
+        filenames.append(filename)
+
+    return filenames, latencies
+
+
+@pytest.mark.parametrize(
+    "options", [{}, {"registry_journal": True}, {"registry": "sqlite"}]
+)
+def test_concurrent_pushes(options):
+    """
+    Test that parallel pushers in different processes get distinct versions.
+    """
+    folder = Path(ROOT, "prueba_concurrent_storage")
+    os.makedirs(folder)
+    # Create the registry files before the workers race to do it
+    LocalStorage(storage_path=folder, **options)
+
+    with multiprocessing.Pool(PROCESSES) as pool:
+        results = pool.starmap_async(
+            _push_artifacts, [(folder, options)] * PROCESSES
+        ).get(timeout=120)
+
+    filenames = [filename for result in results for filename in result[0]]
+    latencies = [latency for result in results for latency in result[1]]
+    expected = {f"model_{version}" for version in range(1, PROCESSES * PUSHES + 1)}
+
+    assert len(filenames) == PROCESSES * PUSHES
+    assert set(filenames) == expected
+    assert all(
+        os.path.isfile(Path(folder, f"{filename}.pkl")) for filename in filenames
+    )
+
+    storage = LocalStorage(storage_path=folder, **options)
+    assert storage._versioner.get_artifact_by_version("model") == (
+        f"model_{PROCESSES * PUSHES}"
+    )
+    assert len(storage._versioner.get_versions("model")) == PROCESSES * PUSHES
+
+    # Each push waits for the ones ahead of it, but never for long
+    assert statistics.median(latencies) < 1
+    assert max(latencies) < 10
+
+    shutil.rmtree(folder)
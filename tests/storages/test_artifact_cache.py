@@ -0,0 +1,76 @@
+import os
+import shutil
+from pathlib import Path
+
+from mixver.storages.artifact_cache import ArtifactCache
+
+
+def _write(path: Path, size: int) -> None:
+    path.write_bytes(b"x" * size)
+    os.utime(path, (0, 0))
+
+
+def test_artifact_cache_hits_and_reloads(storage_folder):
+    """
+    Test that artifacts are reused until their file changes.
+    """
+    cache = ArtifactCache()
+    path = Path(storage_folder, "model_1.pkl")
+    _write(path, 10)
+
+    assert cache.get_or_load(path, lambda: "first") == "first"
+    assert cache.get_or_load(path, lambda: "second") == "first"
+
+    _write(path, 20)
+    assert cache.get_or_load(path, lambda: "third") == "third"
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 2,
+        "evictions": 0,
+        "entries": 1,
+        "bytes": 20,
+    }
+
+    shutil.rmtree(storage_folder)
+
+
+def test_artifact_cache_evicts_least_recently_used(storage_folder):
+    """
+    Test that the least recently used artifacts are evicted to stay within the
+    size limit.
+    """
+    cache = ArtifactCache(max_bytes=250)
+    paths = [Path(storage_folder, f"model_{i}.pkl") for i in range(4)]
+
+    for path in paths:
+        _write(path, 100)
+
+    cache.get_or_load(paths[0], lambda: 0)
+    cache.get_or_load(paths[1], lambda: 1)
+    cache.get_or_load(paths[0], lambda: None)
+    cache.get_or_load(paths[2], lambda: 2)
+
+    assert cache.get_or_load(paths[0], lambda: None) == 0
+    assert cache.get_or_load(paths[1], lambda: "reloaded") == "reloaded"
+    assert cache.stats()["evictions"] == 2
+
+    _write(paths[3], 300)
+    cache.get_or_load(paths[3], lambda: 3)
+    assert cache.stats()["entries"] == 2
+
+    shutil.rmtree(storage_folder)
+
+
+def test_artifact_cache_skips_racy_files(storage_folder):
+    """
+    Test that files that were just modified aren't cached.
+    """
+    cache = ArtifactCache()
+    path = Path(storage_folder, "model_1.pkl")
+    path.write_bytes(b"x")
+
+    cache.get_or_load(path, lambda: "first")
+
+    assert cache.get_or_load(path, lambda: "second") == "second"
+
+    shutil.rmtree(storage_folder)
@@ -0,0 +1,73 @@
+import asyncio
+import shutil
+import threading
+import time
+
+from mixver.storages.async_storage import AsyncLocalStorage
+from mixver.storages.local_storage import LocalStorage
+
+
+def test_async_storage_push_pull(storage_folder):
+    """
+    Test pushing and pulling artifacts from a coroutine.
+    """
+    folder = storage_folder
+
+    async def main():
+        async with AsyncLocalStorage(LocalStorage(folder)) as storage:
+            await storage.push([1, 2], name="model", metadata={"a": 1}, tags=["prod"])
+            await storage.push([3, 4], name="model", metadata={"a": 2})
+
+            assert await storage.pull(tag="prod") == {
+                "artifact": [1, 2],
+                "metadata": {"a": 1},
+            }
+            assert (await storage.pull(name="model"))["artifact"] == [3, 4]
+            assert await storage.pull_metadata(name="model") == {"a": 2}
+            assert await storage.list_metadata("model") == {
+                "1": {"a": 1},
+                "2": {"a": 2},
+            }
+
+            await storage.remove("model", version="1")
+            assert (await storage.pull(name="model"))["artifact"] == [3, 4]
+
+    asyncio.run(main())
+
+    shutil.rmtree(folder)
+
+
+def test_async_storage_coalesces_pulls(storage_folder, mocker):
+    """
+    Test that concurrent pulls of the same artifact share a single load.
+    """
+    folder = storage_folder
+    local_storage = LocalStorage(folder)
+    local_storage.push([1, 2], name="model", metadata={}, tags=["prod"])
+    local_storage.push([3, 4], name="other", metadata={})
+
+    read = local_storage._read
+    threads = set()
+
+    def slow_read(filename):
+        threads.add(threading.get_ident())
+        time.sleep(0.1)
+        return read(filename)
+
+    spy = mocker.patch.object(local_storage, "_read", side_effect=slow_read)
+
+    async def main():
+        async with AsyncLocalStorage(local_storage) as storage:
+            return await asyncio.gather(
+                *[storage.pull(name="model") for _ in range(5)],
+                storage.pull(tag="prod"),
+                storage.pull(name="other"),
+            )
+
+    results = asyncio.run(main())
+
+    assert [result["artifact"] for result in results] == [[1, 2]] * 6 + [[3, 4]]
+    assert spy.call_count == 2
+    assert threading.get_ident() not in threads
+
+    shutil.rmtree(folder)
@@ -0,0 +1,75 @@
+import os
+import pickle
+import shutil
+from pathlib import Path
+
+from mixver.storages.blob_store import BlobStore
+
+
+def _dump(data):
+    return lambda file: pickle.dump(data, file)
+
+
+def test_blob_store_deduplicates(storage_folder):
+    """
+    Test that identical content is stored once and linked to every artifact file.
+    """
+    store = BlobStore(storage_path=storage_folder)
+    first, second = Path(storage_folder, "a_1.pkl"), Path(storage_folder, "a_2.pkl")
+
+    digest = store.store(_dump([1, 2, 3]), first)
+
+    assert store.store(_dump([1, 2, 3]), second) == digest
+    assert os.path.samefile(first, store.path(digest))
+    assert os.path.samefile(second, store.path(digest))
+    assert os.stat(store.path(digest)).st_nlink == 3
+    assert store.store(_dump([4]), Path(storage_folder, "b_1.pkl")) != digest
+    assert not [
+        path for path in store.path(digest).parent.parent.iterdir() if path.is_file()
+    ]
+
+    shutil.rmtree(storage_folder)
+
+
+def test_blob_store_release(storage_folder):
+    """
+    Test that blobs are only deleted once no artifact file links to them.
+    """
+    store = BlobStore(storage_path=storage_folder)
+    first, second = Path(storage_folder, "a_1.pkl"), Path(storage_folder, "a_2.pkl")
+    digest = store.store(_dump([1, 2, 3]), first)
+    store.store(_dump([1, 2, 3]), second)
+
+    os.remove(first)
+    store.release(digest)
+    assert store.path(digest).is_file()
+
+    os.remove(second)
+    store.release(digest)
+    assert not store.path(digest).exists()
+
+    with open(first, "xb"):
+        pass
+    # The blob of a new artifact file is created again
+    store.store(_dump([1, 2, 3]), first)
+    assert os.path.samefile(first, store.path(digest))
+
+    shutil.rmtree(storage_folder)
+
+
+def test_blob_store_orphans(storage_folder):
+    """
+    Test finding the blobs that no artifact file links to.
+    """
+    store = BlobStore(storage_path=storage_folder)
+    kept = store.store(_dump([1]), Path(storage_folder, "a_1.pkl"))
+    orphaned = store.store(_dump([2]), Path(storage_folder, "a_2.pkl"))
+
+    assert store.orphans() == []
+
+    os.remove(Path(storage_folder, "a_2.pkl"))
+
+    assert store.orphans() == [orphaned]
+    assert kept != orphaned
+
+    shutil.rmtree(storage_folder)
@@ -0,0 +1,96 @@
+import io
+import pickle
+
+import pytest
+
+from mixver.storages import compression, serialization
+from mixver.storages.exceptions import CorruptedArtifact
+
+
+@pytest.mark.parametrize("codec", sorted(compression.CODECS))
+def test_compressed_roundtrip(codec):
+    """
+    Test compressing content in several chunks and reading it back.
+    """
+    content = bytes(range(256)) * 1000
+    file = io.BytesIO()
+
+    writer = compression.CompressedWriter(
+        file, compression.get_codec(codec), chunk_size=10_000, workers=2
+    )
+    writer.write(content[:5])
+    writer.write(memoryview(content)[5:])
+    writer.close()
+
+    assert len(file.getvalue()) < len(content)
+
+    file.seek(0)
+    with compression.open_decompressed(file, compression.get_codec(codec)) as reader:
+        assert reader.read() == content
+
+
+def test_single_chunk_decompressed_inline():
+    """
+    Test that artifacts that fit in a chunk are decompressed without starting
+    the thread pool.
+    """
+    file = io.BytesIO()
+    writer = compression.CompressedWriter(file, compression.get_codec("zlib"))
+    writer.write(b"small artifact")
+    writer.close()
+    file.seek(0)
+
+    stream = compression._DecompressedStream(file, compression.get_codec("zlib"), 2)
+
+    assert stream.read() == b"small artifact"
+    assert stream.read() == b""
+    assert stream._executor is None
+
+
+def test_compressed_artifact_detected():
+    """
+    Test that compressed artifacts are loaded without passing their codec.
+    """
+    data = {"artifact": pickle.PickleBuffer(bytearray(100_000)), "metadata": {}}
+    file = io.BytesIO()
+
+    serialization.dump(data, file, serialization="stream", codec="zlib")
+    assert file.getvalue().startswith(serialization.COMPRESSED_MAGIC + b"\x04zlib")
+
+    file.seek(0)
+    assert serialization.load(file)["artifact"] == bytearray(100_000)
+
+
+def test_compressed_artifact_truncated():
+    """
+    Test loading a compressed artifact whose write was interrupted.
+    """
+    file = io.BytesIO()
+    serialization.dump({"artifact": list(range(1000))}, file, codec="zlib")
+
+    with pytest.raises(CorruptedArtifact):
+        serialization.load(io.BytesIO(file.getvalue()[:-20]))
+
+
+def test_register_codec():
+    """
+    Test adding a codec and getting one that doesn't exist.
+    """
+    codec = compression.Codec(
+        name="reversed",
+        compress=lambda data: bytes(data)[::-1],
+        decompress=lambda data, size: data[::-1],
+    )
+    compression.register_codec(codec)
+
+    try:
+        file = io.BytesIO()
+        serialization.dump([1, 2, 3], file, codec="reversed")
+        file.seek(0)
+
+        assert serialization.load(file) == [1, 2, 3]
+    finally:
+        del compression.CODECS["reversed"]
+
+    with pytest.raises(ValueError):
+        compression.get_codec("reversed")
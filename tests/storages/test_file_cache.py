@@ -0,0 +1,171 @@
+import multiprocessing
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+from mixver.storages.exceptions import CorruptedArtifact
+from mixver.storages.file_cache import FileCache
+from mixver.storages.local_storage import LocalStorage
+from mixver.storages.object_storage import ObjectStorage
+from mixver.storages.object_store import DirectoryObjectStore
+
+
+def _slow_fill(path: Path) -> None:
+    time.sleep(0.2)
+    path.write_bytes(b"content")
+
+
+def _read_cached(folder: str) -> tuple:
+    cache = FileCache(folder)
+
+    with cache.open("model_1.abc.pkl", _slow_fill) as file:
+        content = file.read()
+
+    return content, cache.misses
+
+
+def test_file_cache_eviction(storage_folder):
+    """
+    Test that the least recently read copies are evicted once the cache is full.
+    """
+    cache = FileCache(str(storage_folder), max_bytes=250)
+    fills = []
+
+    def fill(content):
+        def write(path):
+            fills.append(content)
+            path.write_bytes(content * 100)
+
+        return write
+
+    for key in ("a", "b"):
+        with cache.open(key, fill(key.encode())) as file:
+            assert file.read() == key.encode() * 100
+
+    # The first copy is read again, so the second one is the oldest
+    time.sleep(0.01)
+    cache.open("a", fill(b"x")).close()
+    cache.fill("c", fill(b"c"))
+
+    assert fills == [b"a", b"b", b"c"]
+    assert sorted(os.listdir(storage_folder)) == [".locks", "a", "c"]
+    assert cache.stats() == {"hits": 1, "misses": 3, "evictions": 1}
+    assert not cache.fill("a", fill(b"x"))
+
+    with pytest.raises(ZeroDivisionError):
+        cache.fill("d", lambda path: (path.write_bytes(b"d"), 1 / 0))
+
+    assert sorted(os.listdir(storage_folder)) == [".locks", "a", "c"]
+
+    shutil.rmtree(storage_folder)
+
+
+def test_file_cache_uncached_reads(storage_folder, monkeypatch):
+    """
+    Test reading copies without caching them when they're evicted right after
+    they're filled, and that errors of the fill reach the caller.
+    """
+    cache = FileCache(str(storage_folder))
+    monkeypatch.setattr(cache, "fill", lambda key, fill: True)
+
+    with cache.open("a", lambda path: path.write_bytes(b"a")) as file:
+        assert file.read() == b"a"
+
+    def fail(path):
+        raise ConnectionError("The storage is unreachable.")
+
+    with pytest.raises(ConnectionError):
+        cache.open("a", fail)
+
+    assert os.listdir(storage_folder) == [".locks"]
+
+    shutil.rmtree(storage_folder)
+
+
+def test_file_cache_fills_once(storage_folder):
+    """
+    Test that processes missing the same copy at once fill it a single time.
+    """
+    with multiprocessing.get_context("spawn").Pool(3) as pool:
+        results = pool.map(_read_cached, [str(storage_folder)] * 3)
+
+    assert [content for content, _ in results] == [b"content"] * 3
+    assert sum(misses for _, misses in results) == 1
+
+    shutil.rmtree(storage_folder)
+
+
+def test_storage_cache(storage_folder):
+    """
+    Test pulling artifacts through the cache folder and prefetching tags.
+    """
+    cache_path = Path(storage_folder, "cache")
+    storage = LocalStorage(
+        str(Path(storage_folder, "primary")),
+        cache_path=str(cache_path),
+        verify_checksums=True,
+    )
+    storage.push([1], "model", {"accuracy": 0.9}, tags=["prod"])
+    storage.push([2], "model", {}, tags=["staging"])
+
+    assert storage.prefetch(["staging", "prod"]) == ["model_2", "model_1"]
+    assert len([path for path in cache_path.iterdir() if path.is_file()]) == 2
+
+    # Pulls don't read the storage once the copies are cached
+    os.remove(Path(storage_folder, "primary", "model_1.pkl"))
+    assert storage.pull(tag="prod") == {"artifact": [1], "metadata": {"accuracy": 0.9}}
+    assert storage._file_cache.stats()["hits"] == 1
+
+    # Copies are checked against the storage when they're filled
+    storage.push([3], "model", {})
+    Path(storage_folder, "primary", "model_3.pkl").write_bytes(b"corrupted")
+
+    with pytest.raises(CorruptedArtifact):
+        storage.pull(name="model")
+
+    assert len([path for path in cache_path.iterdir() if path.is_file()]) == 2
+
+    with pytest.raises(ValueError):
+        LocalStorage(str(Path(storage_folder, "primary"))).prefetch(["prod"])
+
+    shutil.rmtree(storage_folder)
+
+
+def test_object_storage_cache(storage_folder):
+    """
+    Test memory-mapping artifacts of an object storage from the cache folder.
+    """
+    storage = ObjectStorage(
+        str(Path(storage_folder, "registry")),
+        object_store=DirectoryObjectStore(str(Path(storage_folder, "objects"))),
+        serialization="stream",
+        memory_map=True,
+        cache_path=str(Path(storage_folder, "cache")),
+        part_size=1024,
+    )
+    storage.push(bytearray(4096), "model", {}, tags=["prod"])
+    storage.prefetch(["prod"])
+    shutil.rmtree(Path(storage_folder, "objects"))
+
+    assert storage.pull(tag="prod")["artifact"] == bytearray(4096)
+
+    with pytest.raises(ValueError):
+        ObjectStorage(
+            str(Path(storage_folder, "registry")),
+            object_store=storage.object_store,
+            memory_map=True,
+        )
+
+    # Errors of the downloads that bypass the cache reach the caller
+    def fail(filename, path):
+        raise ConnectionError("The object store is unreachable.")
+
+    storage._download = fail
+
+    with pytest.raises(ConnectionError):
+        storage._open_storage_file("model_1")
+
+    shutil.rmtree(storage_folder)
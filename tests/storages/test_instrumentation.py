@@ -0,0 +1,107 @@
+import shutil
+
+import pytest
+
+from mixver import instrumentation
+from mixver.instrumentation import StatsAggregator
+from mixver.storages.local_storage import LocalStorage
+
+
+@pytest.fixture
+def phases():
+    collected = []
+
+    def hook(phase, seconds, nbytes):
+        collected.append((phase, seconds, nbytes))
+
+    instrumentation.add_hook(hook)
+    yield collected
+    instrumentation.remove_hook(hook)
+
+
+@pytest.mark.parametrize(
+    "registry,deduplicate", [("json", False), ("sqlite", False), ("json", True)]
+)
+def test_phases_of_push_and_pull(storage_folder, phases, registry, deduplicate):
+    """
+    Test that pushes and pulls report their phases, with the bytes they moved.
+    """
+    storage = LocalStorage(storage_folder, registry=registry, deduplicate=deduplicate)
+    storage.push(artifact=bytes(100_000), name="model", metadata={}, tags=["prod"])
+
+    assert [phase for phase, _, _ in phases] == [
+        "serialize",
+        "registry_write",
+        "blob_write",
+    ]
+    written = dict((phase, nbytes) for phase, _, nbytes in phases)
+    assert written["blob_write"] == written["serialize"] > 100_000
+
+    phases.clear()
+    assert storage.pull(tag="prod")["artifact"] == bytes(100_000)
+
+    assert [phase for phase, _, _ in phases] == [
+        "registry_load",
+        "blob_read",
+        "deserialize",
+    ]
+    assert all(seconds >= 0 for _, seconds, _ in phases)
+    assert dict((phase, nbytes) for phase, _, nbytes in phases)["blob_read"] > 100_000
+
+    if registry == "json":
+        # The registry files parsed by the lookup
+        assert phases[0][2] > 0
+
+    shutil.rmtree(storage_folder)
+
+
+def test_stats_aggregator(storage_folder):
+    """
+    Test summarizing the phases of several pulls.
+    """
+    storage = LocalStorage(storage_folder, serialization="stream")
+    storage.push_many(
+        [{"artifact": [i], "name": f"model{i}", "metadata": {}} for i in range(3)]
+    )
+    stats = StatsAggregator(max_samples=5)
+    instrumentation.add_hook(stats)
+
+    try:
+        for _ in range(4):
+            storage.pull_many([{"name": f"model{i}"} for i in range(3)])
+    finally:
+        instrumentation.remove_hook(stats)
+
+    report = stats.report()
+
+    assert set(report) == {"registry_load", "blob_read", "deserialize"}
+    assert report["registry_load"]["count"] == 4
+    assert report["blob_read"]["count"] == 12
+    assert report["blob_read"]["bytes"] > 0
+    assert 0 <= report["blob_read"]["p50_ms"] <= report["blob_read"]["p99_ms"]
+    assert len(stats._samples["blob_read"]) == 5
+
+    stats.reset()
+    assert stats.report() == {}
+
+    shutil.rmtree(storage_folder)
+
+
+def test_disabled_instrumentation(storage_folder):
+    """
+    Test that nothing is timed without hooks.
+    """
+    assert not instrumentation.enabled()
+    assert instrumentation.phase("blob_read") is instrumentation.phase("serialize")
+
+    stats = StatsAggregator()
+    instrumentation.add_hook(stats)
+    instrumentation.remove_hook(stats)
+
+    storage = LocalStorage(storage_folder)
+    storage.push(artifact=[1], name="model", metadata={})
+    storage.pull(name="model")
+
+    assert stats.report() == {}
+
+    shutil.rmtree(storage_folder)
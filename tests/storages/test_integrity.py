@@ -0,0 +1,136 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from mixver.storages.exceptions import CorruptedArtifact
+from mixver.storages.integrity import file_checksum
+from mixver.storages.local_storage import LocalStorage
+
+
+def _corrupt(path: Path) -> None:
+    with open(path, "r+b") as file:
+        file.seek(-2, os.SEEK_END)
+        file.write(b"\x00\x00")
+
+
+def test_file_checksum(storage_folder):
+    """
+    Test hashing files larger than the read buffer.
+    """
+    path = Path(storage_folder, "file.bin")
+    content = os.urandom(3 * 1024 * 1024 + 5)
+    path.write_bytes(content)
+
+    assert file_checksum(path) == hashlib.sha256(content).hexdigest()
+    assert file_checksum(Path(storage_folder, "missing.bin")) is None
+
+    shutil.rmtree(storage_folder)
+
+
+@pytest.mark.parametrize(
+    "registry,deduplicate", [("json", False), ("sqlite", False), ("json", True)]
+)
+def test_checksum_verified_on_pull(storage_folder, registry, deduplicate):
+    """
+    Test that the checksum is recorded at push time and checked on pulls.
+    """
+    storage = LocalStorage(
+        storage_folder,
+        registry=registry,
+        deduplicate=deduplicate,
+        verify_checksums=True,
+    )
+    filename = storage.push(artifact=list(range(1000)), name="model", metadata={})
+    path = Path(storage_folder, f"{filename}.pkl")
+
+    assert storage._versioner.get_checksum("model", "1") == file_checksum(path)
+    assert storage.pull(name="model")["artifact"] == list(range(1000))
+
+    _corrupt(path)
+
+    with pytest.raises(CorruptedArtifact):
+        storage.pull(name="model")
+
+    shutil.rmtree(storage_folder)
+
+
+@pytest.mark.parametrize("registry", ["json", "sqlite"])
+def test_verify_and_repair(storage_folder, registry):
+    """
+    Test reporting missing, orphaned and corrupted artifacts, and repairing the
+    registry.
+    """
+    storage = LocalStorage(storage_folder, registry=registry)
+
+    for i in range(4):
+        storage.push(artifact=[i], name="model", metadata={}, tags=[f"tag{i}"])
+
+    os.remove(Path(storage_folder, "model_2.pkl"))
+    shutil.copy(
+        Path(storage_folder, "model_1.pkl"), Path(storage_folder, "other_3.pkl")
+    )
+    _corrupt(Path(storage_folder, "model_3.pkl"))
+    # Artifact pushed before checksums were recorded
+    storage._versioner.restore_artifacts([("old", "1", None, None)])
+    shutil.copy(Path(storage_folder, "model_1.pkl"), Path(storage_folder, "old_1.pkl"))
+
+    report = storage.verify(max_workers=2)
+    assert report.missing == ["model_2"]
+    assert report.orphaned == ["other_3"]
+    assert report.corrupted == ["model_3"]
+    assert report.unverified == ["old_1"]
+    assert not report.healthy and not report.repaired
+
+    report = storage.verify(repair=True, max_workers=2)
+    assert report.repaired
+
+    report = storage.verify()
+    assert (report.missing, report.orphaned, report.corrupted) == ([], [], ["model_3"])
+    assert storage.get_tags("model") == ["tag0", "tag2", "tag3"]
+    assert storage.pull(name="other")["artifact"] == [0]
+    assert storage.push(artifact=[5], name="other", metadata={}) == "other_4"
+
+    shutil.rmtree(storage_folder)
+
+
+@pytest.mark.parametrize("layout", ["flat", "name"])
+def test_verify_hidden_names(storage_folder, layout):
+    """
+    Test that artifacts whose names start with a dot aren't taken for missing.
+    """
+    storage = LocalStorage(str(storage_folder), layout=layout)
+    storage.push([1], ".hidden", {}, tags=["prod"])
+
+    report = storage.verify(repair=True)
+
+    assert (report.missing, report.orphaned, report.corrupted) == ([], [], [])
+    assert storage.pull(tag="prod")["artifact"] == [1]
+
+    shutil.rmtree(storage_folder)
+
+
+def test_verify_rebuilds_registry(storage_folder):
+    """
+    Test rebuilding a lost registry from the artifact files.
+    """
+    storage = LocalStorage(storage_folder, layout="hash")
+
+    for i in range(3):
+        storage.push(artifact=[i], name=f"model{i % 2}", metadata={})
+
+    for filename in os.listdir(storage_folder):
+        if filename not in (".layout.json", "artifacts"):
+            os.remove(Path(storage_folder, filename))
+
+    storage = LocalStorage(storage_folder)
+    report = storage.verify(repair=True, max_workers=1)
+
+    assert report.orphaned == ["model0_1", "model0_2", "model1_1"]
+    assert storage.verify().healthy
+    assert storage.pull(name="model0")["artifact"] == [2]
+    assert storage.push(artifact=[3], name="model1", metadata={}) == "model1_2"
+
+    shutil.rmtree(storage_folder)
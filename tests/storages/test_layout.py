@@ -0,0 +1,118 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from mixver.storages import layout
+from mixver.storages.local_storage import LocalStorage
+from mixver.storages.retention import RetentionPolicy
+
+
+def test_artifact_folder():
+    """
+    Test the folder of the artifact files in each layout.
+    """
+    shard = hashlib.sha1(b"my_model_3").hexdigest()[:2]
+
+    assert layout.artifact_folder("s", "flat", "my_model_3") == Path("s")
+    assert layout.artifact_folder("s", "hash", "my_model_3") == Path(
+        "s", "artifacts", shard
+    )
+    assert layout.artifact_folder("s", "name", "my_model_3") == Path(
+        "s", "artifacts", "my_model"
+    )
+
+
+@pytest.mark.parametrize("storage_layout", ["hash", "name"])
+def test_local_storage_sharded_layout(storage_folder, storage_layout):
+    """
+    Test pushing, pulling and removing artifacts in a sharded layout.
+    """
+    folder = storage_folder
+
+    storage = LocalStorage(folder, layout=storage_layout)
+    storage.push(artifact=1, name="model", metadata={"i": 1}, tags=["prod"])
+    storage.push(artifact=2, name="model", metadata={"i": 2})
+
+    shard = layout.artifact_folder(folder, storage_layout, "model_1")
+    assert sorted(os.listdir(shard))[:2] == ["model_1.json", "model_1.pkl"]
+    assert [entry for entry in os.listdir(folder) if not entry.startswith(".")] == [
+        "artifacts"
+    ]
+
+    storage = LocalStorage(folder)
+    assert storage.layout == storage_layout
+    assert storage.pull(tag="prod")["artifact"] == 1
+    assert storage.list_metadata("model") == {"1": {"i": 1}, "2": {"i": 2}}
+
+    storage.remove("model", version="1")
+    assert not os.path.exists(Path(shard, "model_1.pkl"))
+
+    with pytest.raises(ValueError):
+        LocalStorage(folder, layout="flat")
+
+    with pytest.raises(ValueError):
+        LocalStorage(folder, layout="tree")
+
+    shutil.rmtree(folder)
+
+
+def test_migrate_layout(storage_folder):
+    """
+    Test moving a storage between layouts, keeping deduplicated artifacts linked
+    to their blob.
+    """
+    folder = storage_folder
+
+    storage = LocalStorage(folder, deduplicate=True)
+    storage.push(artifact=[1] * 1000, name="model", metadata={})
+    storage.push(artifact=[1] * 1000, name="model", metadata={})
+    storage.push(artifact=[2], name="other", metadata={"i": 2}, codec="zlib")
+
+    with pytest.raises(ValueError):
+        LocalStorage(folder, layout="hash")
+
+    assert layout.migrate_layout(folder, "hash", max_workers=4) == 9
+    assert layout.migrate_layout(folder, "hash") == 0
+
+    for storage_layout in ("name", "hash", "flat"):
+        layout.migrate_layout(folder, storage_layout)
+        storage = LocalStorage(folder, deduplicate=True)
+
+        assert storage.layout == storage_layout
+        assert storage.pull(name="model", version="1")["artifact"] == [1] * 1000
+        assert storage.pull(name="other")["metadata"] == {"i": 2}
+        assert os.path.samefile(
+            storage._path("model_1", "pkl"), storage._path("model_2", "pkl")
+        )
+
+    assert not os.path.exists(Path(folder, "artifacts"))
+
+    shutil.rmtree(folder)
+
+
+def test_collect_garbage_sharded_layout(storage_folder):
+    """
+    Test that the garbage collection finds the orphaned files of a sharded
+    storage.
+    """
+    folder = storage_folder
+
+    storage = LocalStorage(folder, layout="hash")
+    storage.push(artifact=1, name="model", metadata={})
+    storage.push(artifact=2, name="model", metadata={})
+
+    stray = storage._path("stray_1", "pkl")
+    stray.parent.mkdir(parents=True, exist_ok=True)
+    stray.write_bytes(b"x")
+
+    report = storage.collect_garbage(RetentionPolicy(keep_last=1))
+
+    assert report.removed == ["model_1"]
+    assert report.orphans == ["stray_1"]
+    assert not stray.exists()
+    assert storage.pull(name="model")["artifact"] == 2
+
+    shutil.rmtree(folder)
@@ -0,0 +1,154 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from mixver.storages.artifact_cache import get_artifact_cache
+from mixver.storages.exceptions import CorruptedArtifact
+from mixver.storages.object_storage import ObjectStorage
+from mixver.storages.object_store import DirectoryObjectStore
+from mixver.storages.retention import RetentionPolicy
+
+
+def _storage(storage_folder, **options) -> ObjectStorage:
+    return ObjectStorage(
+        str(Path(storage_folder, "registry")),
+        object_store=DirectoryObjectStore(str(Path(storage_folder, "objects"))),
+        part_size=1024,
+        **options,
+    )
+
+
+def test_object_storage_push_pull(storage_folder):
+    """
+    Test pushing and pulling artifacts kept in an object store.
+    """
+    storage = _storage(storage_folder)
+    store = storage.object_store
+    large = os.urandom(10_000)
+
+    storage.push(large, "model", {"accuracy": 0.9}, tags=["prod"])
+    storage.push_many(
+        [
+            {"artifact": [1], "name": "model", "metadata": {}},
+            {"artifact": [2], "name": "other", "metadata": {}},
+        ]
+    )
+
+    assert sorted(store.list()) == [
+        "model_1.json",
+        "model_1.pkl",
+        "model_2.json",
+        "model_2.pkl",
+        "other_1.json",
+        "other_1.pkl",
+    ]
+    assert not list(Path(storage_folder, "registry").glob("*.pkl"))
+    assert storage.pull(tag="prod") == {
+        "artifact": large,
+        "metadata": {"accuracy": 0.9},
+    }
+    assert storage.pull(name="model")["artifact"] == [1]
+    assert storage.pull_metadata(tag="prod") == {"accuracy": 0.9}
+    assert storage.list_metadata("model") == {"1": {"accuracy": 0.9}, "2": {}}
+    assert [
+        data["artifact"]
+        for data in storage.pull_many([{"name": "other"}, {"tag": "prod"}])
+    ] == [[2], large]
+
+    storage.remove("model")
+    assert sorted(store.list()) == ["other_1.json", "other_1.pkl"]
+    # Temporary files of the transfers are cleaned up
+    assert not list(Path(storage_folder, "registry").glob("*.tmp"))
+
+    shutil.rmtree(storage_folder)
+
+
+def test_object_storage_artifact_cache(storage_folder, mocker):
+    """
+    Test that pulled artifacts are cached and replaced objects are read again.
+    """
+    get_artifact_cache().clear()
+    storage = _storage(storage_folder, artifact_cache=True)
+    storage.push([1], "model", {}, tags=["prod"])
+
+    download = mocker.spy(storage, "_download")
+    assert storage.pull(tag="prod")["artifact"] == [1]
+    assert storage.pull(tag="prod")["artifact"] == [1]
+    assert download.call_count == 1
+    assert get_artifact_cache().stats()["hits"] == 1
+
+    # Versions pushed again after their artifact is removed aren't stale
+    storage.remove("model")
+    storage.push([2], "model", {}, tags=["prod"])
+    assert storage.pull(tag="prod")["artifact"] == [2]
+    assert download.call_count == 2
+
+    get_artifact_cache().clear()
+    shutil.rmtree(storage_folder)
+
+
+def test_object_storage_checksums(storage_folder):
+    """
+    Test detecting corrupted objects on pull and when verifying the storage.
+    """
+    storage = _storage(storage_folder, verify_checksums=True)
+
+    for i in range(3):
+        storage.push(os.urandom(2048), "model", {})
+
+    objects = Path(storage_folder, "objects")
+    content = bytearray((objects / "model_1.pkl").read_bytes())
+    content[-1] ^= 0xFF
+    (objects / "model_1.pkl").write_bytes(content)
+    os.remove(objects / "model_2.pkl")
+    shutil.copy(objects / "model_3.pkl", objects / "other_1.pkl")
+
+    with pytest.raises(CorruptedArtifact):
+        storage.pull(name="model", version="1")
+
+    report = storage.verify(max_workers=2)
+    assert report.missing == ["model_2"]
+    assert report.orphaned == ["other_1"]
+    assert report.corrupted == ["model_1"]
+
+    storage.verify(repair=True)
+    report = storage.verify()
+    assert (report.missing, report.orphaned) == ([], [])
+    assert (
+        storage.pull(name="other")["artifact"] == storage.pull(name="model")["artifact"]
+    )
+
+    shutil.rmtree(storage_folder)
+
+
+def test_object_storage_collect_garbage(storage_folder):
+    """
+    Test that garbage collections delete the objects of the removed versions.
+    """
+    storage = _storage(storage_folder)
+
+    for i in range(3):
+        storage.push([i], "model", {})
+
+    report = storage.collect_garbage(RetentionPolicy(keep_last=1))
+
+    assert report.removed == ["model_1", "model_2"]
+    assert report.reclaimed_bytes > 0
+    assert sorted(storage.object_store.list()) == ["model_3.json", "model_3.pkl"]
+
+    shutil.rmtree(storage_folder)
+
+
+def test_object_storage_options(storage_folder):
+    """
+    Test the options that need local artifact files.
+    """
+    with pytest.raises(ValueError):
+        ObjectStorage(str(storage_folder))
+
+    with pytest.raises(ValueError):
+        _storage(storage_folder, deduplicate=True)
+
+    shutil.rmtree(storage_folder)
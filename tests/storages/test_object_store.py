@@ -0,0 +1,284 @@
+import hashlib
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from mixver.storages import transfer
+from mixver.storages.exceptions import ObjectChanged
+from mixver.storages.integrity import file_checksum
+from mixver.storages.object_store import DirectoryObjectStore, S3ObjectStore
+
+
+@dataclass(frozen=True)
+class _CountingStore(DirectoryObjectStore):
+    """
+    Directory store that records how many part requests run at once.
+    """
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        object.__setattr__(self, "counts", {"active": 0, "peak": 0, "parts": 0})
+        object.__setattr__(self, "lock", threading.Lock())
+
+    def _wait(self, nbytes: int) -> None:
+        with self.lock:
+            self.counts["active"] += 1
+            self.counts["peak"] = max(self.counts["peak"], self.counts["active"])
+
+        try:
+            super()._wait(nbytes)
+        finally:
+            with self.lock:
+                self.counts["active"] -= 1
+
+    def upload_part(self, key, upload_id, number, content):
+        with self.lock:
+            self.counts["parts"] += 1
+
+        return super().upload_part(key, upload_id, number, content)
+
+
+class _FakeS3Client:
+    """
+    In-memory stand-in of the boto3 S3 client calls used by the store.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+
+    def get_object(self, Bucket, Key, Range=None, IfMatch=None):
+        if (Bucket, Key) not in self.objects:
+            error = Exception("NoSuchKey")
+            error.response = {"Error": {"Code": "NoSuchKey"}}
+            raise error
+
+        content = self.objects[(Bucket, Key)]
+
+        if IfMatch is not None and IfMatch != _etag(content):
+            error = Exception("PreconditionFailed")
+            error.response = {"Error": {"Code": "PreconditionFailed"}}
+            raise error
+
+        if Range:
+            start, end = Range[len("bytes=") :].split("-")
+            content = content[int(start) : int(end) + 1 if end else None]
+
+        return {"Body": _Body(content)}
+
+    def head_object(self, Bucket, Key):
+        return {
+            "ContentLength": len(self.objects[(Bucket, Key)]),
+            "LastModified": datetime(2022, 1, 1, tzinfo=timezone.utc),
+            "ETag": _etag(self.objects[(Bucket, Key)]),
+        }
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def create_multipart_upload(self, Bucket, Key):
+        self.uploads["id"] = {}
+        return {"UploadId": "id"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f"etag{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[(Bucket, Key)] = b"".join(
+            parts[part["PartNumber"]] for part in MultipartUpload["Parts"]
+        )
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId)
+
+    def get_paginator(self, operation):
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        yield {
+            "Contents": [
+                {"Key": key}
+                for bucket, key in sorted(self.objects)
+                if bucket == Bucket and key.startswith(Prefix)
+            ]
+        }
+
+
+def _etag(content: bytes) -> str:
+    return f'"{hashlib.md5(content).hexdigest()}"'
+
+
+class _Body:
+    def __init__(self, content):
+        self.content = content
+
+    def read(self):
+        return self.content
+
+
+def test_directory_object_store(storage_folder):
+    """
+    Test writing, reading, listing and deleting objects.
+    """
+    store = DirectoryObjectStore(str(storage_folder))
+
+    store.put("model_1.pkl", b"0123456789")
+    store.put("folder/model_1.json", b"{}")
+
+    assert store.get("model_1.pkl") == b"0123456789"
+    assert store.get("model_1.pkl", 2, 5) == b"234"
+    assert store.get("model_1.pkl", 8) == b"89"
+    assert store.head("model_1.pkl").size == 10
+    assert sorted(store.list()) == ["folder/model_1.json", "model_1.pkl"]
+    assert list(store.list("folder/")) == ["folder/model_1.json"]
+
+    upload_id = store.create_multipart("large.pkl")
+    parts = [store.upload_part("large.pkl", upload_id, n, b"ab") for n in (2, 1)]
+
+    assert "large.pkl" not in store.list()
+
+    store.complete_multipart("large.pkl", upload_id, parts[::-1])
+    assert store.get("large.pkl") == b"abab"
+
+    upload_id = store.create_multipart("aborted.pkl")
+    store.upload_part("aborted.pkl", upload_id, 1, b"ab")
+    store.abort_multipart("aborted.pkl", upload_id)
+
+    assert not os.listdir(Path(storage_folder, ".uploads"))
+
+    store.delete("model_1.pkl")
+    store.delete("model_1.pkl")
+
+    with pytest.raises(FileNotFoundError):
+        store.get("model_1.pkl")
+
+    with pytest.raises(FileNotFoundError):
+        store.head("model_1.pkl")
+
+    shutil.rmtree(storage_folder)
+
+
+def test_parallel_transfers(storage_folder):
+    """
+    Test that large files are uploaded and downloaded in concurrent parts.
+    """
+    store = _CountingStore(str(Path(storage_folder, "objects")), latency=0.01)
+    source = Path(storage_folder, "source")
+    source.write_bytes(os.urandom(10_000))
+
+    transfer.upload_file(store, "model_1.pkl", source, part_size=1024, max_workers=4)
+
+    assert store.counts["parts"] == 10
+    assert store.counts["peak"] == 4
+    assert store.get("model_1.pkl") == source.read_bytes()
+
+    store.counts["peak"] = 0
+    target = Path(storage_folder, "target")
+    nbytes = transfer.download_file(
+        store, "model_1.pkl", target, part_size=1024, max_workers=4
+    )
+
+    assert nbytes == 10_000
+    assert store.counts["peak"] == 4
+    assert target.read_bytes() == source.read_bytes()
+    assert transfer.object_checksum(store, "model_1.pkl", 1024) == file_checksum(
+        str(source)
+    )
+    assert transfer.object_checksum(store, "missing.pkl") is None
+
+    # Small files take a single request
+    source.write_bytes(b"small")
+    transfer.upload_file(store, "small.pkl", source, part_size=1024)
+    assert store.counts["parts"] == 10
+    assert store.get("small.pkl") == b"small"
+
+    shutil.rmtree(storage_folder)
+
+
+def test_download_of_replaced_object(storage_folder):
+    """
+    Test that objects replaced during a download aren't mixed with the new
+    content, even if their size didn't change.
+    """
+    store = DirectoryObjectStore(str(Path(storage_folder, "objects")))
+    target = Path(storage_folder, "target")
+    store.put("model_1.pkl", os.urandom(4096))
+    info = store.head("model_1.pkl")
+
+    assert store.get("model_1.pkl", 0, 2, if_match=info.etag)
+
+    store.put("model_1.pkl", os.urandom(4096))
+
+    with pytest.raises(ObjectChanged):
+        store.get("model_1.pkl", 0, 2, if_match=info.etag)
+
+    with pytest.raises(ObjectChanged):
+        transfer.download_file(store, "model_1.pkl", target, part_size=1024, info=info)
+
+    assert transfer.download_file(store, "model_1.pkl", target, part_size=1024)
+    assert target.read_bytes() == store.get("model_1.pkl")
+
+    shutil.rmtree(storage_folder)
+
+
+def test_failed_upload_is_aborted(storage_folder, mocker):
+    """
+    Test that the parts of a failed multipart upload are discarded.
+    """
+    store = DirectoryObjectStore(str(Path(storage_folder, "objects")))
+    source = Path(storage_folder, "source")
+    source.write_bytes(os.urandom(4096))
+    mocker.patch.object(
+        DirectoryObjectStore, "complete_multipart", side_effect=OSError("failed")
+    )
+
+    with pytest.raises(OSError):
+        transfer.upload_file(store, "model_1.pkl", source, part_size=1024)
+
+    assert not os.listdir(Path(storage_folder, "objects", ".uploads"))
+    assert "model_1.pkl" not in store.list()
+
+    shutil.rmtree(storage_folder)
+
+
+def test_s3_object_store():
+    """
+    Test the requests of the S3 store through a fake client.
+    """
+    client = _FakeS3Client()
+    store = S3ObjectStore("bucket", prefix="models/", client=client)
+
+    store.put("model_1.pkl", b"0123456789")
+    assert client.objects[("bucket", "models/model_1.pkl")] == b"0123456789"
+    assert store.get("model_1.pkl") == b"0123456789"
+    assert store.get("model_1.pkl", 2, 5) == b"234"
+    assert store.get("model_1.pkl", 8) == b"89"
+    assert store.head("model_1.pkl").size == 10
+    assert list(store.list()) == ["model_1.pkl"]
+
+    etag = store.head("model_1.pkl").etag
+    assert store.get("model_1.pkl", 2, 5, if_match=etag) == b"234"
+    store.put("model_1.pkl", b"9876543210")
+
+    with pytest.raises(ObjectChanged):
+        store.get("model_1.pkl", 2, 5, if_match=etag)
+
+    upload_id = store.create_multipart("large.pkl")
+    parts = [store.upload_part("large.pkl", upload_id, n, b"ab") for n in (1, 2)]
+    store.complete_multipart("large.pkl", upload_id, parts)
+    assert store.get("large.pkl") == b"abab"
+
+    store.delete("model_1.pkl")
+
+    with pytest.raises(FileNotFoundError):
+        store.get("model_1.pkl")
@@ -0,0 +1,215 @@
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+from mixver.storages.local_storage import LocalStorage
+from mixver.storages.retention import RetentionPolicy
+from mixver.versioning.exceptions import ArtifactDoesNotExist
+
+
+def test_retention_policy_keep_last():
+    """
+    Test keeping the latest versions of an artifact, along with the tagged ones.
+    """
+    pushed_at = {"1": 0.0, "2": 0.0, "3": 0.0, "4": 0.0}
+
+    policy = RetentionPolicy(keep_last=2)
+    assert policy.select(pushed_at, tagged={"1"}, now=0.0) == ["2"]
+
+    policy = RetentionPolicy(keep_last=0, keep_tagged=False)
+    assert policy.select(pushed_at, tagged={"1"}, now=0.0) == ["1", "2", "3", "4"]
+
+    assert RetentionPolicy().select(pushed_at, tagged=set(), now=0.0) == []
+
+
+def test_retention_policy_max_age():
+    """
+    Test removing the versions older than the maximum age.
+    """
+    pushed_at = {"1": 0.0, "2": 50.0, "3": 90.0}
+
+    policy = RetentionPolicy(max_age=20)
+    assert policy.select(pushed_at, tagged=set(), now=100.0) == ["1", "2"]
+
+    policy = RetentionPolicy(keep_last=2, max_age=20)
+    assert policy.select(pushed_at, tagged={"2"}, now=100.0) == ["1"]
+
+    with pytest.raises(ValueError):
+        RetentionPolicy(keep_last=-1)
+
+
+@pytest.mark.parametrize("registry", ["json", "sqlite"])
+def test_collect_garbage(storage_folder, registry):
+    """
+    Test that a dry run reports the space that a collection then reclaims.
+    """
+    storage = LocalStorage(storage_folder, registry=registry)
+
+    for i in range(5):
+        storage.push(artifact=[i] * 100, name="model", metadata={}, tags=["latest"])
+
+    storage.push(artifact=[0], name="other", metadata={})
+    storage.remove("model", version="1")
+    storage._versioner.update_tags("model", ["prod"], version="2")
+
+    policy = RetentionPolicy(keep_last=1)
+    files = sorted(os.listdir(storage_folder))
+    report = storage.collect_garbage(policy, dry_run=True)
+
+    assert report.removed == ["model_3", "model_4"]
+    assert report.orphans == []
+    assert report.complete
+    assert report.reclaimed_bytes == sum(
+        os.path.getsize(Path(storage_folder, f"model_{version}.{extension}"))
+        for version in (3, 4)
+        for extension in ("pkl", "json")
+    )
+    assert sorted(os.listdir(storage_folder)) == files
+
+    assert storage.collect_garbage(policy).reclaimed_bytes == report.reclaimed_bytes
+    assert storage._versioner.get_versions("model") == ["2", "5"]
+    assert not os.path.exists(Path(storage_folder, "model_3.pkl"))
+    assert storage.pull(tag="prod")["artifact"] == [1] * 100
+    assert storage.pull(tag="latest")["artifact"] == [4] * 100
+    assert storage.pull(name="other")["artifact"] == [0]
+
+    with pytest.raises(ArtifactDoesNotExist):
+        storage.pull(name="model", version="3")
+
+    shutil.rmtree(storage_folder)
+
+
+def _set_pushed_at(storage: LocalStorage, filename: str, pushed_at) -> None:
+    """
+    Rewrite the push time of a version in the registry, or delete it if it's
+    None, as for the versions pushed by older releases.
+    """
+    if storage.registry == "sqlite":
+        storage._versioner._connect().execute(
+            "UPDATE versions SET pushed_at = ? WHERE filename = ?",
+            (pushed_at, filename),
+        )
+        return
+
+    name, version = filename.rsplit("_", 1)
+    index_path = Path(storage.storage_path, ".index.json")
+    index = json.loads(index_path.read_text("utf8"))
+    index[name]["pushed"].pop(version)
+
+    if pushed_at is not None:
+        index[name]["pushed"][version] = pushed_at
+
+    index_path.write_text(json.dumps(index), encoding="utf8")
+
+
+@pytest.mark.parametrize("registry", ["json", "sqlite"])
+def test_collect_garbage_max_age(storage_folder, registry):
+    """
+    Test removing the versions older than the maximum age, by the push time
+    recorded in the registry, or by the modification time of their metadata
+    file for the versions without one.
+    """
+    storage = LocalStorage(storage_folder, registry=registry)
+
+    for i in range(3):
+        storage.push(artifact=i, name="model", metadata={})
+
+    past = time.time() - 3600
+    _set_pushed_at(storage, "model_1", past)
+    # Copies of a storage don't keep the modification times of the files
+    os.utime(Path(storage_folder, "model_2.json"), (past, past))
+    _set_pushed_at(storage, "model_3", None)
+    os.utime(Path(storage_folder, "model_3.json"), (past, past))
+
+    report = storage.collect_garbage(RetentionPolicy(max_age=60))
+
+    assert report.removed == ["model_1", "model_3"]
+    assert storage._versioner.get_versions("model") == ["2"]
+
+    shutil.rmtree(storage_folder)
+
+
+def test_collect_garbage_incremental(storage_folder):
+    """
+    Test that a collection limited to some artifacts is resumed by the next one.
+    """
+    storage = LocalStorage(storage_folder)
+
+    for name in ("a", "b", "c"):
+        for _ in range(2):
+            storage.push(artifact=name, name=name, metadata={})
+
+    policy = RetentionPolicy(keep_last=1)
+    state_path = Path(storage_folder, ".gc_state.json")
+
+    first = storage.collect_garbage(policy, max_names=2)
+    assert first.removed == ["a_1", "b_1"]
+    assert not first.complete
+    assert json.loads(state_path.read_text("utf8")) == {"cursor": "b"}
+
+    assert storage.collect_garbage(policy, dry_run=True).removed == ["c_1"]
+    assert json.loads(state_path.read_text("utf8")) == {"cursor": "b"}
+
+    last = storage.collect_garbage(policy, max_names=2)
+    assert last.removed == ["c_1"]
+    assert last.complete
+    assert not state_path.exists()
+
+    shutil.rmtree(storage_folder)
+
+
+def test_collect_garbage_orphans(storage_folder):
+    """
+    Test that the files of interrupted pushes and removals are deleted, and that
+    deduplicated artifacts only reclaim their blob along with its last link.
+    """
+    storage = LocalStorage(storage_folder, deduplicate=True)
+    storage.push(artifact=[7] * 1000, name="model", metadata={})
+    storage.push(artifact=[7] * 1000, name="model", metadata={})
+    storage.push(artifact=[8] * 1000, name="other", metadata={})
+    blob = os.path.getsize(Path(storage_folder, "model_1.pkl"))
+
+    # An artifact file that isn't in the registry
+    Path(storage_folder, "stray_1.pkl").write_bytes(b"x" * 10)
+    # Files that mixver didn't write
+    Path(storage_folder, "config.json").write_text("{}", encoding="utf8")
+    Path(storage_folder, "model_weights.pkl").write_bytes(b"x")
+    # A blob whose artifact files were deleted before it was released
+    storage._versioner.remove_artifact("other")
+    os.remove(Path(storage_folder, "other_1.pkl"))
+
+    report = storage.collect_garbage(RetentionPolicy(keep_last=1), dry_run=True)
+    markers = sum(
+        os.path.getsize(Path(storage_folder, f"{filename}.{extension}"))
+        for filename in ("model_1", "other_1")
+        for extension in ("json", "blob")
+    )
+
+    assert report.removed == ["model_1"]
+    assert sorted(report.orphans)[1:] == ["other_1", "stray_1"]
+    assert sorted(report.orphans)[0].startswith("objects")
+    assert report.reclaimed_bytes == markers + 10 + blob
+
+    storage.collect_garbage(RetentionPolicy(keep_last=1))
+
+    assert sorted(os.listdir(storage_folder)) == [
+        ".index.json",
+        ".registry.lock",
+        ".tag_index.json",
+        ".tags.json",
+        ".versions.json",
+        "config.json",
+        "model_2.blob",
+        "model_2.json",
+        "model_2.pkl",
+        "model_weights.pkl",
+        "objects",
+    ]
+    assert storage._blobs.orphans() == []
+    assert storage.pull(name="model")["artifact"] == [7] * 1000
+
+    shutil.rmtree(storage_folder)
@@ -0,0 +1,140 @@
+import importlib.util
+import io
+import mmap
+import pickle
+import shutil
+from pathlib import Path
+
+import pytest
+
+from mixver.storages import serialization
+from mixver.storages.exceptions import CorruptedArtifact
+
+
+def _dump_stream(data, chunk_size=serialization.CHUNK_SIZE) -> io.BytesIO:
+    file = io.BytesIO()
+    serialization.dump(data, file, serialization="stream", chunk_size=chunk_size)
+    file.seek(0)
+
+    return file
+
+
+def test_stream_roundtrip():
+    """
+    Test that the stream serialization restores the serialized data.
+    """
+    weights = bytearray(range(256)) * 100
+    data = {
+        "artifact": {"weights": pickle.PickleBuffer(weights), "bias": 0.5},
+        "metadata": {"score": 0.9},
+    }
+
+    loaded = serialization.load(_dump_stream(data, chunk_size=1000))
+
+    assert loaded["artifact"]["weights"] == weights
+    assert loaded["artifact"]["bias"] == 0.5
+    assert loaded["metadata"] == {"score": 0.9}
+
+
+def test_stream_buffers_out_of_band():
+    """
+    Test that buffers exported out-of-band, such as the ones of NumPy arrays, are
+    written after the pickle skeleton instead of inside it.
+    """
+    weights = bytearray(b"x" * 100_000)
+
+    file = _dump_stream({"artifact": pickle.PickleBuffer(weights), "metadata": {}})
+    footer = serialization.read_footer(file)
+
+    assert footer["skeleton"][1] < 1000
+    assert [size for _, size in footer["buffers"]] == [len(weights)]
+
+
+def test_load_pickle_files():
+    """
+    Test that files written with plain pickle are still loaded.
+    """
+    data = {"artifact": [1, 2, 3], "metadata": {"score": 0.9}}
+    file = io.BytesIO(pickle.dumps(data))
+
+    assert serialization.load(file) == data
+
+
+def test_load_truncated_stream():
+    """
+    Test loading a stream file whose write was interrupted.
+    """
+    weights = pickle.PickleBuffer(bytearray(10_000))
+    content = _dump_stream({"artifact": weights, "metadata": {}}).getvalue()
+
+    with pytest.raises(CorruptedArtifact):
+        serialization.load(io.BytesIO(content[:5000]))
+
+
+def test_dump_unknown_serialization():
+    """
+    Test serializing data with a serialization that doesn't exist.
+    """
+    with pytest.raises(ValueError):
+        serialization.dump({}, io.BytesIO(), serialization="json")
+
+
+def test_stream_segments_aligned():
+    """
+    Test that the buffer segments start at aligned offsets and small buffers are
+    kept in the pickle skeleton.
+    """
+    data = {
+        "small": pickle.PickleBuffer(bytearray(100)),
+        "first": pickle.PickleBuffer(bytearray(5000)),
+        "second": pickle.PickleBuffer(bytearray(7000)),
+    }
+
+    footer = serialization.read_footer(_dump_stream(data))
+
+    assert [size for _, size in footer["buffers"]] == [5000, 7000]
+    assert all(offset % serialization.ALIGNMENT == 0 for offset, _ in footer["buffers"])
+
+
+def test_load_stream_memory_map(storage_folder):
+    """
+    Test that memory-mapped buffers are read-only views of the file.
+    """
+    path = Path(storage_folder, "artifact.pkl")
+    weights = bytearray(b"w" * 10_000)
+
+    with open(path, "wb") as file:
+        serialization.dump_stream({"weights": pickle.PickleBuffer(weights)}, file)
+
+    with open(path, "rb") as file:
+        loaded = serialization.load(file, memory_map=True)["weights"]
+
+    assert isinstance(loaded, memoryview)
+    assert isinstance(loaded.obj, mmap.mmap)
+    assert loaded.readonly
+    assert loaded == weights
+
+    shutil.rmtree(storage_folder)
+
+
+@pytest.mark.skipif(importlib.util.find_spec("numpy") is None, reason="needs numpy")
+def test_load_stream_memory_map_numpy(storage_folder):
+    """
+    Test rebuilding NumPy arrays over the memory-mapped file.
+    """
+    import numpy as np
+
+    path = Path(storage_folder, "artifact.pkl")
+    array = np.arange(10_000, dtype=np.float64)
+
+    with open(path, "wb") as file:
+        serialization.dump_stream({"weights": array}, file)
+
+    with open(path, "rb") as file:
+        loaded = serialization.load(file, memory_map=True)["weights"]
+
+    np.testing.assert_array_equal(loaded, array)
+    assert not loaded.flags.writeable
+    assert loaded.flags.aligned
+
+    shutil.rmtree(storage_folder)
@@ -1,9 +1,13 @@
 import os
 import pickle
 import shutil
+import time
 from pathlib import Path
 
+import pytest
+
 from mixver.config import ROOT
+from mixver.storages.artifact_cache import get_artifact_cache
 from mixver.storages.local_storage import LocalStorage
 
 
@@ -92,3 +96,338 @@ def test_local_storage_pull(storage_folder, mocker):
     assert saved_artifact["metadata"]["score"] == 0.9
 
     shutil.rmtree(folder)
+
+
+def test_local_storage_sqlite_registry(storage_folder):
+    """
+    Test pushing and pulling artifacts with the SQLite registry.
+    """
+    folder = storage_folder
+
+    storage = LocalStorage(folder, registry="sqlite")
+    storage.push(artifact=MockArtifact(), name="artifact", metadata={"score": 0.9})
+    filename = storage.push(
+        artifact=MockArtifact(), name="artifact", metadata={"score": 0.8}, tags=["prod"]
+    )
+
+    assert filename == "artifact_2"
+    assert os.path.isfile(Path(folder, ".registry.db"))
+    assert storage.pull(name="artifact", version="1")["metadata"]["score"] == 0.9
+    assert storage.pull(tag="prod")["metadata"]["score"] == 0.8
+
+    shutil.rmtree(folder)
+
+
+def test_local_storage_unknown_registry(storage_folder):
+    """
+    Test creating a storage with a registry that doesn't exist.
+    """
+    folder = storage_folder
+
+    with pytest.raises(ValueError):
+        LocalStorage(folder, registry="mongodb")
+
+    shutil.rmtree(folder)
+
+
+def test_local_storage_stream_serialization(storage_folder):
+    """
+    Test pushing and pulling artifacts with the stream serialization, along with
+    artifacts pushed with plain pickle.
+    """
+    folder = storage_folder
+
+    LocalStorage(folder).push(artifact=MockArtifact(), name="model", metadata={})
+    storage = LocalStorage(folder, serialization="stream")
+    storage.push(
+        artifact={"weights": pickle.PickleBuffer(bytearray(b"w" * 100_000))},
+        name="model",
+        metadata={"score": 0.9},
+    )
+
+    assert (
+        storage.pull(name="model", version="1")["artifact"].name == "LinearRegression"
+    )
+    data = storage.pull(name="model", version="2")
+    assert data["artifact"]["weights"] == bytearray(b"w" * 100_000)
+    assert data["metadata"]["score"] == 0.9
+
+    shutil.rmtree(folder)
+
+
+def test_local_storage_memory_map(storage_folder):
+    """
+    Test pulling memory-mapped artifacts.
+    """
+    folder = storage_folder
+
+    storage = LocalStorage(folder, serialization="stream", memory_map=True)
+    storage.push(
+        artifact={"weights": pickle.PickleBuffer(bytearray(b"w" * 100_000))},
+        name="model",
+        metadata={"score": 0.9},
+    )
+    data = storage.pull(name="model")
+
+    assert data["artifact"]["weights"].readonly
+    assert data["artifact"]["weights"] == b"w" * 100_000
+    assert data["metadata"]["score"] == 0.9
+
+    del data
+    shutil.rmtree(folder)
+
+
+def test_local_storage_pull_metadata(storage_folder, mocker):
+    """
+    Test retrieving the metadata of artifacts without loading them.
+    """
+    folder = storage_folder
+
+    storage = LocalStorage(folder)
+    storage.push(artifact=MockArtifact(), name="model", metadata={"score": 0.8})
+    storage.push(
+        artifact=MockArtifact(), name="model", metadata={"score": 0.9}, tags=["prod"]
+    )
+    load = mocker.spy(storage, "_load")
+
+    assert storage.pull_metadata(name="model", version="1") == {"score": 0.8}
+    assert storage.pull_metadata(tag="prod") == {"score": 0.9}
+    assert storage.list_metadata("model") == {
+        "1": {"score": 0.8},
+        "2": {"score": 0.9},
+    }
+    load.assert_not_called()
+
+    shutil.rmtree(folder)
+
+
+def test_local_storage_pull_metadata_without_file(storage_folder):
+    """
+    Test retrieving the metadata of an artifact pushed without a metadata file.
+    """
+    folder = storage_folder
+
+    storage = LocalStorage(folder)
+    filename = storage.push(artifact=MockArtifact(), name="model", metadata={"a": 1})
+    os.remove(Path(folder, f"{filename}.json"))
+
+    assert storage.pull_metadata(name="model") == {"a": 1}
+    assert os.path.isfile(Path(folder, f"{filename}.json"))
+
+    shutil.rmtree(folder)
+
+
+def test_local_storage_metadata_keys(storage_folder):
+    """
+    Test that metadata keys that JSON can't represent are converted, and that
+    metadata that can't be written fails the push before it's registered.
+    """
+    folder = storage_folder
+    metadata = {("fold", 1): 0.9, "folds": [{2: 0.8}]}
+
+    storage = LocalStorage(folder)
+    storage.push(artifact=[1], name="model", metadata=metadata)
+
+    assert storage.pull(name="model")["metadata"] == metadata
+    assert storage.pull_metadata(name="model") == {
+        "('fold', 1)": 0.9,
+        "folds": [{"2": 0.8}],
+    }
+
+    circular: dict = {}
+    circular["self"] = circular
+
+    with pytest.raises(ValueError):
+        storage.push(artifact=[2], name="model", metadata=circular)
+
+    assert storage.pull(name="model")["artifact"] == [1]
+    assert not list(Path(folder).glob("*.tmp"))
+
+    shutil.rmtree(folder)
+
+
+def test_local_storage_deduplicate(storage_folder):
+    """
+    Test that identical artifacts are stored once and their files are deleted
+    once none of them is left.
+    """
+    folder = storage_folder
+
+    storage = LocalStorage(folder, deduplicate=True)
+    first = storage.push(artifact=[1, 2, 3], name="model", metadata={"score": 0.8})
+    second = storage.push(artifact=[1, 2, 3], name="model", metadata={"score": 0.9})
+    other = storage.push(artifact=[1, 2, 3], name="other", metadata={})
+
+    assert os.path.samefile(Path(folder, f"{first}.pkl"), Path(folder, f"{second}.pkl"))
+    assert storage.pull(name="model", version="1") == {
+        "artifact": [1, 2, 3],
+        "metadata": {"score": 0.8},
+    }
+    assert storage.pull(name="model")["metadata"] == {"score": 0.9}
+
+    blob = storage._blobs.path(Path(folder, f"{first}.blob").read_text())
+    storage.remove("model", version="1")
+    assert not os.path.exists(Path(folder, f"{first}.pkl"))
+    assert storage.pull(name="model")["artifact"] == [1, 2, 3]
+
+    storage.remove("model")
+    assert blob.is_file()
+    storage.remove("other")
+    assert not blob.exists()
+    assert not os.path.exists(Path(folder, f"{other}.json"))
+
+    shutil.rmtree(folder)
+
+
+def test_local_storage_codec(storage_folder):
+    """
+    Test pushing compressed artifacts with the codec of the storage or of the push.
+    """
+    folder = storage_folder
+
+    storage = LocalStorage(folder, codec="zlib")
+    storage.push(artifact=[0] * 10_000, name="model", metadata={"score": 0.9})
+    storage.push(artifact=[1] * 10_000, name="model", metadata={}, codec="lzma")
+    storage.push(artifact=[2] * 10_000, name="model", metadata={}, codec="none")
+
+    assert storage.pull(name="model", version="1") == {
+        "artifact": [0] * 10_000,
+        "metadata": {"score": 0.9},
+    }
+    assert (
+        LocalStorage(folder).pull(name="model", version="2")["artifact"] == [1] * 10_000
+    )
+    assert storage.pull(name="model", version="3")["artifact"] == [2] * 10_000
+
+    with pytest.raises(ValueError):
+        storage.push(artifact=[], name="model", metadata={}, codec="snappy")
+    assert storage._versioner.get_versions("model") == ["1", "2", "3"]
+
+    with pytest.raises(ValueError):
+        LocalStorage(folder, codec="snappy")
+
+    shutil.rmtree(folder)
+
+
+@pytest.mark.parametrize("registry", ["json", "sqlite"])
+def test_local_storage_push_pull_many(storage_folder, registry):
+    """
+    Test pushing and pulling several artifacts at once.
+    """
+    folder = storage_folder
+
+    storage = LocalStorage(folder, registry=registry)
+    storage.push(artifact=0, name="model_a", metadata={})
+    filenames = storage.push_many(
+        [
+            {"artifact": 1, "name": "model_a", "metadata": {"i": 1}},
+            {"artifact": 2, "name": "model_b", "metadata": {}, "tags": ["prod"]},
+            {"artifact": 3, "name": "model_a", "metadata": {}, "codec": "zlib"},
+        ]
+    )
+
+    assert filenames == ["model_a_2", "model_b_1", "model_a_3"]
+    results = storage.pull_many(
+        [
+            {"name": "model_a", "version": "2"},
+            {"tag": "prod"},
+            {"name": "model_a"},
+            {"name": "model_a", "version": "1"},
+        ]
+    )
+    assert [result["artifact"] for result in results] == [1, 2, 3, 0]
+    assert results[0]["metadata"] == {"i": 1}
+
+    with pytest.raises(ValueError):
+        storage.pull_many([{"version": "1"}])
+
+    shutil.rmtree(folder)
+
+
+def test_local_storage_artifact_cache(storage_folder, mocker):
+    """
+    Test that pulled artifacts are cached and tags moved to other artifacts are
+    observed.
+    """
+    folder = storage_folder
+    get_artifact_cache().clear()
+
+    storage = LocalStorage(folder, artifact_cache=True)
+    storage.push(artifact=[1], name="model", metadata={}, tags=["prod"])
+    storage.push(artifact=[2], name="model", metadata={})
+
+    for filename in os.listdir(folder):
+        os.utime(Path(folder, filename), (0, 0))
+
+    load = mocker.spy(storage, "_load")
+    assert storage.pull(tag="prod")["artifact"] == [1]
+    assert LocalStorage(folder, artifact_cache=True).pull(tag="prod")["artifact"] == [1]
+    assert load.call_count == 1
+
+    storage._versioner.update_tags("model", ["prod"])
+    assert storage.pull(tag="prod")["artifact"] == [2]
+    assert get_artifact_cache().stats()["hits"] == 1
+
+    get_artifact_cache().clear()
+    shutil.rmtree(folder)
+
+
+@pytest.mark.parametrize("registry", ["json", "sqlite"])
+def test_local_storage_rollback_tag(storage_folder, registry):
+    """
+    Test rolling a tag back to the artifact it pointed to before.
+    """
+    folder = storage_folder
+
+    storage = LocalStorage(folder, registry=registry)
+    storage.push(artifact=1, name="model", metadata={}, tags=["prod"])
+    storage.push(artifact=2, name="model", metadata={}, tags=["prod"])
+
+    assert storage.get_tags("model") == ["prod"]
+    assert storage.get_tags("model", version="1") == []
+    assert storage.rollback_tag("prod") == "model_1"
+    assert storage.pull(tag="prod")["artifact"] == 1
+    assert [change["version"] for change in storage.get_tag_history("prod")] == [
+        "1",
+        "2",
+        "1",
+    ]
+
+    shutil.rmtree(folder)
+
+
+@pytest.mark.parametrize("registry", ["json", "sqlite"])
+def test_local_storage_list_artifacts(storage_folder, registry, mocker):
+    """
+    Test that artifact versions are listed lazily, page by page, and that a
+    listing can be resumed from a cursor.
+    """
+    folder = storage_folder
+
+    storage = LocalStorage(folder, registry=registry)
+    storage.push_many(
+        [{"artifact": i, "name": f"model{i % 3}", "metadata": {}} for i in range(9)]
+    )
+    list_page = mocker.spy(type(storage._versioner), "list_artifacts")
+
+    listing = storage.list_artifacts(name_prefix="model", page_size=2)
+    first = [next(listing) for _ in range(3)]
+
+    assert [entry["filename"] for entry in first] == [
+        "model0_1",
+        "model0_2",
+        "model0_3",
+    ]
+    assert list_page.call_count == 2
+
+    rest = storage.list_artifacts(cursor=first[-1]["cursor"], limit=4)
+    assert [entry["filename"] for entry in rest] == [
+        "model1_1",
+        "model1_2",
+        "model1_3",
+        "model2_1",
+    ]
+    assert len(list(storage.list_artifacts(name_prefix="model2"))) == 3
+    assert list(storage.list_artifacts(since=time.time() + 60)) == []
+
+    shutil.rmtree(folder)
@@ -0,0 +1,134 @@
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from mixver.cli.main import main
+from mixver.config import ROOT
+from mixver.storages.local_storage import LocalStorage
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def cli_storage(request):
+    storage_path = Path(ROOT, "prueba_cli")
+    storage = LocalStorage(storage_path=str(storage_path), registry=request.param)
+    storage.push({"weights": 1}, "model", {"accuracy": 0.9}, tags=["production"])
+    storage.push({"weights": 2}, "model", {"accuracy": 0.95})
+    storage.push([1, 2], "other", {})
+
+    return storage_path, request.param
+
+
+def test_cli_list_and_show(cli_storage, capsys):
+    """
+    Test listing the artifact versions and showing one of them.
+    """
+    cli_storage, _ = cli_storage
+
+    assert main(["list", str(cli_storage), "--prefix", "mod"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split("\t")[:3] for line in lines] == [
+        ["model", "1", "model_1"],
+        ["model", "2", "model_2"],
+    ]
+
+    assert main(["show", str(cli_storage), "--tag", "production"]) == 0
+    shown = json.loads(capsys.readouterr().out)
+    assert shown == {
+        "name": "model",
+        "version": "1",
+        "filename": "model_1",
+        "tags": ["production"],
+        "metadata": {"accuracy": 0.9},
+    }
+
+    assert main(["tags", str(cli_storage), "--versions"]) == 0
+    output = capsys.readouterr().out
+    assert "model_2" in output and "other_1" in output
+
+    shutil.rmtree(cli_storage)
+
+
+def test_cli_changes(cli_storage, capsys):
+    """
+    Test pulling, tagging and removing artifacts, and collecting garbage.
+    """
+    cli_storage, registry = cli_storage
+    output = Path(cli_storage, "pulled.pkl")
+
+    assert main(["pull", str(cli_storage), "model", "-o", str(output)]) == 0
+    with open(output, "rb") as file:
+        assert pickle.load(file) == {"weights": 2}
+
+    assert main(["tag", str(cli_storage), "model", "staging", "--version", "2"]) == 0
+    assert main(["rm", str(cli_storage), "other"]) == 0
+    assert main(["gc", str(cli_storage), "--keep-last", "0"]) == 0
+
+    storage = LocalStorage(storage_path=str(cli_storage), registry=registry)
+    assert storage.get_tags("model") == ["production", "staging"]
+    assert [entry["filename"] for entry in storage.list_artifacts()] == [
+        "model_1",
+        "model_2",
+    ]
+
+    assert main(["show", str(cli_storage), "other"]) == 1
+    assert "doesn't exist" in capsys.readouterr().err
+
+    shutil.rmtree(cli_storage)
+
+
+def test_cli_verify(cli_storage, capsys):
+    """
+    Test that verifying a storage reports its problems in the exit code.
+    """
+    cli_storage, _ = cli_storage
+
+    assert main(["verify", str(cli_storage), "--workers", "1"]) == 0
+
+    os.remove(Path(cli_storage, "other_1.pkl"))
+
+    assert main(["verify", str(cli_storage), "--workers", "1"]) == 2
+    assert capsys.readouterr().out == "missing\tother_1\n"
+    assert main(["verify", str(cli_storage), "--repair", "--workers", "1"]) == 2
+    assert main(["verify", str(cli_storage), "--workers", "1"]) == 0
+
+    shutil.rmtree(cli_storage)
+
+
+def test_cli_prefetch(cli_storage, capsys):
+    """
+    Test copying the artifacts of some tags into a cache folder.
+    """
+    cli_storage, _ = cli_storage
+    cache = Path(cli_storage, "cache")
+
+    assert (
+        main(["prefetch", str(cli_storage), "production", "--cache", str(cache)]) == 0
+    )
+    assert capsys.readouterr().out == "production\tmodel_1\n"
+    copies = [path.name for path in cache.iterdir() if path.is_file()]
+    assert len(copies) == 1 and copies[0].startswith("model_1.")
+    assert main(["prefetch", str(cli_storage), "missing", "--cache", str(cache)]) == 1
+
+    shutil.rmtree(cli_storage)
+
+
+def test_headless_import_skips_rich():
+    """
+    Test that importing the storage doesn't import rich.
+    """
+    code = "import sys, mixver.storages.local_storage; print('rich' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.strip() == "False"
@@ -1,5 +1,8 @@
 from pathlib import Path
 
+from rich.console import Console
+
+from mixver.cli.visualizer import show_tags, show_versions
 from mixver.config import ROOT
 from mixver.storages.local_storage import LocalStorage
 
@@ -10,5 +13,42 @@ def test_visualizer():
     storage.visualize()
 
 
+def test_visualizer_filters_and_limits():
+    path = Path(ROOT, "tests/data")
+    storage = LocalStorage(storage_path=path)
+
+    assert storage.visualize(tag_pattern="*tion") == 2
+    assert storage.visualize(name_pattern="linear*") == 1
+    assert storage.visualize(limit=1) == 1
+    assert storage.visualize(view="versions") == 0
+
+
+def test_visualizer_streams_rows():
+    """
+    Test that the rows are consumed in batches, and only up to the limit.
+    """
+    consumed = []
+
+    def rows():
+        for i in range(1000):
+            consumed.append(i)
+            yield f"tag_{i:04d}", "name", str(i), f"name_{i}"
+
+    console = Console(record=True, width=120)
+
+    assert show_tags(rows(), limit=150, console=console, batch_size=100) == 150
+    # One row past the limit tells that the output was cut
+    assert len(consumed) == 151
+
+    output = console.export_text()
+    assert output.count("Tag") == 1
+    assert "tag_0149" in output and "tag_0150" not in output
+    assert "Showing the first 150 rows." in output
+
+    console = Console(record=True, width=120)
+    assert show_versions(iter([("name", "3", "name_3")]), console=console) == 1
+    assert "Showing" not in console.export_text()
+
+
 if __name__ == "__main__":
     test_visualizer()
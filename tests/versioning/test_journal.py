@@ -0,0 +1,187 @@
+import json
+import shutil
+from pathlib import Path
+
+from mixver.versioning.journal import JSONJournal, apply_operation
+from mixver.versioning.versioner import Versioner
+
+
+def test_apply_operations_twice():
+    """
+    Test that replaying operations over data that already contains them
+    doesn't change it.
+    """
+    operations = [
+        ["set", ["model", "1"], "model_1"],
+        ["del", ["model"]],
+        ["set", ["model", "2"], "model_2"],
+        ["del", ["other", "1"]],
+    ]
+    data = {"other": {"1": "other_1", "2": "other_2"}}
+
+    for operation in operations:
+        apply_operation(data, operation)
+
+    expected = {"model": {"2": "model_2"}, "other": {"2": "other_2"}}
+    assert data == expected
+
+    for operation in operations:
+        apply_operation(data, operation)
+
+    assert data == expected
+
+
+def test_journal_versioner_appends_changes(test_folder):
+    """
+    Test that a journaled versioner doesn't rewrite the registry files.
+    """
+    storage_path, _, _ = test_folder
+    snapshot = Path(storage_path, ".versions.json").read_text(encoding="utf8")
+
+    versioner = Versioner(storage_path=storage_path, journal=True)
+    filename = versioner.add_artifact("artifact", tags=["new_tag"])
+
+    assert filename == "artifact_2"
+    assert Path(storage_path, ".versions.json").read_text(encoding="utf8") == snapshot
+
+    with open(Path(storage_path, ".versions.journal"), encoding="utf8") as file:
+        lines = file.read().splitlines()
+
+    assert [json.loads(line) for line in lines] == [
+        [["set", ["artifact", "2"], "artifact_2"]]
+    ]
+    assert versioner.get_artifact_by_version("artifact") == filename
+    assert versioner.get_artifact_by_tag("new_tag") == filename
+
+    shutil.rmtree(storage_path)
+
+
+def test_journal_versioner_compaction(test_folder):
+    """
+    Test merging the journal into the registry files.
+    """
+    storage_path, _, _ = test_folder
+
+    versioner = Versioner(storage_path=storage_path, journal=True)
+    versioner.add_artifact("artifact")
+    versioner.remove_artifact("test_artifact")
+    versioner.compact()
+
+    with open(Path(storage_path, ".versions.json"), encoding="utf8") as file:
+        data = json.load(file)
+
+    assert data == {"artifact": {"1": "artifact_1", "2": "artifact_2"}}
+    assert Path(storage_path, ".versions.journal").stat().st_size == 0
+    assert versioner.get_artifact_by_version("artifact") == "artifact_2"
+
+    shutil.rmtree(storage_path)
+
+
+def test_journal_background_compaction(test_folder):
+    """
+    Test that the journal is compacted once it reaches the threshold.
+    """
+    storage_path, _, _ = test_folder
+    journal = JSONJournal(Path(storage_path, ".versions.json"), compact_threshold=3)
+
+    for version in range(2, 5):
+        with journal.transaction() as data:
+            operation = ["set", ["artifact", str(version)], f"artifact_{version}"]
+            apply_operation(data, operation)
+            journal.append([operation])
+
+    journal.wait()
+
+    assert not journal.pending()
+    with open(Path(storage_path, ".versions.json"), encoding="utf8") as file:
+        assert len(json.load(file)["artifact"]) == 4
+
+    shutil.rmtree(storage_path)
+
+
+def test_journal_ignores_interrupted_append(test_folder):
+    """
+    Test that an update whose append didn't finish is ignored.
+    """
+    storage_path, _, _ = test_folder
+
+    with open(Path(storage_path, ".versions.journal"), "w", encoding="utf8") as file:
+        file.write('[["set", ["artifact", "2"], "artifa')
+
+    versioner = Versioner(storage_path=storage_path, journal=True)
+    assert versioner.get_artifact_by_version("artifact") == "artifact_1"
+
+    assert versioner.add_artifact("artifact") == "artifact_2"
+
+    other_versioner = Versioner(storage_path=storage_path, journal=True)
+    assert other_versioner.get_artifact_by_version("artifact") == "artifact_2"
+
+    shutil.rmtree(storage_path)
+
+
+def test_journal_observes_other_writers(test_folder):
+    """
+    Test that a journaled versioner reads the updates appended by other ones.
+    """
+    storage_path, _, _ = test_folder
+
+    reader = Versioner(storage_path=storage_path, journal=True)
+    writer = Versioner(storage_path=storage_path, journal=True)
+    assert reader.get_artifact_by_version("artifact") == "artifact_1"
+
+    writer.add_artifact("artifact")
+    assert reader.get_artifact_by_version("artifact") == "artifact_2"
+
+    writer.compact()
+    writer.add_artifact("artifact")
+    assert reader.get_artifact_by_version("artifact") == "artifact_3"
+
+    shutil.rmtree(storage_path)
+
+
+def test_journal_reload_during_compaction(test_folder):
+    """
+    Test that a journal read before a compaction isn't replayed over the
+    snapshot written by it, which could bring back deleted entries.
+    """
+    storage_path, _, _ = test_folder
+    file_path = Path(storage_path, ".versions.json")
+    reader, writer = JSONJournal(file_path), JSONJournal(file_path)
+
+    def update(operation):
+        with writer.transaction() as data:
+            apply_operation(data, operation)
+            writer.append([operation])
+
+    update(["set", ["model", "1"], "model_1"])
+    read_journal_lines = reader._read_journal_lines
+
+    def compact_meanwhile():
+        lines = read_journal_lines()
+
+        if writer.pending():
+            writer.compact()
+            update(["del", ["model"]])
+            writer.compact()
+
+        return lines
+
+    reader._read_journal_lines = compact_meanwhile
+
+    assert "model" not in reader.load()
+
+    shutil.rmtree(storage_path)
+
+
+def test_versioner_compacts_leftover_journal(test_folder):
+    """
+    Test that a versioner without journal merges an existing journal first.
+    """
+    storage_path, _, _ = test_folder
+
+    Versioner(storage_path=storage_path, journal=True).add_artifact("artifact")
+    versioner = Versioner(storage_path=storage_path)
+
+    assert versioner.get_artifact_by_version("artifact") == "artifact_2"
+
+    shutil.rmtree(storage_path)
@@ -0,0 +1,199 @@
+import multiprocessing
+import shutil
+from pathlib import Path
+
+import pytest
+
+from mixver.versioning.exceptions import ArtifactDoesNotExist, EmptyRegistry, EmptyTags
+from mixver.versioning.snapshot import RegistrySnapshot, file_signature, write_snapshot
+from mixver.versioning.versioner import Versioner
+
+
+def _resolve(storage_path: str, references: list) -> list:
+    versioner = Versioner(storage_path=storage_path, snapshot=True)
+    assert versioner._snapshot_view() is not None
+
+    return versioner.get_artifacts(references)
+
+
+def test_snapshot_lookups(test_folder):
+    """
+    Test resolving names, versions and tags through the snapshot.
+    """
+    storage_path, name, tag = test_folder
+    versioner = Versioner(storage_path=storage_path, snapshot=True)
+
+    versioner.add_artifact(name, tags=["latest"])
+    versioner.add_artifact("other")
+    view = versioner._snapshot_view()
+
+    assert view is not None
+    assert versioner.get_artifact_by_version(name) == f"{name}_2"
+    assert versioner.get_artifact_by_version(name, "1") == f"{name}_1"
+    assert versioner.get_artifact_by_tag(tag) == f"{name}_1"
+    assert versioner.get_artifact_by_tag("latest") == f"{name}_2"
+    assert versioner.get_artifacts(
+        [{"tag": "latest"}, {"name": "other"}, {"name": name, "version": "1"}]
+    ) == [f"{name}_2", "other_1", f"{name}_1"]
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.get_artifact_by_version(name, "3")
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.get_artifact_by_version("missing")
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.get_artifact_by_tag("missing")
+
+    versioner.remove_artifact(name, "2")
+    assert versioner.get_artifact_by_version(name) == f"{name}_1"
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.get_artifact_by_tag("latest")
+
+    # Worker processes map the same file
+    with multiprocessing.get_context("spawn").Pool(2) as pool:
+        resolved = pool.starmap(_resolve, [(storage_path, [{"tag": tag}])] * 2)
+
+    assert resolved == [[f"{name}_1"]] * 2
+
+    shutil.rmtree(storage_path)
+
+
+def test_snapshot_empty_registry(test_folder):
+    """
+    Test that empty registry files raise the same errors as without snapshot.
+    """
+    storage_path, _, _ = test_folder
+
+    for filename in (".versions.json", ".tags.json"):
+        Path(storage_path, filename).write_text("", encoding="utf8")
+
+    versioner = Versioner(storage_path=storage_path, snapshot=True)
+    assert versioner._snapshot_view() is not None
+
+    with pytest.raises(EmptyRegistry):
+        versioner.get_artifact_by_version("artifact")
+
+    with pytest.raises(EmptyTags):
+        versioner.get_artifact_by_tag("tag")
+
+    with pytest.raises(EmptyTags):
+        versioner.get_artifacts([{"tag": "tag"}])
+
+    shutil.rmtree(storage_path)
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_snapshot_detached_tags(test_folder, journal):
+    """
+    Test that tags and names whose versions were all removed raise the same
+    errors with and without snapshot.
+    """
+    storage_path, name, tag = test_folder
+    Versioner(storage_path=storage_path, journal=journal).remove_artifact(name)
+
+    for snapshot in (False, True):
+        versioner = Versioner(
+            storage_path=storage_path, journal=journal, snapshot=snapshot
+        )
+        assert (versioner._snapshot_view() is not None) == snapshot
+
+        for references in ([{"tag": tag}], [{"name": name}]):
+            with pytest.raises(ArtifactDoesNotExist):
+                versioner.get_artifacts(references)
+
+        with pytest.raises(ArtifactDoesNotExist):
+            versioner.get_artifact_by_tag(tag)
+
+        with pytest.raises(ArtifactDoesNotExist):
+            versioner.get_artifact_by_version(name)
+
+    shutil.rmtree(storage_path)
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_snapshot_follows_other_writers(test_folder, journal):
+    """
+    Test that writes from processes without the snapshot enabled regenerate
+    it, and that writes that don't aren't hidden by it.
+    """
+    storage_path, name, _ = test_folder
+    reader = Versioner(storage_path=storage_path, journal=journal, snapshot=True)
+    writer = Versioner(storage_path=storage_path, journal=journal)
+
+    writer.add_artifact(name, tags=["prod"])
+    assert reader._snapshot_view() is not None
+    assert reader.get_artifact_by_tag("prod") == f"{name}_2"
+
+    writer.compact()
+    assert reader._snapshot_view() is not None
+
+    # Snapshot left behind by a write that didn't regenerate it
+    Path(storage_path, ".registry.snapshot").unlink()
+    writer.add_artifact(name)
+    write_snapshot(
+        Path(storage_path, ".registry.snapshot"),
+        {},
+        {},
+        {},
+        [(1, 2, 3)] * len(reader._snapshot_sources()),
+    )
+
+    assert reader._snapshot_view() is None
+    assert reader.get_artifact_by_version(name) == f"{name}_3"
+
+    shutil.rmtree(storage_path)
+
+
+def test_snapshot_rebuilt_by_background_compactions(test_folder):
+    """
+    Test that background compactions of the journal rebuild the snapshot.
+    """
+    storage_path, name, _ = test_folder
+    versioner = Versioner(storage_path=storage_path, journal=True, snapshot=True)
+
+    for journal in versioner._journals.values():
+        journal.compact_threshold = 5
+
+    for _ in range(10):
+        versioner.add_artifact(name)
+
+    for journal in versioner._journals.values():
+        journal.wait()
+
+    assert versioner._snapshot_view() is not None
+    assert versioner.get_artifact_by_version(name) == f"{name}_11"
+
+    shutil.rmtree(storage_path)
+
+
+def test_snapshot_remapped_when_regenerated(test_folder):
+    """
+    Test that readers map the new snapshot once it's replaced.
+    """
+    storage_folder, _, _ = test_folder
+    source = Path(storage_folder, "source.json")
+    source.write_text("{}", encoding="utf8")
+    snapshot_path = Path(storage_folder, "registry.snapshot")
+    snapshot = RegistrySnapshot(snapshot_path, [source])
+
+    assert snapshot.view() is None
+
+    keys = {f"tag{i:05d}": f"model_{i}" for i in range(1000)}
+    write_snapshot(snapshot_path, {}, {}, keys, [file_signature(source)])
+    view = snapshot.view()
+
+    assert all(
+        view.find(view.tags, key.encode()) == value for key, value in keys.items()
+    )
+    assert view.find(view.tags, b"tag") is None
+    assert view.find(view.latest, b"tag00001") is None
+
+    write_snapshot(
+        snapshot_path, {}, {"model": "model_2"}, {}, [file_signature(source)]
+    )
+
+    assert snapshot.view().find(snapshot.view().latest, b"model") == "model_2"
+
+    shutil.rmtree(storage_folder)
@@ -0,0 +1,383 @@
+import os
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from mixver.config import ROOT
+from mixver.versioning.exceptions import ArtifactDoesNotExist, EmptyRegistry, EmptyTags
+from mixver.versioning.sqlite_versioner import SQLiteVersioner
+from mixver.versioning.versioner import Versioner
+
+
+def test_sqlite_versioner_new_storage():
+    """
+    Test the SQLite versioner on a new storage.
+    """
+    storage_path = Path(ROOT, "prueba_sqlite_versioner")
+    os.makedirs(storage_path)
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+
+    assert os.path.isfile(Path(storage_path, ".registry.db"))
+
+    with pytest.raises(EmptyRegistry):
+        versioner.get_artifact_by_version("artifact")
+
+    with pytest.raises(EmptyTags):
+        versioner.get_artifact_by_tag("tag")
+
+    with sqlite3.connect(Path(storage_path, ".registry.db")) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    shutil.rmtree(storage_path)
+
+
+def test_sqlite_versioner_migrates_json_registry(test_folder):
+    """
+    Test that a new database starts with the content of the JSON registry.
+    """
+    storage_path, name, tag_name = test_folder
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+
+    assert versioner.get_artifact_by_version(name) == f"{name}_1"
+    assert versioner.get_artifact_by_version("test_artifact") == "test_artifact_1"
+    assert versioner.get_artifact_by_tag(tag_name) == f"{name}_1"
+
+    # Existing databases aren't migrated again
+    versioner.remove_artifact(name)
+    versioner = SQLiteVersioner(storage_path=storage_path)
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.get_artifact_by_version(name)
+
+    shutil.rmtree(storage_path)
+
+
+def test_sqlite_versioner_add_artifact(test_folder):
+    """
+    Test adding new versions of an artifact.
+    """
+    storage_path, name, _ = test_folder
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+
+    assert versioner.add_artifact(name, tags=["new_tag"]) == f"{name}_2"
+    assert versioner.add_artifact("artifact2") == "artifact2_1"
+    assert versioner.get_artifact_by_version(name) == f"{name}_2"
+    assert versioner.get_artifact_by_version(name, version="1") == f"{name}_1"
+    assert versioner.get_artifact_by_tag("new_tag") == f"{name}_2"
+    assert versioner.get_versions(name) == ["1", "2"]
+    assert versioner.get_filenames(name) == {"1": f"{name}_1", "2": f"{name}_2"}
+
+    shutil.rmtree(storage_path)
+
+
+def test_sqlite_versioner_update_tags(test_folder):
+    """
+    Test pointing tags to other artifacts.
+    """
+    storage_path, name, tag_name = test_folder
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+    versioner.add_artifact(name)
+    versioner.update_tags(name="test_artifact", tags=[tag_name])
+    versioner.update_tags(name=name, tags=["old"], version="1")
+
+    assert versioner.get_artifact_by_tag(tag_name) == "test_artifact_1"
+    assert versioner.get_artifact_by_tag("old") == f"{name}_1"
+    assert versioner.get_tags_data_for_visualization() == (
+        ["old", tag_name],
+        [name, "test_artifact"],
+        ["1", "1"],
+        [f"{name}_1", "test_artifact_1"],
+    )
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.update_tags(name="test_artifact", tags=[tag_name], version="14")
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.update_tags(name="not_exist_artifact", tags=[tag_name])
+
+    shutil.rmtree(storage_path)
+
+
+def test_sqlite_versioner_remove_artifact(test_folder):
+    """
+    Test removing an artifact and its tags.
+    """
+    storage_path, name, tag_name = test_folder
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+    versioner.remove_artifact(name)
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.get_artifact_by_version(name)
+
+    with pytest.raises(EmptyTags):
+        versioner.get_artifact_by_tag(tag_name)
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.remove_artifact(name)
+
+    shutil.rmtree(storage_path)
+
+
+@pytest.mark.parametrize("version", ["2", "01", "latest"])
+def test_sqlite_versioner_missing_version(test_folder, version):
+    """
+    Test retrieving versions that don't exist.
+    """
+    storage_path, name, _ = test_folder
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.get_artifact_by_version(name, version=version)
+
+    shutil.rmtree(storage_path)
+
+
+def test_sqlite_versioner_remove_artifact_version(test_folder):
+    """
+    Test removing single versions of an artifact.
+    """
+    storage_path, name, tag_name = test_folder
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+    versioner.add_artifact(name, tags=["latest"])
+    versioner.add_artifact(name)
+
+    versioner.remove_artifact(name, version="1")
+    assert versioner.get_versions(name) == ["2", "3"]
+    assert versioner.get_artifact_by_version(name) == f"{name}_3"
+
+    versioner.remove_artifact(name, version="3")
+    assert versioner.get_artifact_by_version(name) == f"{name}_2"
+
+    # Removed versions aren't reused
+    assert versioner.add_artifact(name) == f"{name}_4"
+    assert versioner.get_artifact_by_tag("latest") == f"{name}_2"
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.get_artifact_by_tag(tag_name)
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.remove_artifact(name, version="3")
+
+    shutil.rmtree(storage_path)
+
+
+def test_sqlite_versioner_schema_upgrade(test_folder):
+    """
+    Test opening a database created before the latest version index existed.
+    """
+    storage_path, name, _ = test_folder
+
+    with sqlite3.connect(Path(storage_path, ".registry.db")) as connection:
+        connection.executescript("""
+            CREATE TABLE versions (
+                name TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                PRIMARY KEY (name, version)
+            ) WITHOUT ROWID;
+            INSERT INTO versions VALUES ('artifact', 1, 'artifact_1');
+            INSERT INTO versions VALUES ('artifact', 2, 'artifact_2');
+            """)
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+
+    assert versioner.get_artifact_by_version(name) == f"{name}_2"
+    assert versioner.add_artifact(name, checksum="abc") == f"{name}_3"
+    assert versioner.get_checksum(name, "3") == "abc"
+    assert versioner.get_checksum(name, "1") is None
+
+    shutil.rmtree(storage_path)
+
+
+def test_sqlite_versioner_add_artifacts(test_folder):
+    """
+    Test adding and retrieving several artifacts at once.
+    """
+    storage_path, name, _ = test_folder
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+
+    assert versioner.add_artifacts(
+        [(name, ["latest"]), ("other", None), (name, [])]
+    ) == [
+        f"{name}_2",
+        "other_1",
+        f"{name}_3",
+    ]
+    assert versioner.get_artifacts(
+        [{"tag": "latest"}, {"name": name}, {"name": name, "version": "1"}]
+    ) == [f"{name}_2", f"{name}_3", f"{name}_1"]
+
+    shutil.rmtree(storage_path)
+
+
+def test_sqlite_versioner_tag_history(test_folder):
+    """
+    Test the tag history, the tags of an artifact and tag rollbacks.
+    """
+    storage_path, name, tag_name = test_folder
+
+    json_versioner = Versioner(storage_path=storage_path)
+    json_versioner.add_artifact(name, tags=[tag_name])
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+    assert [change["version"] for change in versioner.get_tag_history(tag_name)] == [
+        "2"
+    ]
+
+    versioner.update_tags(name, [tag_name, "prod"], version="1")
+    assert versioner.get_tags(name) == ["prod", tag_name]
+    assert versioner.get_tags(name, version="2") == []
+
+    assert versioner.rollback_tag(tag_name) == f"{name}_2"
+    assert versioner.get_tags(name, version="2") == [tag_name]
+
+    versioner.remove_artifact(name, version="1")
+    assert versioner.get_tag_history("prod")[-1]["name"] is None
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.rollback_tag("prod")
+
+    versioner.remove_artifact(name)
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.rollback_tag(tag_name)
+
+    shutil.rmtree(storage_path)
+
+
+def test_sqlite_versioner_list_artifacts(test_folder):
+    """
+    Test listing pages of artifact versions, including the ones migrated without
+    push times.
+    """
+    storage_path, name, _ = test_folder
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+    since = time.time()
+
+    for artifact in ("model_b", "model_a", "model_a", "other"):
+        versioner.add_artifact(artifact)
+
+    page = versioner.list_artifacts(name_prefix="model_", limit=2)
+    assert [(entry["name"], entry["version"]) for entry in page] == [
+        ("model_a", "1"),
+        ("model_a", "2"),
+    ]
+    assert page[0]["filename"] == "model_a_1"
+    assert page[0]["pushed_at"] >= since
+
+    page = versioner.list_artifacts(name_prefix="model_", after=("model_a", "2"))
+    assert [entry["filename"] for entry in page] == ["model_b_1"]
+
+    assert [entry["name"] for entry in versioner.list_artifacts()] == [
+        name,
+        "model_a",
+        "model_a",
+        "model_b",
+        "other",
+        "test_artifact",
+    ]
+    assert len(versioner.list_artifacts(since=since)) == 4
+
+    shutil.rmtree(storage_path)
+
+
+def test_sqlite_versioner_iter_tags_and_latest_versions(test_folder):
+    """
+    Test iterating over the tags and the latest versions, filtered by pattern.
+    """
+    storage_path, name, tag_name = test_folder
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+    versioner.add_artifact(name, tags=["production"])
+    versioner.add_artifact("model", tags=["prod_model"])
+
+    assert list(versioner.iter_tags()) == [
+        ("prod_model", "model", "1", "model_1"),
+        ("production", name, "2", f"{name}_2"),
+        (tag_name, name, "1", f"{name}_1"),
+    ]
+    assert [row[0] for row in versioner.iter_tags("prod*", "art*")] == ["production"]
+    assert list(versioner.iter_latest_versions()) == [
+        (name, "2", f"{name}_2"),
+        ("model", "1", "model_1"),
+        ("test_artifact", "1", "test_artifact_1"),
+    ]
+    assert list(versioner.iter_latest_versions(name_pattern="t*")) == [
+        ("test_artifact", "1", "test_artifact_1"),
+    ]
+
+    shutil.rmtree(storage_path)
+
+
+@pytest.mark.parametrize(
+    "pattern", ["*", "Prod*", "prod*", "[!p]*", "[^p]*", "[pP]ro?", "*[a", "[]]*"]
+)
+def test_patterns_match_both_backends(test_folder, pattern):
+    """
+    Test that the JSON and SQLite registries match the same names and tags.
+    """
+    storage_path, _, _ = test_folder
+    json_versioner = Versioner(storage_path=storage_path)
+
+    for name in ("Prod", "prod", "^pro", "]x", "model[a", "Prod", "Prod"):
+        json_versioner.add_artifact(name, tags=[f"{name}_tag"])
+
+    sqlite_versioner = SQLiteVersioner(storage_path=storage_path)
+
+    # The latest versions come from the index of each registry
+    for versioner in (json_versioner, sqlite_versioner):
+        versioner.remove_artifact("Prod", version="3")
+
+    for versioner in (json_versioner, sqlite_versioner):
+        assert list(versioner.iter_latest_versions(pattern)) == list(
+            json_versioner.iter_latest_versions(pattern)
+        )
+        assert list(versioner.iter_tags(pattern + "_tag", pattern)) == list(
+            json_versioner.iter_tags(pattern + "_tag", pattern)
+        )
+
+    assert [row[0] for row in sqlite_versioner.iter_latest_versions("[!p]*")] == [
+        "Prod",
+        "]x",
+        "^pro",
+        "artifact",
+        "model[a",
+        "test_artifact",
+    ]
+
+    shutil.rmtree(storage_path)
+
+
+def test_sqlite_versioner_checksums_and_restore(test_folder):
+    """
+    Test recording checksums and restoring versions found in the storage.
+    """
+    storage_path, name, _ = test_folder
+
+    versioner = SQLiteVersioner(storage_path=storage_path)
+    versioner.add_artifacts([(name, None), ("model", None)], checksums=["a", None])
+    versioner.restore_artifacts(
+        [("model", "5", "b", 10.0), ("new", "2", None, None), (name, "1", "c", None)]
+    )
+
+    assert versioner.get_all_checksums() == {f"{name}_2": "a", "model_5": "b"}
+    assert versioner.get_all_push_times()["model_5"] == 10.0
+    assert "new_2" not in versioner.get_all_push_times()
+    assert versioner.get_artifact_by_version("model") == "model_5"
+    assert versioner.get_versions("new") == ["2"]
+    assert versioner.add_artifact("new") == "new_3"
+    assert versioner.add_artifact("model") == "model_6"
+
+    shutil.rmtree(storage_path)
@@ -1,13 +1,18 @@
 import json
 import os
 import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
 
 from mixver.config import ROOT
+from mixver.versioning import versioner as versioner_module
 from mixver.versioning.exceptions import ArtifactDoesNotExist
-from mixver.versioning.versioner import Versioner
+from mixver.versioning.versioner import JSONManager, Versioner
 
 
 def test_versioner_new_storage():
@@ -242,3 +247,428 @@ def test_get_artifact_by_tag_exception(test_folder, tag):
         versioner.get_artifact_by_tag(tag=tag)
 
     shutil.rmtree(storage_path)
+
+
+def _age_registry_files(storage_path):
+    """
+    Move the registry files' modification time to the past, out of the cache's
+    racy window.
+    """
+    past = time.time() - 60
+
+    for filename in (".versions.json", ".tags.json"):
+        os.utime(Path(storage_path, filename), (past, past))
+
+
+def test_cached_versioner_reuses_parsed_files(test_folder, mocker):
+    """
+    Test that a cached versioner doesn't parse unchanged registry files again.
+    """
+    storage_path, _, tag_name = test_folder
+    _age_registry_files(storage_path)
+
+    versioner = Versioner(storage_path=storage_path, cache=True)
+    json_loads = mocker.spy(json, "loads")
+
+    for _ in range(3):
+        assert versioner.get_artifact_by_version(name="artifact") == "artifact_1"
+        assert versioner.get_artifact_by_tag(tag=tag_name) == "artifact_1"
+
+    assert json_loads.call_count == 2
+
+    shutil.rmtree(storage_path)
+
+
+def test_cached_versioner_reloads_modified_files(test_folder):
+    """
+    Test that a cached versioner observes changes made by other writers.
+    """
+    storage_path, _, _ = test_folder
+    _age_registry_files(storage_path)
+
+    versioner = Versioner(storage_path=storage_path, cache=True)
+    assert versioner.get_artifact_by_version(name="artifact") == "artifact_1"
+
+    Versioner(storage_path=storage_path).add_artifact("artifact")
+
+    assert versioner.get_artifact_by_version(name="artifact") == "artifact_2"
+    assert versioner.get_artifact_by_version(name="artifact", version="1") == (
+        "artifact_1"
+    )
+
+    shutil.rmtree(storage_path)
+
+
+def test_cached_versioner_writes(test_folder):
+    """
+    Test that the writes of a cached versioner are visible through its cache.
+    """
+    storage_path, _, _ = test_folder
+    _age_registry_files(storage_path)
+
+    versioner = Versioner(storage_path=storage_path, cache=True)
+    versioner.get_artifact_by_version(name="artifact")
+    filename = versioner.add_artifact("artifact", tags=["new_tag"])
+
+    assert filename == "artifact_2"
+    assert versioner.get_artifact_by_version(name="artifact", version="2") == filename
+    assert versioner.get_artifact_by_tag(tag="new_tag") == filename
+
+    shutil.rmtree(storage_path)
+
+
+def test_cached_versioner_concurrent_writes(test_folder):
+    """
+    Test that readers of the cached registry content aren't affected by the
+    writes of other threads, which replace it instead of changing it.
+    """
+    storage_path, _, _ = test_folder
+
+    versioner = Versioner(storage_path=storage_path, cache=True)
+    versioner._cache.racy_window_ns = 0
+    versioner.add_artifacts(
+        [(f"model{i}", None) for i in range(300)], checksums=["a"] * 300
+    )
+    written = threading.Event()
+
+    def write():
+        try:
+            for i in range(30):
+                versioner.add_artifact(f"new{i}", checksum="b")
+        finally:
+            written.set()
+
+    def read():
+        while not written.is_set():
+            versioner.get_all_checksums()
+
+    # Threads are switched often, so that reads overlap the changes
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    try:
+        with ThreadPoolExecutor(4) as executor:
+            readers = [executor.submit(read) for _ in range(3)]
+            executor.submit(write).result()
+
+            for reader in readers:
+                reader.result()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert len(versioner.get_all_filenames()) == 332
+
+    shutil.rmtree(storage_path)
+
+
+def test_unchanged_registry_is_not_rewritten(test_folder):
+    """
+    Test that updates which don't change anything leave the files untouched.
+    """
+    storage_path, _, tag_name = test_folder
+    _age_registry_files(storage_path)
+    tags_file = Path(storage_path, ".tags.json")
+    modified = tags_file.stat().st_mtime_ns
+
+    versioner = Versioner(storage_path=storage_path)
+    versioner.update_tags(name="artifact", tags=[tag_name])
+    versioner.remove_artifact("test_artifact")
+
+    assert tags_file.stat().st_mtime_ns == modified
+
+    with JSONManager(file_path=tags_file):
+        pass
+
+    assert tags_file.stat().st_mtime_ns == modified
+
+    shutil.rmtree(storage_path)
+
+
+def test_versioner_index(test_folder, mocker):
+    """
+    Test that pushes keep the latest version, the version counter and the push
+    times of each artifact in the index.
+    """
+    storage_path, name, _ = test_folder
+    mocker.patch.object(versioner_module.time, "time", return_value=100.0)
+
+    versioner = Versioner(storage_path=storage_path)
+    versioner.add_artifact(name)
+    versioner.add_artifact(name)
+    versioner.add_artifact("artifact2")
+
+    with open(Path(storage_path, ".index.json"), "r", encoding="utf8") as file:
+        data = json.load(file)
+
+    assert data == {
+        name: {"latest": 3, "counter": 3, "pushed": {"2": 100.0, "3": 100.0}},
+        "artifact2": {"latest": 1, "counter": 1, "pushed": {"1": 100.0}},
+    }
+
+    shutil.rmtree(storage_path)
+
+
+def test_versioner_outdated_index(test_folder):
+    """
+    Test that the versions pushed without updating the index are found.
+    """
+    storage_path, name, _ = test_folder
+
+    versioner = Versioner(storage_path=storage_path)
+    versioner.add_artifact(name)
+
+    with open(Path(storage_path, ".index.json"), "w", encoding="utf8") as file:
+        json.dump({name: {"latest": 1, "counter": 1}}, file)
+
+    assert versioner.get_artifact_by_version(name) == f"{name}_2"
+    assert versioner.add_artifact(name) == f"{name}_3"
+
+    shutil.rmtree(storage_path)
+
+
+def test_remove_artifact_version(test_folder):
+    """
+    Test removing single versions of an artifact.
+    """
+    storage_path, name, tag_name = test_folder
+
+    versioner = Versioner(storage_path=storage_path)
+    versioner.add_artifact(name, tags=["latest"])
+    versioner.add_artifact(name)
+
+    versioner.remove_artifact(name, version="1")
+    assert versioner.get_versions(name) == ["2", "3"]
+    assert versioner.get_filenames(name) == {"2": f"{name}_2", "3": f"{name}_3"}
+    assert versioner.get_artifact_by_version(name) == f"{name}_3"
+
+    versioner.remove_artifact(name, version="3")
+    assert versioner.get_artifact_by_version(name) == f"{name}_2"
+
+    # Removed versions aren't reused
+    assert versioner.add_artifact(name) == f"{name}_4"
+
+    with open(Path(storage_path, ".tags.json"), "r", encoding="utf8") as file:
+        data = json.load(file)
+        assert data[tag_name] == {}
+        assert data["latest"] == {name: {"2": f"{name}_2"}}
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.remove_artifact(name, version="3")
+
+    shutil.rmtree(storage_path)
+
+
+def test_add_artifacts(test_folder, mocker):
+    """
+    Test adding several artifacts with a single update of the registry files.
+    """
+    storage_path, name, tag_name = test_folder
+
+    versioner = Versioner(storage_path=storage_path)
+    writes = mocker.spy(versioner_module, "write_atomically")
+
+    filenames = versioner.add_artifacts(
+        [(name, ["latest"]), ("other", None), (name, ["best"])]
+    )
+
+    assert filenames == [f"{name}_2", "other_1", f"{name}_3"]
+    # Index, versions, tags and reverse tag index
+    assert writes.call_count == 4
+    assert versioner.get_artifacts(
+        [{"tag": "latest"}, {"tag": "best"}, {"name": name}, {"name": "other"}]
+    ) == [f"{name}_2", f"{name}_3", f"{name}_3", "other_1"]
+
+    shutil.rmtree(storage_path)
+
+
+def test_tag_history(test_folder, mocker):
+    """
+    Test that tag changes are appended to the tag history, and that tags can be
+    rolled back.
+    """
+    storage_path, name, tag_name = test_folder
+    mocker.patch.object(versioner_module.time, "time", return_value=100.0)
+
+    versioner = Versioner(storage_path=storage_path)
+    versioner.add_artifact(name, tags=["prod"])
+    versioner.add_artifact(name, tags=["prod"])
+    versioner.update_tags(name, ["prod"])
+
+    assert versioner.get_tag_history("prod") == [
+        {"name": name, "version": "2", "filename": f"{name}_2", "time": 100.0},
+        {"name": name, "version": "3", "filename": f"{name}_3", "time": 100.0},
+    ]
+
+    assert versioner.rollback_tag("prod") == f"{name}_2"
+    assert versioner.get_artifact_by_tag("prod") == f"{name}_2"
+    assert versioner.rollback_tag("prod") == f"{name}_3"
+
+    versioner.remove_artifact(name, version="3")
+    assert versioner.get_tag_history("prod")[-1]["name"] is None
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.rollback_tag("prod")
+
+    with pytest.raises(ArtifactDoesNotExist):
+        versioner.rollback_tag("prod", steps=10)
+
+    shutil.rmtree(storage_path)
+
+
+def test_tag_history_skips_interrupted_appends(test_folder):
+    """
+    Test that a tag history line left incomplete by a crash is skipped.
+    """
+    storage_path, name, _ = test_folder
+
+    versioner = Versioner(storage_path=storage_path)
+    versioner.add_artifact(name, tags=["prod"])
+
+    with open(Path(storage_path, ".tag_history.jsonl"), "a", encoding="utf8") as file:
+        file.write('{"tag": "prod", "na')
+
+    versioner.update_tags(name, ["prod"], version="1")
+
+    assert [change["version"] for change in versioner.get_tag_history("prod")] == [
+        "2",
+        "1",
+    ]
+
+    shutil.rmtree(storage_path)
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_tag_index(test_folder, journal):
+    """
+    Test that the reverse tag index is built for existing registries and kept
+    up to date by tag changes and removals.
+    """
+    storage_path, name, tag_name = test_folder
+
+    versioner = Versioner(storage_path=storage_path, journal=journal)
+    assert not os.path.exists(Path(storage_path, ".tag_index.json"))
+    assert versioner.get_tags(name) == [tag_name]
+
+    versioner.add_artifact(name, tags=["latest", "prod"])
+    versioner.update_tags(name, [tag_name])
+    assert versioner.get_tags(name, version="1") == []
+    assert versioner.get_tags(name, version="2") == ["latest", "prod", tag_name]
+
+    versioner.update_tags(name, ["prod"], version="1")
+    versioner.remove_artifact(name, version="2")
+    assert versioner.get_tags(name) == ["prod"]
+
+    versioner.compact()
+
+    with open(Path(storage_path, ".tags.json"), "r", encoding="utf8") as file:
+        data = json.load(file)
+
+    assert data["latest"] == {}
+    assert data["prod"] == {name: {"1": f"{name}_1"}}
+
+    versioner.remove_artifact(name)
+    assert versioner.get_tags(name) == []
+
+    shutil.rmtree(storage_path)
+
+
+def test_list_artifacts(test_folder, mocker):
+    """
+    Test listing pages of artifact versions by name prefix and push time.
+    """
+    storage_path, name, _ = test_folder
+    clock = mocker.patch.object(versioner_module.time, "time", return_value=100.0)
+
+    versioner = Versioner(storage_path=storage_path)
+    versioner.add_artifact("model_b")
+    clock.return_value = 200.0
+
+    for _ in range(10):
+        versioner.add_artifact("model_a")
+
+    page = versioner.list_artifacts(name_prefix="model_", limit=3)
+    assert [(entry["name"], entry["version"]) for entry in page] == [
+        ("model_a", "1"),
+        ("model_a", "2"),
+        ("model_a", "3"),
+    ]
+    assert page[0] == {
+        "name": "model_a",
+        "version": "1",
+        "filename": "model_a_1",
+        "pushed_at": 200.0,
+    }
+
+    page = versioner.list_artifacts(name_prefix="model_", after=("model_a", "9"))
+    assert [entry["filename"] for entry in page] == ["model_a_10", "model_b_1"]
+
+    page = versioner.list_artifacts(since=150.0, after=("model_a", "9"))
+    assert [entry["filename"] for entry in page] == ["model_a_10"]
+
+    # Versions pushed before push times were recorded
+    assert versioner.list_artifacts(name_prefix="test")[0]["pushed_at"] is None
+    assert versioner.list_artifacts(name_prefix="test", since=0) == []
+
+    shutil.rmtree(storage_path)
+
+
+def test_iter_tags_and_latest_versions(test_folder):
+    """
+    Test iterating over the tags and the latest versions, filtered by pattern.
+    """
+    storage_path, name, tag_name = test_folder
+
+    versioner = Versioner(storage_path=storage_path)
+    versioner.add_artifact(name, tags=["production"])
+    versioner.add_artifact("model", tags=["prod_model"])
+    versioner.remove_artifact("test_artifact")
+
+    assert list(versioner.iter_tags()) == [
+        ("prod_model", "model", "1", "model_1"),
+        ("production", name, "2", f"{name}_2"),
+        (tag_name, name, "1", f"{name}_1"),
+    ]
+    assert [row[0] for row in versioner.iter_tags(tag_pattern="prod*")] == [
+        "prod_model",
+        "production",
+    ]
+    assert [row[0] for row in versioner.iter_tags(name_pattern="art*")] == [
+        "production",
+        tag_name,
+    ]
+    assert list(versioner.iter_latest_versions()) == [
+        (name, "2", f"{name}_2"),
+        ("model", "1", "model_1"),
+    ]
+    assert list(versioner.iter_latest_versions(name_pattern="m*")) == [
+        ("model", "1", "model_1"),
+    ]
+
+    shutil.rmtree(storage_path)
+
+
+def test_checksums_and_restore(test_folder):
+    """
+    Test recording checksums and restoring versions found in the storage.
+    """
+    storage_path, name, _ = test_folder
+
+    versioner = Versioner(storage_path=storage_path)
+    versioner.add_artifacts([(name, None), ("model", None)], checksums=["a", None])
+    versioner.restore_artifacts(
+        [("model", "5", "b", 10.0), ("new", "2", None, None), (name, "1", "c", None)]
+    )
+
+    assert versioner.get_all_checksums() == {f"{name}_2": "a", "model_5": "b"}
+    assert versioner.get_all_push_times()["model_5"] == 10.0
+    assert "new_2" not in versioner.get_all_push_times()
+    assert versioner.get_checksum("model", "1") is None
+    assert versioner.get_artifact_by_version("model") == "model_5"
+    assert versioner.get_versions("new") == ["2"]
+    assert versioner.add_artifact("new") == "new_3"
+    assert versioner.add_artifact("model") == "model_6"
+
+    versioner.remove_artifact(name, version="2")
+    assert versioner.get_checksum(name, "2") is None
+
+    shutil.rmtree(storage_path)